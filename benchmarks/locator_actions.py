@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BasePage 操作层对比: wait_for_selector + page.click/fill/ElementHandle vs Locator
+
+在本地模拟站点(mock/teacherin_server.py)的个人主页上，用同一组页面对象方法（点击、输入、取文本、
+检查可见性、再点击）分别驱动现 BasePage 和保留原实现的 WaitForSelectorPage，
+输出每轮平均耗时和发往Playwright驱动的协议消息数。步骤装饰器、超时学习等开销两边相同，截图关闭。
+
+用法:
+    python benchmarks/locator_actions.py --rounds 20 --elements 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+from mock.teacherin_server import MockTeacherInServer
+from pages.base_page import BasePage
+from utils.decorators import allure_step
+from utils.logger import log
+from utils.screenshot_policy import ScreenshotPolicy, set_screenshot_policy
+
+
+class WaitForSelectorPage(BasePage):
+    """原 BasePage 的元素操作: 先 wait_for_selector，再按选择器重新查找或经过ElementHandle执行操作"""
+
+    @allure_step("点击元素", fail_on_false=True)
+    def click(self, selector: str, timeout: int = None) -> bool:
+        try:
+            with self.measure_timeout("click", selector, timeout) as timeout:
+                self.page.wait_for_selector(selector, timeout=timeout)
+                self.page.click(selector)
+                log.info(f"点击元素成功: {selector}")
+                return True
+        except Exception as e:
+            log.error(f"点击元素失败: {selector}, 错误: {e}")
+            return False
+
+    @allure_step("输入文本", fail_on_false=True)
+    def type_text(self, selector: str, text: str, timeout: int = None) -> bool:
+        try:
+            with self.measure_timeout("type", selector, timeout) as timeout:
+                self.page.wait_for_selector(selector, timeout=timeout)
+                self.page.fill(selector, text)
+                log.info(f"输入文本成功: {selector} = {text}")
+                return True
+        except Exception as e:
+            log.error(f"输入文本失败: {selector}, 错误: {e}")
+            return False
+
+    @allure_step("获取元素文本")
+    def get_text(self, selector: str, timeout: int = None) -> str:
+        try:
+            with self.measure_timeout("get_text", selector, timeout) as timeout:
+                element = self.page.wait_for_selector(selector, timeout=timeout)
+                text = element.text_content()
+                log.info(f"获取文本成功: {selector} = {text}")
+                return text
+        except Exception as e:
+            log.error(f"获取文本失败: {selector}, 错误: {e}")
+            return ""
+
+    @allure_step("检查元素可见性")
+    def is_element_visible(self, selector: str, timeout: int = None) -> bool:
+        try:
+            with self.measure_timeout("is_visible", selector, timeout) as timeout:
+                element = self.page.wait_for_selector(selector, timeout=timeout)
+                return element.is_visible()
+        except Exception as e:
+            log.error(f"检查元素可见性失败: {selector}, 错误: {e}")
+            return False
+
+
+def page_flow(page_object: BasePage):
+    """两种实现执行的同一组页面对象操作"""
+    results = [
+        page_object.click("#star-course", timeout=10000),
+        page_object.type_text("#keyword", "自动化测试", timeout=10000),
+        page_object.get_text("#content", timeout=10000) != "",
+        page_object.is_element_visible(".course", timeout=10000),
+        page_object.click("#post-course", timeout=10000),
+    ]
+    if not all(results):
+        raise RuntimeError(f"{type(page_object).__name__} 操作失败: {results}")
+
+
+PAGE_CLASSES = {
+    "wait_for_selector": WaitForSelectorPage,
+    "locator": BasePage,
+}
+
+
+class MessageCounter:
+    """统计客户端发往驱动的协议消息数（包装连接对象的内部发送方法，仅用于基准测试）"""
+
+    def __init__(self, page):
+        self.count = 0
+        self._connection = page._impl_obj._connection
+        original = self._connection._send_message_to_server
+
+        def counting_send(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+
+        self._connection._send_message_to_server = counting_send
+
+
+def run_flow(page, url: str, page_class, rounds: int, counter: MessageCounter):
+    """用指定页面对象类执行操作，返回(每轮耗时列表, 每轮消息数列表)"""
+    page_object = page_class(page)
+    durations = []
+    messages = []
+    for _ in range(rounds):
+        page.goto(url, wait_until="domcontentloaded")
+        counter.count = 0
+        start = time.perf_counter()
+        page_flow(page_object)
+        durations.append(time.perf_counter() - start)
+        messages.append(counter.count)
+    return durations, messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BasePage 操作层对比: wait_for_selector vs Locator")
+    parser.add_argument("--rounds", type=int, default=20, help="每种写法执行轮数")
+    parser.add_argument("--elements", type=int, default=500, help="个人主页课程列表元素数")
+    parser.add_argument("--latency-ms", type=int, default=0, help="模拟站点响应延迟")
+    args = parser.parse_args()
+
+    with MockTeacherInServer(element_count=args.elements, latency_ms=args.latency_ms) as server, \
+            sync_playwright() as playwright:
+        url = server.user_page_url()
+        browser = playwright.chromium.launch(headless=True)
+        page = browser.new_page()
+        counter = MessageCounter(page)
+        set_screenshot_policy(ScreenshotPolicy(mode="never"))
+        # 预热
+        for page_class in PAGE_CLASSES.values():
+            run_flow(page, url, page_class, 1, counter)
+
+        print(f"{'写法':<20}{'平均耗时(ms)':>14}{'p95耗时(ms)':>14}{'协议消息/轮':>14}")
+        for name, page_class in PAGE_CLASSES.items():
+            durations, messages = run_flow(page, url, page_class, args.rounds, counter)
+            p95 = sorted(durations)[max(int(len(durations) * 0.95) - 1, 0)]
+            print(f"{name:<20}{statistics.mean(durations) * 1000:>14.1f}"
+                  f"{p95 * 1000:>14.1f}{statistics.mean(messages):>14.1f}")
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trace与视频录制开销对比
+
+对同一段页面操作分别在 无录制 / 视频 / trace(快照) / trace(快照+截图) 模式下重复执行，
+输出每轮平均耗时和产物平均大小。
+
+用法:
+    python benchmarks/trace_vs_video.py --rounds 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+PAGE_HTML = """
+<html><head><title>TeacherIn</title></head><body>
+<input id="keyword" />
+<div id="list">{items}</div>
+<span onclick="document.title='收藏的课程'">收藏的课程</span>
+<span onclick="document.title='发布的课程'">发布的课程</span>
+</body></html>
+"""
+
+MODES = {
+    "none": {},
+    "video": {"video": True},
+    "trace": {"trace": {"snapshots": True, "screenshots": False}},
+    "trace+screenshots": {"trace": {"snapshots": True, "screenshots": True}},
+}
+
+
+def run_flow(page, html: str):
+    """模拟一段典型的页面操作"""
+    page.set_content(html)
+    page.fill("#keyword", "自动化测试")
+    page.click("text=收藏的课程")
+    page.click("text=发布的课程")
+    page.title()
+
+
+def run_mode(browser, mode: dict, rounds: int, html: str, work_dir: str):
+    """执行指定模式，返回(每轮耗时列表, 每轮产物字节数列表)"""
+    durations = []
+    sizes = []
+    for index in range(rounds):
+        round_dir = os.path.join(work_dir, f"round_{index}")
+        os.makedirs(round_dir, exist_ok=True)
+        context_args = {"viewport": {"width": 1280, "height": 720}}
+        if mode.get("video"):
+            context_args["record_video_dir"] = round_dir
+            context_args["record_video_size"] = {"width": 1280, "height": 720}
+
+        start = time.perf_counter()
+        context = browser.new_context(**context_args)
+        if mode.get("trace"):
+            context.tracing.start(**mode["trace"])
+        page = context.new_page()
+        run_flow(page, html)
+        if mode.get("trace"):
+            context.tracing.stop(path=os.path.join(round_dir, "trace.zip"))
+        context.close()
+        durations.append(time.perf_counter() - start)
+
+        sizes.append(sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(round_dir) for name in names
+        ))
+    return durations, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace与视频录制开销对比")
+    parser.add_argument("--rounds", type=int, default=10, help="每种模式执行轮数")
+    parser.add_argument("--elements", type=int, default=500, help="页面元素数量")
+    args = parser.parse_args()
+
+    html = PAGE_HTML.format(items="".join(f"<p>课程 {i}</p>" for i in range(args.elements)))
+    work_dir = tempfile.mkdtemp(prefix="trace_bench_")
+
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=True)
+            # 预热
+            run_mode(browser, MODES["none"], 1, html, os.path.join(work_dir, "warmup"))
+
+            print(f"{'模式':<20}{'平均耗时(ms)':>14}{'p95耗时(ms)':>14}{'平均产物(KB)':>14}")
+            for name, mode in MODES.items():
+                durations, sizes = run_mode(browser, mode, args.rounds, html, os.path.join(work_dir, name))
+                p95 = sorted(durations)[max(int(len(durations) * 0.95) - 1, 0)]
+                print(f"{name:<20}{statistics.mean(durations) * 1000:>14.1f}"
+                      f"{p95 * 1000:>14.1f}{statistics.mean(sizes) / 1024:>14.1f}")
+            browser.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,30 @@ from utils.test_data_manager import TestDataManager
 
 class Config:
     """配置类"""
-    def __init__(self):
+    
+    # 各环境默认截图策略（测试数据中的 screenshot_policy 优先）
+    DEFAULT_SCREENSHOT_MODES = {
+        "dev": "always",
+        "test": "outermost",
+        "prod": "on_failure"
+    }
+    
+    def __init__(self, env: str = None):
+        """
+        Args:
+            env: 环境名称，为None时使用环境变量 ENV（run_tests.py 等父进程按 --env 显式指定）
+        """
+        self._env = env
         self.env_manager = EnvironmentManager()
         # 初始化测试数据管理器
-        self.test_data_manager = TestDataManager()
+        self.test_data_manager = TestDataManager(env)
         # 环境配置现在直接从 EnvironmentManager 获取
-        self.env_config = {"name": self.env_manager.get_current_env()}
+        self.env_config = {"name": self.ENV}
     
     @property
     def ENV(self) -> str:
         """当前环境"""
-        return self.env_manager.get_current_env()
+        return self._env or self.env_manager.get_current_env()
     
     @property
     def TIMEOUT(self) -> int:
@@ -26,20 +39,199 @@ class Config:
         timeouts = self.test_data_manager.get_all_data().get("timeouts", {})
         return timeouts.get("medium", 10000)
     
+    @property
+    def TIMEOUTS(self) -> Dict[str, int]:
+        """超时档位(毫秒): short/medium/long，自适应超时未学到耗时时使用"""
+        timeouts = {"short": 5000, "medium": 10000, "long": 30000}
+        timeouts.update(self.test_data_manager.get_all_data().get("timeouts", {}))
+        return timeouts
+    
+    @property
+    def ADAPTIVE_TIMEOUTS(self) -> Dict[str, Any]:
+        """自适应超时配置，可通过环境变量 ADAPTIVE_TIMEOUTS=on/off 覆盖"""
+        adaptive = {"enabled": True, "percentile": 99, "margin": 1.5, "padding_ms": 500, "min_ms": 1000,
+                    "min_samples": 5, "max_samples": 50, "failure_multiplier": 2}
+        adaptive.update(self.test_data_manager.get_all_data().get("adaptive_timeouts", {}))
+        if os.getenv("ADAPTIVE_TIMEOUTS"):
+            adaptive["enabled"] = os.getenv("ADAPTIVE_TIMEOUTS").lower() in ("on", "true", "1")
+        return adaptive
+    
     @property
     def HEADLESS(self) -> bool:
         """是否无头模式"""
         return True  # 默认使用无头模式
     
+    @property
+    def DEADLINES(self) -> Dict[str, Any]:
+        """用例时间预算(秒): default 默认预算(0为不限)，tests 为用例名对应的预算，可通过环境变量 TEST_DEADLINE 覆盖默认预算"""
+        deadlines = {"default": 0, "tests": {}}
+        deadlines.update(self.test_data_manager.get_all_data().get("deadlines", {}))
+        if os.getenv("TEST_DEADLINE"):
+            deadlines["default"] = float(os.getenv("TEST_DEADLINE"))
+        return deadlines
+    
+    @property
+    def SCREENSHOT_POLICY(self) -> Dict[str, Any]:
+        """截图策略，可通过环境变量 SCREENSHOT_MODE 覆盖"""
+        policy = dict(self.test_data_manager.get_all_data().get("screenshot_policy", {}))
+        policy.setdefault("mode", self.DEFAULT_SCREENSHOT_MODES.get(self.ENV, "always"))
+        policy.setdefault("every_n", 5)
+        if os.getenv("SCREENSHOT_MODE"):
+            policy["mode"] = os.getenv("SCREENSHOT_MODE")
+        return policy
+    
+    @property
+    def SCREENSHOT_PIPELINE(self) -> Dict[str, Any]:
+        """截图处理管线配置（内存附件、后台落盘、缩略图、去重、体积参照抽样）"""
+        pipeline = {
+            "in_memory": True,
+            "persist": False,
+            "thumbnail_width": 0,
+            "workers": 2,
+            "max_pending": 32,
+            "dedup": "off",
+            "dedup_threshold": 0,
+            # 浏览器直接输出jpeg时，每N张额外截取一张PNG参照图估算节省的字节数（0为不截取）
+            "reference_every": 20
+        }
+        pipeline.update(self.test_data_manager.get_all_data().get("screenshot_pipeline", {}))
+        return pipeline
+    
+    @property
+    def VIDEO_POLICY(self) -> Dict[str, Any]:
+        """视频策略（保留策略、录制分辨率），可通过环境变量 VIDEO_RETENTION 覆盖保留策略"""
+        policy = {
+            "retention": "on_failure",
+            # 与页面视口 1920x1080 一致，避免录制时缩放
+            "size": {"width": 1920, "height": 1080}
+        }
+        policy.update(self.test_data_manager.get_all_data().get("video_policy", {}))
+        if os.getenv("VIDEO_RETENTION"):
+            policy["retention"] = os.getenv("VIDEO_RETENTION")
+        return policy
+    
+    @property
+    def TRACE_POLICY(self) -> Dict[str, Any]:
+        """Trace策略（模式、DOM快照、截图），可通过环境变量 TRACE_MODE 覆盖模式"""
+        policy = {
+            "mode": "off",
+            "snapshots": True,
+            "screenshots": False,
+            "sources": False
+        }
+        policy.update(self.test_data_manager.get_all_data().get("trace_policy", {}))
+        if os.getenv("TRACE_MODE"):
+            policy["mode"] = os.getenv("TRACE_MODE")
+        return policy
+    
+    @property
+    def STEP_MIDDLEWARE(self) -> Dict[str, Any]:
+        """步骤中间件配置（控制台日志采集: off/on_failure/always）"""
+        middleware = {"console_logs": "off"}
+        middleware.update(self.test_data_manager.get_all_data().get("step_middleware", {}))
+        return middleware
+    
+    @property
+    def REPORTS_GC(self) -> Dict[str, Any]:
+        """报告目录回收配置（磁盘预算MB，include 为回收范围的子目录模式）"""
+        gc_config = {"enabled": True, "root": "./reports", "budget_mb": 2048}
+        gc_config.update(self.test_data_manager.get_all_data().get("reports_gc", {}))
+        return gc_config
+    
+    @property
+    def ARTIFACT_STORE(self) -> Dict[str, Any]:
+        """内容寻址产物存储配置（各环境共享同一存储目录，位于 reports/ 之外，不随CI归档）"""
+        store = {"enabled": True, "root": "./.cache/cas"}
+        store.update(self.test_data_manager.get_all_data().get("artifact_store", {}))
+        return store
+    
+    @property
+    def BROWSER_SERVER(self) -> Dict[str, Any]:
+        """共享浏览器服务配置，可通过环境变量 BROWSER_SERVER 覆盖 scope(off/session/machine)"""
+        server = {"scope": "off", "port": 9333, "startup_timeout": 30, "state_dir": "./reports"}
+        server.update(self.test_data_manager.get_all_data().get("browser_server", {}))
+        if os.getenv("BROWSER_SERVER"):
+            server["scope"] = os.getenv("BROWSER_SERVER")
+        return server
+    
+    @property
+    def CONTEXT_POOL(self) -> Dict[str, Any]:
+        """浏览器上下文池配置"""
+        pool = {"enabled": True, "size": 2, "max_uses": 50}
+        pool.update(self.test_data_manager.get_all_data().get("context_pool", {}))
+        return pool
+    
+    @property
+    def PERSISTENT_PROFILE(self) -> Dict[str, Any]:
+        """持久化浏览器配置目录（每个worker一个用户数据目录），可通过环境变量 PERSISTENT_PROFILE=on/off 覆盖"""
+        profile = {"enabled": False, "dir": "./.cache/browser_profiles", "max_mb": 1024, "max_age_days": 7}
+        profile.update(self.test_data_manager.get_all_data().get("persistent_profile", {}))
+        if os.getenv("PERSISTENT_PROFILE"):
+            profile["enabled"] = os.getenv("PERSISTENT_PROFILE").lower() in ("on", "true", "1")
+        return profile
+    
+    @property
+    def AUTH(self) -> Dict[str, Any]:
+        """登录态缓存配置: strategy(ui/api)、有效期、缓存目录、登录页面/接口及登录校验"""
+        auth = {"strategy": "ui", "ttl_seconds": 3600, "dir": "./.cache/auth", "login": {}, "api": {}, "check": {}}
+        auth.update(self.test_data_manager.get_all_data().get("auth", {}))
+        return auth
+    
+    @property
+    def ROUTING(self) -> Dict[str, Any]:
+        """请求路由配置（资源拦截/响应替换），可通过环境变量 ROUTING_PROFILE 覆盖默认配置"""
+        routing = {"default": None, "profiles": {}, "tests": {}, "pages": {}}
+        routing.update(self.test_data_manager.get_all_data().get("routing", {}))
+        if os.getenv("ROUTING_PROFILE"):
+            routing["default"] = os.getenv("ROUTING_PROFILE")
+        return routing
+    
+    @property
+    def HTTP_CACHE(self) -> Dict[str, Any]:
+        """HTTP响应磁盘缓存配置（默认关闭，可通过环境变量 HTTP_CACHE=on/off 覆盖；目录在 reports/ 之外）"""
+        cache = {"enabled": False, "dir": "./.cache/http_cache", "max_mb": 512,
+                 "resource_types": ["script", "stylesheet", "font", "image"]}
+        cache.update(self.test_data_manager.get_all_data().get("http_cache", {}))
+        if os.getenv("HTTP_CACHE"):
+            cache["enabled"] = os.getenv("HTTP_CACHE").lower() in ("on", "true", "1")
+        return cache
+    
+    @property
+    def HAR(self) -> Dict[str, Any]:
+        """
+        HAR录制回放配置，模式(off/record/replay)和未命中处理(abort/fallback)可通过环境变量 HAR_MODE / HAR_NOT_FOUND 覆盖
+        
+        HAR包含完整的请求/响应体、cookie和登录token，默认目录在 .cache/ 下（已在 .gitignore 中，不随CI归档）
+        """
+        har = {"mode": "off", "not_found": "abort", "dir": "./.cache/har"}
+        har.update(self.test_data_manager.get_all_data().get("har", {}))
+        if os.getenv("HAR_MODE"):
+            har["mode"] = os.getenv("HAR_MODE")
+        if os.getenv("HAR_NOT_FOUND"):
+            har["not_found"] = os.getenv("HAR_NOT_FOUND")
+        return har
+    
+    @property
+    def READINESS(self) -> Dict[str, Any]:
+        """页面就绪策略: default 默认策略，pages 为页面key对应的策略"""
+        readiness = {"default": {"type": "load_state", "state": "load"}, "pages": {}}
+        readiness.update(self.test_data_manager.get_all_data().get("readiness", {}))
+        return readiness
+    
+    @property
+    def MOCK_SERVER(self) -> Dict[str, Any]:
+        """本地模拟站点配置（仅mock环境配置），测试会话开始时自动启动"""
+        return dict(self.test_data_manager.get_all_data().get("mock_server", {}))
+    
     @property
     def TEST_DATA_PATH(self) -> str:
         """测试数据路径"""
-        return self.env_manager.get_test_data_path()
+        return self.env_manager.get_test_data_path(self.ENV)
     
     @property
     def REPORT_PATH(self) -> str:
         """报告路径"""
-        return self.env_manager.get_report_path()
+        return self.env_manager.get_report_path(self.ENV)
     
     @property
     def VIDEOS_PATH(self) -> str:
@@ -51,6 +243,11 @@ class Config:
         """截图路径"""
         return os.path.join(self.REPORT_PATH, "screenshots")
     
+    @property
+    def TRACES_PATH(self) -> str:
+        """Trace路径"""
+        return os.path.join(self.REPORT_PATH, "traces")
+    
     @property
     def LOG_PATH(self) -> str:
         """日志路径"""
@@ -59,7 +256,7 @@ class Config:
     @property
     def ENVIRONMENT_NAME(self) -> str:
         """环境名称"""
-        return self.env_manager.get_current_env()
+        return self.ENV
     
     def get_screenshot_path(self, filename: str) -> str:
         """获取截图文件路径"""
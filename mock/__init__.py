@@ -0,0 +1 @@
+# Mock package 
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+本地TeacherIn模拟站点 - 提供 pages/teacherin_page.py 用到的个人主页，用于离线测试和压测
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+USER_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/static/app.css">
+</head>
+<body>
+<div class="tabs">
+  <span id="star-course" onclick="showTab('star')">收藏的课程</span>
+  <span id="post-course" onclick="showTab('post')">发布的课程</span>
+</div>
+<input id="keyword" placeholder="搜索课程">
+<div id="content">个人主页</div>
+<ul id="courses">{courses}</ul>
+<div id="padding" hidden>{padding}</div>
+<script src="/static/app.js"></script>
+<script>
+function showTab(name) {{
+  document.getElementById('content').textContent = name === 'star' ? '收藏的课程列表' : '发布的课程列表';
+}}
+</script>
+</body>
+</html>
+"""
+
+STATIC_FILES = {
+    "/static/app.css": ("text/css; charset=utf-8", ".tabs span { margin-right: 16px; cursor: pointer; }\n"),
+    "/static/app.js": ("application/javascript; charset=utf-8", "window.__mockTeacherIn = true;\n"),
+}
+
+
+class MockTeacherInHandler(BaseHTTPRequestHandler):
+    """个人主页请求处理，查询参数 latency_ms / payload_kb / element_count 可覆盖站点配置"""
+    
+    server_version = "MockTeacherIn/1.0"
+    
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        knobs = {name: int(values[0]) for name, values in parse_qs(parsed.query).items()
+                 if name in ("latency_ms", "payload_kb", "element_count") and values[0].isdigit()}
+        latency_ms = knobs.get("latency_ms", self.server.latency_ms)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        
+        if parsed.path in STATIC_FILES:
+            content_type, content = STATIC_FILES[parsed.path]
+            self._send(content.encode("utf-8"), content_type, cache_control="public, max-age=3600")
+            return
+        if "/users/" not in parsed.path:
+            self.send_error(404)
+            return
+        
+        element_count = knobs.get("element_count", self.server.element_count)
+        payload_kb = knobs.get("payload_kb", self.server.payload_kb)
+        courses = "".join(f'<li class="course">课程 {index + 1}</li>' for index in range(element_count))
+        body = USER_PAGE_TEMPLATE.format(title=self.server.title, courses=courses,
+                                         padding="x" * (payload_kb * 1024)).encode("utf-8")
+        self._send(body, "text/html; charset=utf-8", cache_control="no-cache")
+    
+    def _send(self, body: bytes, content_type: str, cache_control: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # 压测时请求量大，不输出访问日志
+        pass
+
+
+class MockTeacherInServer:
+    """
+    本地TeacherIn模拟站点
+    
+    在后台线程运行，个人主页地址为 {base_url}/teacherin/users/<id>（路径带teacherin，与真实站点的URL校验一致）。
+    
+    Args:
+        title: 页面标题
+        latency_ms: 每个请求的响应延迟
+        payload_kb: 个人主页额外填充的字节数(KB)
+        element_count: 个人主页课程列表的元素数
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, title: str = "TeacherIn", latency_ms: int = 0,
+                 payload_kb: int = 0, element_count: int = 0):
+        self._server = ThreadingHTTPServer((host, port), MockTeacherInHandler)
+        self._server.daemon_threads = True
+        self._server.title = title
+        self._server.latency_ms = latency_ms
+        self._server.payload_kb = payload_kb
+        self._server.element_count = element_count
+        self._thread: Optional[threading.Thread] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MockTeacherInServer":
+        """从测试数据的 mock_server 配置创建"""
+        return cls(
+            host=data.get("host", "127.0.0.1"),
+            port=int(data.get("port", 0)),
+            title=data.get("title", "TeacherIn"),
+            latency_ms=int(data.get("latency_ms", 0)),
+            payload_kb=int(data.get("payload_kb", 0)),
+            element_count=int(data.get("element_count", 0))
+        )
+    
+    @property
+    def base_url(self) -> str:
+        """站点地址"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def user_page_url(self, user_id: str = "example_user_id") -> str:
+        """个人主页地址"""
+        return f"{self.base_url}/teacherin/users/{user_id}"
+    
+    def start(self) -> "MockTeacherInServer":
+        """启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-teacherin", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    """单独启动模拟站点"""
+    parser = argparse.ArgumentParser(description="本地TeacherIn模拟站点")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--title", default="TeacherIn")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--payload-kb", type=int, default=0)
+    parser.add_argument("--element-count", type=int, default=20)
+    args = parser.parse_args()
+    
+    server = MockTeacherInServer(args.host, args.port, args.title, args.latency_ms, args.payload_kb,
+                                 args.element_count)
+    with server:
+        print(f"🧪 模拟站点已启动: {server.user_page_url()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+异步基础页面类 - PO设计模式，基于 playwright.async_api
+
+方法与 BasePage 一致（均为协程），同样带 allure_step 步骤记录。继承自 BasePage，超时、选择器和日志
+复用 BasePage 的 operation/_verify_* 和 log_exceptions，这里只保留 await Playwright 调用的一层。
+同步页面对象可通过多继承复用为异步页面对象：
+
+    class AsyncTeacherInHomePage(TeacherInHomePage, AsyncBasePage):
+        pass
+"""
+import time
+from playwright.async_api import Page
+from pages.base_page import BasePage
+from utils.async_wait import AsyncWait
+from utils.logger import log, log_exceptions
+from utils.decorators import allure_step
+from utils.routing import get_routing_profiles
+
+
+class AsyncBasePage(BasePage):
+    """异步基础页面类"""
+    
+    # 步骤装饰器据此按异步步骤执行继承自同步页面对象的方法
+    is_async = True
+    
+    def __init__(self, page: Page, base_url: str = None):
+        super().__init__(page, base_url)
+        self.wait = AsyncWait(page)
+    
+    @allure_step("导航到页面", fail_on_false=True)
+    async def navigate_to(self, url: str = None, timeout: int = None) -> bool:
+        """导航到指定页面，按就绪策略等待页面可用"""
+        target_url = url or self.base_url
+        if not target_url:
+            log.error("未提供URL")
+            return False
+        log.info(f"导航到页面: {target_url}")
+        with self.operation("导航", "navigate", None, timeout, url=target_url) as operation:
+            # 导航和就绪等待共用一个超时，就绪等待只用剩余时间
+            end = time.monotonic() + operation.timeout / 1000
+            await get_routing_profiles().apply_for_url_async(self.page, target_url)
+            await self.page.goto(target_url, wait_until="commit", timeout=operation.timeout)
+            await self.get_readiness(target_url).wait_async(self.page, self._remaining_ms(end))
+            return True
+        return False
+    
+    @allure_step("点击元素", fail_on_false=True)
+    async def click(self, selector: str, timeout: int = None) -> bool:
+        """点击元素"""
+        with self.operation("点击元素", "click", selector, timeout) as operation:
+            await self.locate(selector).click(timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("输入文本", fail_on_false=True)
+    async def type_text(self, selector: str, text: str, timeout: int = None) -> bool:
+        """输入文本"""
+        with self.operation("输入文本", "type", selector, timeout) as operation:
+            operation.value = text
+            await self.locate(selector).fill(text, timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("获取元素文本")
+    async def get_text(self, selector: str, timeout: int = None) -> str:
+        """获取元素文本"""
+        with self.operation("获取文本", "get_text", selector, timeout) as operation:
+            # inner_text 自带等待元素可见，一次协议往返
+            operation.value = await self.locate(selector).inner_text(timeout=operation.timeout)
+            return operation.value
+        return ""
+    
+    @allure_step("等待元素出现")
+    async def wait_for_element(self, selector: str, timeout: int = None) -> bool:
+        """等待元素出现"""
+        with self.operation("等待元素出现", "wait_for_selector", selector, timeout) as operation:
+            await self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("验证页面标题", fail_on_false=True)
+    async def verify_title(self, expected_title: str) -> bool:
+        """验证页面标题"""
+        with log_exceptions("页面标题验证"):
+            return self._verify_title(await self.page.title(), expected_title)
+        return False
+    
+    @allure_step("获取页面标题")
+    async def get_title(self) -> str:
+        """获取页面标题"""
+        return await self.page.title()
+    
+    @allure_step("检查元素可见性")
+    async def is_element_visible(self, selector: str, timeout: int = None) -> bool:
+        """检查元素是否可见"""
+        with self.operation("检查元素可见性", "is_visible", selector, timeout) as operation:
+            await self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("等待页面加载", fail_on_false=True)
+    async def wait_for_page_load(self, timeout: int = None) -> bool:
+        """按就绪策略等待页面加载"""
+        with self.operation("等待页面加载", "page_load", None, timeout) as operation:
+            await self.get_readiness().wait_async(self.page, operation.timeout)
+            return True
+        return False
+    
+    @allure_step("获取当前URL")
+    async def get_current_url(self) -> str:
+        """获取当前页面URL"""
+        return self.page.url
+    
+    @allure_step("验证URL包含", fail_on_false=True)
+    async def verify_url_contains(self, expected_text: str) -> bool:
+        """验证URL包含指定文本"""
+        return self._verify_url_contains(self.page.url, expected_text)
+    
+    @allure_step("等待并点击元素", fail_on_false=True)
+    async def wait_and_click(self, selector: str, timeout: int = None) -> bool:
+        """等待元素出现并点击"""
+        with self.operation("等待并点击元素", "click", selector, timeout) as operation:
+            await self.locate(selector).click(timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("等待并输入文本", fail_on_false=True)
+    async def wait_and_type(self, selector: str, text: str, timeout: int = None) -> bool:
+        """等待元素出现并输入文本"""
+        with self.operation("等待并输入文本", "type", selector, timeout) as operation:
+            operation.value = text
+            await self.locate(selector).fill(text, timeout=operation.timeout)
+            return True
+        return False
+    
+    # 新增的通用方法
+    @allure_step("点击文本元素", fail_on_false=True)
+    async def click_text_element(self, text: str, element_type: str = "span", timeout: int = None) -> bool:
+        """点击包含指定文本的元素"""
+        return await self.wait_and_click(self.text_selector(text, element_type), timeout)
+    
+    @allure_step("验证元素存在", fail_on_false=True)
+    async def verify_element_exists(self, selector: str, timeout: int = None) -> bool:
+        """验证元素存在"""
+        with self.operation("元素存在验证", "wait_for_selector", selector, timeout) as operation:
+            await self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
+            return True
+        return False
+    
+    @allure_step("验证文本元素存在", fail_on_false=True)
+    async def verify_text_element_exists(self, text: str, element_type: str = "span", timeout: int = None) -> bool:
+        """验证包含指定文本的元素存在"""
+        return await self.verify_element_exists(self.text_selector(text, element_type), timeout)
+    
+    @allure_step("验证页面内容包含", fail_on_false=True)
+    async def verify_page_content_contains(self, expected_text: str) -> bool:
+        """验证页面内容包含指定文本"""
+        with log_exceptions("页面内容验证"):
+            return self._verify_content_contains(await self.page.content(), expected_text)
+        return False
+    
+    @allure_step("验证页面标题包含", fail_on_false=True)
+    async def verify_title_contains(self, expected_text: str) -> bool:
+        """验证页面标题包含指定文本"""
+        with log_exceptions("页面标题验证"):
+            return self._verify_title_contains(await self.page.title(), expected_text)
+        return False
+    
+    @allure_step("点击并验证", fail_on_false=True)
+    async def click_and_verify(self, selector: str, verification_method: str = None, verification_data: str = None, timeout: int = None) -> bool:
+        """点击元素并进行验证"""
+        with log_exceptions("点击并验证", selector):
+            if not await self.wait_and_click(selector, timeout):
+                return False
+            verify = self._verification(verification_method, verification_data)
+            if verify is None:
+                log.info("点击成功，无需额外验证")
+                return True
+            return await verify(verification_data)
+        return False
+    
+    @allure_step("点击文本元素并验证", fail_on_false=True)
+    async def click_text_and_verify(self, text: str, element_type: str = "span", verification_method: str = None, verification_data: str = None, timeout: int = None) -> bool:
+        """点击文本元素并进行验证"""
+        return await self.click_and_verify(self.text_selector(text, element_type), verification_method, verification_data, timeout)
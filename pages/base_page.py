@@ -1,94 +1,182 @@
 """
 基础页面类 - PO设计模式
 """
+import time
 import allure
-from playwright.sync_api import Page
-from utils.logger import log
+from contextlib import contextmanager
+from typing import Any
+from playwright.sync_api import Page, Locator
+from utils.logger import log, log_exceptions
 from utils.decorators import allure_step
+from utils.routing import get_routing_profiles
+from utils.readiness import Readiness, get_readiness_registry
+from utils.adaptive_timeout import get_adaptive_timeouts
+
+
+class PageOperation:
+    """BasePage.operation 产出的单次页面操作"""
+    
+    def __init__(self, timeout: int):
+        # 本次操作使用的超时时间(毫秒)
+        self.timeout = timeout
+        # 成功日志中附带的值（输入的文本、获取的文本）
+        self.value: Any = None
 
 
 class BasePage:
-    """基础页面类"""
+    """
+    基础页面类
+    
+    超时、选择器和日志在 operation/_verify_* 和 log_exceptions 中实现，与 AsyncBasePage 共用，
+    各操作方法只保留对 Playwright 的调用，AsyncBasePage 中同名方法只多出 await。
+    """
+    
+    # 页面就绪策略：测试数据 readiness.pages 中的页面key或策略配置，为None时按URL匹配页面key
+    readiness = None
     
     def __init__(self, page: Page, base_url: str = None):
         self.page = page
         self.base_url = base_url
     
-    @allure_step("导航到页面")
-    def navigate_to(self, url: str = None) -> bool:
-        """导航到指定页面"""
-        try:
-            target_url = url or self.base_url
-            if not target_url:
-                log.error("未提供URL")
-                return False
-            
-            log.info(f"导航到页面: {target_url}")
-            self.page.goto(target_url)
-            self.page.wait_for_load_state("networkidle")
+    def get_readiness(self, url: str = None) -> Readiness:
+        """当前页面对象的就绪策略"""
+        return get_readiness_registry().resolve(self.readiness, url or self.page.url)
+    
+    def locate(self, selector: str) -> Locator:
+        """
+        元素定位器（取第一个匹配，与原 page.click/page.fill 的非严格匹配一致）
+        
+        定位器在客户端创建，click/fill/inner_text/wait_for 自带等待，每个操作只有一次协议往返，
+        不再先 wait_for_selector 再按选择器重新查找一遍。AsyncBasePage 中返回异步定位器。
+        """
+        return self.page.locator(selector).first
+    
+    def measure_timeout(self, action: str, selector: str = None, timeout: int = None, url: str = None):
+        """
+        计时执行一次页面操作，产出使用的超时时间（未指定时按历史耗时学习，见 utils/adaptive_timeout.py）
+        
+        Args:
+            action: 操作名
+            selector: 元素选择器
+            timeout: 调用方显式指定的超时(毫秒)
+            url: 页面URL，默认为当前页面
+        """
+        return get_adaptive_timeouts().measure(action, selector, url or self.page.url, timeout)
+    
+    @contextmanager
+    def operation(self, description: str, action: str, selector: str = None, timeout: int = None, url: str = None):
+        """
+        计时执行一次页面操作（见 measure_timeout），产出 PageOperation
+        
+        成功时记录"{description}成功"，异常时记录"{description}失败"并吞掉异常。
+        """
+        target = selector or url or self.page.url
+        with log_exceptions(description, target):
+            with self.measure_timeout(action, selector, timeout, url) as timeout:
+                operation = PageOperation(timeout)
+                yield operation
+            log.info(f"{description}成功: {target}" + (f" = {operation.value}" if operation.value is not None else ""))
+    
+    @staticmethod
+    def text_selector(text: str, element_type: str = "span") -> str:
+        """包含指定文本的元素的XPath"""
+        return f"//{element_type}[contains(text(), '{text}') or contains(., '{text}')]"
+    
+    @staticmethod
+    def _verify(passed: bool, description: str, detail: str) -> bool:
+        """记录验证结果"""
+        if passed:
+            log.info(f"{description}成功: {detail}")
             return True
-        except Exception as e:
-            log.error(f"导航失败: {e}")
+        log.error(f"{description}失败: {detail}")
+        return False
+    
+    def _verify_title(self, actual_title: str, expected_title: str) -> bool:
+        return self._verify(expected_title in actual_title, "页面标题验证",
+                            f"期望: {expected_title}，实际: {actual_title}")
+    
+    def _verify_title_contains(self, actual_title: str, expected_text: str) -> bool:
+        return self._verify(expected_text.lower() in actual_title.lower(), "页面标题验证",
+                            f"期望包含: {expected_text}，实际: {actual_title}")
+    
+    def _verify_url_contains(self, current_url: str, expected_text: str) -> bool:
+        return self._verify(expected_text in current_url, "URL验证", f"期望包含: {expected_text}，实际: {current_url}")
+    
+    def _verify_content_contains(self, page_content: str, expected_text: str) -> bool:
+        return self._verify(expected_text in page_content, "页面内容验证", f"期望包含: {expected_text}")
+    
+    def _verification(self, verification_method: str, verification_data: str):
+        """click_and_verify 使用的验证方法，无需验证时返回None"""
+        if not verification_data:
+            return None
+        return {
+            "url_contains": self.verify_url_contains,
+            "title_contains": self.verify_title_contains,
+            "content_contains": self.verify_page_content_contains
+        }.get(verification_method)
+    
+    @staticmethod
+    def _remaining_ms(end: float) -> float:
+        """距截止时间(time.monotonic)的剩余毫秒数"""
+        return (end - time.monotonic()) * 1000
+    
+    @allure_step("导航到页面", fail_on_false=True)
+    def navigate_to(self, url: str = None, timeout: int = None) -> bool:
+        """导航到指定页面，按就绪策略等待页面可用"""
+        target_url = url or self.base_url
+        if not target_url:
+            log.error("未提供URL")
             return False
+        log.info(f"导航到页面: {target_url}")
+        with self.operation("导航", "navigate", None, timeout, url=target_url) as operation:
+            # 导航和就绪等待共用一个超时，就绪等待只用剩余时间
+            end = time.monotonic() + operation.timeout / 1000
+            get_routing_profiles().apply_for_url(self.page, target_url)
+            self.page.goto(target_url, wait_until="commit", timeout=operation.timeout)
+            self.get_readiness(target_url).wait(self.page, self._remaining_ms(end))
+            return True
+        return False
     
-    @allure_step("点击元素")
-    def click(self, selector: str, timeout: int = 10000) -> bool:
+    @allure_step("点击元素", fail_on_false=True)
+    def click(self, selector: str, timeout: int = None) -> bool:
         """点击元素"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            self.page.click(selector)
-            log.info(f"点击元素成功: {selector}")
+        with self.operation("点击元素", "click", selector, timeout) as operation:
+            self.locate(selector).click(timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"点击元素失败: {selector}, 错误: {e}")
-            return False
+        return False
     
-    @allure_step("输入文本")
-    def type_text(self, selector: str, text: str, timeout: int = 10000) -> bool:
+    @allure_step("输入文本", fail_on_false=True)
+    def type_text(self, selector: str, text: str, timeout: int = None) -> bool:
         """输入文本"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            self.page.fill(selector, text)
-            log.info(f"输入文本成功: {selector} = {text}")
+        with self.operation("输入文本", "type", selector, timeout) as operation:
+            operation.value = text
+            self.locate(selector).fill(text, timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"输入文本失败: {selector}, 错误: {e}")
-            return False
+        return False
     
     @allure_step("获取元素文本")
-    def get_text(self, selector: str, timeout: int = 10000) -> str:
+    def get_text(self, selector: str, timeout: int = None) -> str:
         """获取元素文本"""
-        try:
-            element = self.page.wait_for_selector(selector, timeout=timeout)
-            text = element.text_content()
-            log.info(f"获取文本成功: {selector} = {text}")
-            return text
-        except Exception as e:
-            log.error(f"获取文本失败: {selector}, 错误: {e}")
-            return ""
+        with self.operation("获取文本", "get_text", selector, timeout) as operation:
+            # inner_text 自带等待元素可见，一次协议往返
+            operation.value = self.locate(selector).inner_text(timeout=operation.timeout)
+            return operation.value
+        return ""
     
     @allure_step("等待元素出现")
-    def wait_for_element(self, selector: str, timeout: int = 10000) -> bool:
+    def wait_for_element(self, selector: str, timeout: int = None) -> bool:
         """等待元素出现"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            log.info(f"元素出现: {selector}")
+        with self.operation("等待元素出现", "wait_for_selector", selector, timeout) as operation:
+            self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"元素未出现: {selector}, 错误: {e}")
-            return False
+        return False
     
-    @allure_step("验证页面标题")
+    @allure_step("验证页面标题", fail_on_false=True)
     def verify_title(self, expected_title: str) -> bool:
         """验证页面标题"""
-        try:
-            actual_title = self.page.title()
-            assert expected_title in actual_title, f"页面标题不匹配，期望: {expected_title}，实际: {actual_title}"
-            log.info(f"页面标题验证成功: {actual_title}")
-            return True
-        except Exception as e:
-            log.error(f"页面标题验证失败: {e}")
-            return False
+        with log_exceptions("页面标题验证"):
+            return self._verify_title(self.page.title(), expected_title)
+        return False
     
     @allure_step("获取页面标题")
     def get_title(self) -> str:
@@ -96,150 +184,95 @@ class BasePage:
         return self.page.title()
     
     @allure_step("检查元素可见性")
-    def is_element_visible(self, selector: str, timeout: int = 10000) -> bool:
+    def is_element_visible(self, selector: str, timeout: int = None) -> bool:
         """检查元素是否可见"""
-        try:
-            element = self.page.wait_for_selector(selector, timeout=timeout)
-            return element.is_visible()
-        except Exception as e:
-            log.error(f"检查元素可见性失败: {selector}, 错误: {e}")
-            return False
+        with self.operation("检查元素可见性", "is_visible", selector, timeout) as operation:
+            self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
+            return True
+        return False
     
-    @allure_step("等待页面加载")
-    def wait_for_page_load(self, timeout: int = 30000) -> bool:
-        """等待页面完全加载"""
-        try:
-            self.page.wait_for_load_state("networkidle", timeout=timeout)
+    @allure_step("等待页面加载", fail_on_false=True)
+    def wait_for_page_load(self, timeout: int = None) -> bool:
+        """按就绪策略等待页面加载"""
+        with self.operation("等待页面加载", "page_load", None, timeout) as operation:
+            self.get_readiness().wait(self.page, operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"等待页面加载失败: {e}")
-            return False
+        return False
     
     @allure_step("获取当前URL")
     def get_current_url(self) -> str:
         """获取当前页面URL"""
         return self.page.url
     
-    @allure_step("验证URL包含")
+    @allure_step("验证URL包含", fail_on_false=True)
     def verify_url_contains(self, expected_text: str) -> bool:
         """验证URL包含指定文本"""
-        try:
-            current_url = self.page.url
-            assert expected_text in current_url, f"URL不包含期望文本，期望: {expected_text}，实际: {current_url}"
-            log.info(f"URL验证成功: {current_url}")
-            return True
-        except Exception as e:
-            log.error(f"URL验证失败: {e}")
-            return False
+        return self._verify_url_contains(self.page.url, expected_text)
     
-    @allure_step("等待并点击元素")
-    def wait_and_click(self, selector: str, timeout: int = 10000) -> bool:
+    @allure_step("等待并点击元素", fail_on_false=True)
+    def wait_and_click(self, selector: str, timeout: int = None) -> bool:
         """等待元素出现并点击"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            self.page.click(selector)
-            log.info(f"等待并点击元素成功: {selector}")
+        with self.operation("等待并点击元素", "click", selector, timeout) as operation:
+            self.locate(selector).click(timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"等待并点击元素失败: {selector}, 错误: {e}")
-            return False
+        return False
     
-    @allure_step("等待并输入文本")
-    def wait_and_type(self, selector: str, text: str, timeout: int = 10000) -> bool:
+    @allure_step("等待并输入文本", fail_on_false=True)
+    def wait_and_type(self, selector: str, text: str, timeout: int = None) -> bool:
         """等待元素出现并输入文本"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            self.page.fill(selector, text)
-            log.info(f"等待并输入文本成功: {selector} = {text}")
+        with self.operation("等待并输入文本", "type", selector, timeout) as operation:
+            operation.value = text
+            self.locate(selector).fill(text, timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"等待并输入文本失败: {selector}, 错误: {e}")
-            return False
+        return False
     
     # 新增的通用方法
-    @allure_step("点击文本元素")
-    def click_text_element(self, text: str, element_type: str = "span", timeout: int = 10000) -> bool:
+    @allure_step("点击文本元素", fail_on_false=True)
+    def click_text_element(self, text: str, element_type: str = "span", timeout: int = None) -> bool:
         """点击包含指定文本的元素"""
-        try:
-            selector = f"//{element_type}[contains(text(), '{text}') or contains(., '{text}')]"
-            return self.wait_and_click(selector, timeout)
-        except Exception as e:
-            log.error(f"点击文本元素失败: {text}, 错误: {e}")
-            return False
+        return self.wait_and_click(self.text_selector(text, element_type), timeout)
     
-    @allure_step("验证元素存在")
-    def verify_element_exists(self, selector: str, timeout: int = 10000) -> bool:
+    @allure_step("验证元素存在", fail_on_false=True)
+    def verify_element_exists(self, selector: str, timeout: int = None) -> bool:
         """验证元素存在"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            log.info(f"元素存在验证成功: {selector}")
+        with self.operation("元素存在验证", "wait_for_selector", selector, timeout) as operation:
+            self.locate(selector).wait_for(state="visible", timeout=operation.timeout)
             return True
-        except Exception as e:
-            log.error(f"元素存在验证失败: {selector}, 错误: {e}")
-            return False
+        return False
     
-    @allure_step("验证文本元素存在")
-    def verify_text_element_exists(self, text: str, element_type: str = "span", timeout: int = 10000) -> bool:
+    @allure_step("验证文本元素存在", fail_on_false=True)
+    def verify_text_element_exists(self, text: str, element_type: str = "span", timeout: int = None) -> bool:
         """验证包含指定文本的元素存在"""
-        try:
-            selector = f"//{element_type}[contains(text(), '{text}') or contains(., '{text}')]"
-            return self.verify_element_exists(selector, timeout)
-        except Exception as e:
-            log.error(f"验证文本元素存在失败: {text}, 错误: {e}")
-            return False
+        return self.verify_element_exists(self.text_selector(text, element_type), timeout)
     
-    @allure_step("验证页面内容包含")
+    @allure_step("验证页面内容包含", fail_on_false=True)
     def verify_page_content_contains(self, expected_text: str) -> bool:
         """验证页面内容包含指定文本"""
-        try:
-            page_content = self.page.content()
-            assert expected_text in page_content, f"页面内容不包含期望文本: {expected_text}"
-            log.info(f"页面内容验证成功: {expected_text}")
-            return True
-        except Exception as e:
-            log.error(f"页面内容验证失败: {e}")
-            return False
+        with log_exceptions("页面内容验证"):
+            return self._verify_content_contains(self.page.content(), expected_text)
+        return False
     
-    @allure_step("验证页面标题包含")
+    @allure_step("验证页面标题包含", fail_on_false=True)
     def verify_title_contains(self, expected_text: str) -> bool:
         """验证页面标题包含指定文本"""
-        try:
-            actual_title = self.page.title()
-            assert expected_text.lower() in actual_title.lower(), f"页面标题不包含期望文本，期望: {expected_text}，实际: {actual_title}"
-            log.info(f"页面标题验证成功: {actual_title}")
-            return True
-        except Exception as e:
-            log.error(f"页面标题验证失败: {e}")
-            return False
+        with log_exceptions("页面标题验证"):
+            return self._verify_title_contains(self.page.title(), expected_text)
+        return False
     
-    @allure_step("点击并验证")
-    def click_and_verify(self, selector: str, verification_method: str = None, verification_data: str = None, timeout: int = 10000) -> bool:
+    @allure_step("点击并验证", fail_on_false=True)
+    def click_and_verify(self, selector: str, verification_method: str = None, verification_data: str = None, timeout: int = None) -> bool:
         """点击元素并进行验证"""
-        try:
-            # 点击元素
+        with log_exceptions("点击并验证", selector):
             if not self.wait_and_click(selector, timeout):
                 return False
-            
-            # 根据验证方法进行验证
-            if verification_method == "url_contains" and verification_data:
-                return self.verify_url_contains(verification_data)
-            elif verification_method == "title_contains" and verification_data:
-                return self.verify_title_contains(verification_data)
-            elif verification_method == "content_contains" and verification_data:
-                return self.verify_page_content_contains(verification_data)
-            else:
+            verify = self._verification(verification_method, verification_data)
+            if verify is None:
                 log.info("点击成功，无需额外验证")
                 return True
-        except Exception as e:
-            log.error(f"点击并验证失败: {selector}, 错误: {e}")
-            return False
+            return verify(verification_data)
+        return False
     
-    @allure_step("点击文本元素并验证")
-    def click_text_and_verify(self, text: str, element_type: str = "span", verification_method: str = None, verification_data: str = None, timeout: int = 10000) -> bool:
+    @allure_step("点击文本元素并验证", fail_on_false=True)
+    def click_text_and_verify(self, text: str, element_type: str = "span", verification_method: str = None, verification_data: str = None, timeout: int = None) -> bool:
         """点击文本元素并进行验证"""
-        try:
-            selector = f"//{element_type}[contains(text(), '{text}') or contains(., '{text}')]"
-            return self.click_and_verify(selector, verification_method, verification_data, timeout)
-        except Exception as e:
-            log.error(f"点击文本元素并验证失败: {text}, 错误: {e}")
-            return False 
\ No newline at end of file
+        return self.click_and_verify(self.text_selector(text, element_type), verification_method, verification_data, timeout)
@@ -4,6 +4,7 @@ TeacherIn首页页面对象 - PO设计模式
 import allure
 from playwright.sync_api import Page
 from pages.base_page import BasePage
+from pages.async_base_page import AsyncBasePage
 from utils.logger import log
 from utils.decorators import allure_step
 
@@ -11,28 +12,30 @@ from utils.decorators import allure_step
 TeacherIn个人主页页面对象 - PO设计模式
 """
 class TeacherInHomePage(BasePage):
+    readiness = "teacherin_user_page"
+    
     def __init__(self, page: Page, base_url: str, selectors: dict, target_data: dict = None):
         super().__init__(page, base_url)
         self.star_course_text = selectors["star_course"]
         self.target_data = target_data or {}
         log.info(f"初始化TeacherIn个人主页，URL: {base_url}")
 
-    @allure_step("打开TeacherIn个人主页")
+    @allure_step("打开TeacherIn个人主页", fail_on_false=True)
     def open_homepage(self) -> bool:
         return self.navigate_to()
 
-    @allure_step("点击收藏的课程")
+    @allure_step("点击收藏的课程", fail_on_false=True)
     def click_star_course(self) -> bool:
         """使用通用方法点击文本元素"""
         return self.click_text_element(self.star_course_text)
 
-    @allure_step("验证主页元素")
+    @allure_step("验证主页元素", fail_on_false=True)
     def verify_homepage_elements(self) -> bool:
         """使用通用方法验证页面标题"""
         expected_title = self.target_data.get("homepage_title", "TeacherIn")
         return self.verify_title_contains(expected_title)
 
-    @allure_step("验证首页标题")
+    @allure_step("验证首页标题", fail_on_false=True)
     def verify_title_contains(self, expected_title: str) -> bool:
         """验证首页标题包含指定文本"""
         return super().verify_title_contains(expected_title)
@@ -47,18 +50,28 @@ class TeacherInEducationPage(BasePage):
         self.target_data = target_data or {}
         log.info("无需初始化页面，直接点击发布的课程")
 
-    @allure_step("点击发布的课程")
+    @allure_step("点击发布的课程", fail_on_false=True)
     def click_post_course(self) -> bool:
         """使用通用方法点击文本元素"""
         return self.click_text_element(self.post_course_text)
 
-    @allure_step("验证个人主页")
+    @allure_step("验证个人主页", fail_on_false=True)
     def verify_post_course_page(self) -> bool:
         """使用通用方法验证页面内容"""
         expected_content = self.target_data.get("core_literacy_content", self.post_course_text)
         return self.verify_page_content_contains(expected_content)
 
-    @allure_step("验证页面内容包含")
+    @allure_step("验证页面内容包含", fail_on_false=True)
     def verify_page_content_contains(self, expected_content: str) -> bool:
         """验证页面内容包含指定文本"""
-        return super().verify_page_content_contains(expected_content) 
\ No newline at end of file
+        return super().verify_page_content_contains(expected_content)
+
+"""
+异步页面对象 - 复用同步页面对象的步骤，基类方法替换为 AsyncBasePage 的协程版本
+"""
+class AsyncTeacherInHomePage(TeacherInHomePage, AsyncBasePage):
+    """TeacherIn个人主页（异步）"""
+
+
+class AsyncTeacherInEducationPage(TeacherInEducationPage, AsyncBasePage):
+    """TeacherIn个人主页发布的课程（异步）"""
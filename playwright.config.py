@@ -4,6 +4,9 @@ Playwright配置文件
 from playwright.sync_api import Playwright, sync_playwright, expect
 import os
 from config.config import Config
+from utils.browser_server import get_browser_server
+from utils.persistent_profile import get_persistent_profile
+from utils.adaptive_timeout import get_adaptive_timeouts
 
 def run(playwright: Playwright) -> None:
     """运行配置"""
@@ -12,8 +15,38 @@ def run(playwright: Playwright) -> None:
     # 获取浏览器类型，默认为 chromium
     browser_type = os.getenv("BROWSER", "chromium")
     
+    video_policy = config.VIDEO_POLICY
+    record_video = not config.HEADLESS and video_policy["retention"] != "off"
+    context_args = {
+        "viewport": {
+            "width": 1920,
+            "height": 1080
+        },
+        "locale": "zh-CN",  # 设置中文语言环境
+        "extra_http_headers": {
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
+        },
+        "record_video_dir": "./reports/videos" if record_video else None,
+        "record_video_size": video_policy["size"]
+    }
+    
+    # 启用持久化配置目录时直接启动持久化上下文（没有单独的Browser对象，browser为None）
+    profile = get_persistent_profile(browser_type)
+    if profile is not None:
+        launcher = getattr(playwright, browser_type, playwright.chromium)
+        context = profile.launch(launcher, {"headless": config.HEADLESS, "slow_mo": 0}, context_args)
+        page = context.pages[0] if context.pages else context.new_page()
+        page.set_default_timeout(get_adaptive_timeouts().page_default())
+        return context.browser, context, page
+    
+    # 启用共享浏览器服务时直接连接，不再单独启动浏览器
+    server = get_browser_server()
+    
     # 启动浏览器
-    if browser_type == "chromium":
+    if browser_type == "chromium" and server is not None:
+        endpoint = server.ensure_running(playwright.chromium.executable_path)
+        browser = playwright.chromium.connect_over_cdp(endpoint)
+    elif browser_type == "chromium":
         browser = playwright.chromium.launch(
             headless=config.HEADLESS,
             slow_mo=0
@@ -35,24 +68,13 @@ def run(playwright: Playwright) -> None:
         )
     
     # 创建上下文
-    context = browser.new_context(
-        viewport={
-            "width": 1920,
-            "height": 1080
-        },
-        locale="zh-CN",  # 设置中文语言环境
-        extra_http_headers={
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
-        },
-        record_video_dir="./reports/videos" if not config.HEADLESS else None,
-        record_video_size={"width": 1920, "height": 1080}
-    )
+    context = browser.new_context(**context_args)
     
     # 创建页面
     page = context.new_page()
     
     # 设置超时
-    page.set_default_timeout(config.TIMEOUT * 1000)
+    page.set_default_timeout(get_adaptive_timeouts().page_default())
     
     return browser, context, page
 
@@ -70,4 +92,5 @@ if __name__ == "__main__":
             print(f"页面标题: {page.title()}")
         finally:
             context.close()
-            browser.close() 
\ No newline at end of file
+            if browser is not None:
+                browser.close() 
\ No newline at end of file
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压测模式 - 用现有页面对象驱动N个并发虚拟用户
+
+虚拟用户是分布在若干浏览器进程中的异步页面，复用 TeacherInHomePage / TeacherInEducationPage
+（通过 AsyncTeacherIn* 异步版本），按 allure_step 统计每个步骤的 p50/p95/p99 耗时和吞吐量。
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+FLOWS = {}
+
+
+def flow(name):
+    """注册压测流程"""
+    def decorator(func):
+        FLOWS[name] = func
+        return func
+    return decorator
+
+
+@flow("teacherin_multi_page")
+async def teacherin_multi_page(page, data):
+    """重放 TestTeacherInNavigation.test_teacherin_multi_page"""
+    from pages.teacherin_page import AsyncTeacherInHomePage, AsyncTeacherInEducationPage
+    
+    home_page = AsyncTeacherInHomePage(page, base_url=data["url"], selectors=data["selectors"],
+                                       target_data=data["target"])
+    education_page = AsyncTeacherInEducationPage(page, selectors=data["selectors"], target_data=data["target"])
+    
+    # 步骤1: 首页操作
+    if not (await home_page.open_homepage() and await home_page.verify_homepage_elements()
+            and await home_page.click_star_course()):
+        return False
+    # 步骤2: 校外教育页面操作
+    if not (await education_page.click_post_course() and await education_page.verify_post_course_page()):
+        return False
+    # 步骤3: 通用断言
+    return data["target"].get("url_contains", "teacherin") in await education_page.get_current_url()
+
+
+def start_delays(users, ramp_up, profile, step_users):
+    """
+    各虚拟用户的启动延迟(秒)
+    
+    instant: 同时启动 / linear: 在ramp_up秒内匀速启动 / step: 每批step_users个用户，批次均匀分布在ramp_up秒内
+    """
+    if profile == "instant" or ramp_up <= 0 or users <= 1:
+        return [0.0] * users
+    if profile == "step":
+        batches = math.ceil(users / step_users)
+        interval = ramp_up / max(batches - 1, 1)
+        return [(index // step_users) * interval for index in range(users)]
+    return [index * ramp_up / (users - 1) for index in range(users)]
+
+
+async def virtual_user(index, browser, context_args, flow_func, data, delay, deadline, iterations, results):
+    """单个虚拟用户：按启动延迟加入，循环执行流程直到时间或次数用完"""
+    await asyncio.sleep(delay)
+    context = await browser.new_context(**context_args)
+    page = await context.new_page()
+    try:
+        count = 0
+        while time.perf_counter() < deadline and (not iterations or count < iterations):
+            start = time.perf_counter()
+            try:
+                passed = bool(await flow_func(page, data))
+            except Exception as e:
+                print(f"⚠️ 虚拟用户{index} 执行失败: {e}")
+                passed = False
+            results.append({"user": index, "duration": time.perf_counter() - start, "passed": passed})
+            count += 1
+    finally:
+        await context.close()
+
+
+async def run_load(args, data):
+    """启动浏览器进程并分配虚拟用户"""
+    from playwright.async_api import async_playwright
+    
+    context_args = {
+        "viewport": {"width": 1280, "height": 720},
+        "ignore_https_errors": True,
+        "locale": "zh-CN",
+        "extra_http_headers": {"Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"}
+    }
+    flow_func = FLOWS[args.flow]
+    delays = start_delays(args.users, args.ramp_up, args.ramp_profile, args.step_users)
+    results = []
+    
+    async with async_playwright() as playwright:
+        browsers = await asyncio.gather(*(
+            playwright.chromium.launch(headless=not args.headed) for _ in range(args.browsers)
+        ))
+        started_at = time.perf_counter()
+        deadline = started_at + args.ramp_up + args.duration
+        try:
+            await asyncio.gather(*(
+                virtual_user(index, browsers[index % len(browsers)], context_args, flow_func, data,
+                             delays[index], deadline, args.iterations, results)
+                for index in range(args.users)
+            ))
+        finally:
+            elapsed = time.perf_counter() - started_at
+            await asyncio.gather(*(browser.close() for browser in browsers))
+    return results, elapsed
+
+
+def build_report(args, results, elapsed, step_summary):
+    """汇总流程和步骤统计"""
+    from utils.step_middleware import percentile
+    
+    durations = sorted(item["duration"] for item in results)
+    steps = {
+        name: {**stats, "throughput": stats["count"] / elapsed if elapsed else 0.0}
+        for name, stats in step_summary.items()
+    }
+    return {
+        "flow": args.flow,
+        "env": args.env,
+        "users": args.users,
+        "browsers": args.browsers,
+        "ramp_up": args.ramp_up,
+        "ramp_profile": args.ramp_profile,
+        "elapsed": elapsed,
+        "iterations": {
+            "count": len(results),
+            "failed": sum(1 for item in results if not item["passed"]),
+            "throughput": len(results) / elapsed if elapsed else 0.0,
+            "p50": percentile(durations, 50) * 1000,
+            "p95": percentile(durations, 95) * 1000,
+            "p99": percentile(durations, 99) * 1000
+        },
+        "steps": steps
+    }
+
+
+def print_report(report):
+    """输出统计表"""
+    iterations = report["iterations"]
+    print(f"\n📊 压测结果: {report['flow']}  虚拟用户 {report['users']}  浏览器 {report['browsers']}  "
+          f"耗时 {report['elapsed']:.1f}s")
+    print(f"流程: {iterations['count']} 次，失败 {iterations['failed']} 次，吞吐量 {iterations['throughput']:.2f}/s，"
+          f"p50 {iterations['p50']:.0f}ms  p95 {iterations['p95']:.0f}ms  p99 {iterations['p99']:.0f}ms")
+    print(f"\n{'步骤':<24}{'次数':>8}{'失败':>8}{'吞吐量/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for name, stats in sorted(report["steps"].items(), key=lambda item: -item[1]["p95"]):
+        print(f"{name:<24}{stats['count']:>8}{stats['failed']:>8}{stats['throughput']:>10.2f}"
+              f"{stats['p50']:>10.0f}{stats['p95']:>10.0f}{stats['p99']:>10.0f}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="TI-WebUI压测模式 - 复用页面对象的并发虚拟用户")
+    parser.add_argument("--env", choices=["dev", "test", "prod", "mock"], default="test", help="测试环境")
+    parser.add_argument("--flow", choices=sorted(FLOWS), default="teacherin_multi_page", help="压测流程")
+    parser.add_argument("--users", type=int, default=10, help="并发虚拟用户数")
+    parser.add_argument("--browsers", type=int, default=2, help="浏览器进程数，虚拟用户轮流分配")
+    parser.add_argument("--duration", type=float, default=60, help="全部用户启动后的持续时间(秒)")
+    parser.add_argument("--iterations", type=int, default=0, help="每个用户最多执行次数，0为不限")
+    parser.add_argument("--ramp-up", type=float, default=0, help="用户启动时间窗口(秒)")
+    parser.add_argument("--ramp-profile", choices=["instant", "linear", "step"], default="linear", help="启动方式")
+    parser.add_argument("--step-users", type=int, default=5, help="step方式每批启动的用户数")
+    parser.add_argument("--mock", action="store_true", help="压测本地模拟站点而非真实站点")
+    parser.add_argument("--mock-latency", type=int, help="模拟站点响应延迟(毫秒)，默认取mock环境配置")
+    parser.add_argument("--mock-payload-kb", type=int, help="模拟站点个人主页填充大小(KB)")
+    parser.add_argument("--mock-elements", type=int, help="模拟站点个人主页课程列表元素数")
+    parser.add_argument("--headed", action="store_true", help="有头模式")
+    args = parser.parse_args()
+    
+    # 配置在导入时按环境加载
+    os.environ["ENV"] = args.env
+    from utils.test_data_manager import TestDataManager
+    from utils.screenshot_policy import ScreenshotPolicy, set_screenshot_policy
+    from utils.step_middleware import step_timings
+    
+    test_data = TestDataManager(env=args.env)
+    scenario = test_data.get_all_data().get("teacherin_user_page", {})
+    data = {
+        "url": test_data.get_url("teacherin_user_page"),
+        "selectors": scenario.get("selectors", {}),
+        "target": dict(scenario.get("target", {}))
+    }
+    # 压测只统计耗时，不截图
+    set_screenshot_policy(ScreenshotPolicy(mode="never"))
+    
+    mock_server = None
+    if args.mock or args.env == "mock":
+        from mock.teacherin_server import MockTeacherInServer
+        mock_config = dict(TestDataManager(env="mock").get_all_data().get("mock_server", {}))
+        # 压测时使用随机端口，避免与单独启动的模拟站点冲突
+        mock_config["port"] = 0
+        for name, value in (("latency_ms", args.mock_latency), ("payload_kb", args.mock_payload_kb),
+                            ("element_count", args.mock_elements)):
+            if value is not None:
+                mock_config[name] = value
+        mock_server = MockTeacherInServer.from_dict(mock_config).start()
+        data["url"] = mock_server.user_page_url()
+        data["target"]["homepage_title"] = mock_config.get("title", "TeacherIn")
+        # 模拟站点的发布课程页只包含标签文本
+        data["target"].pop("core_literacy_content", None)
+        print(f"🧪 使用本地模拟站点: {data['url']}")
+    
+    print(f"🚀 压测开始: {args.users} 个虚拟用户，{args.browsers} 个浏览器进程，"
+          f"{args.ramp_profile} 启动 {args.ramp_up}s，持续 {args.duration}s")
+    step_timings.reset()
+    try:
+        results, elapsed = asyncio.run(run_load(args, data))
+    finally:
+        if mock_server:
+            mock_server.stop()
+    
+    report = build_report(args, results, elapsed, step_timings.summary())
+    print_report(report)
+    
+    report_dir = os.path.join("reports", args.env, "load")
+    os.makedirs(report_dir, exist_ok=True)
+    report_file = os.path.join(report_dir, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 压测报告: {report_file}")
+    return 0 if report["iterations"]["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    '''
+    使用方法：
+    python run_load.py --env test --users 20 --browsers 2 --ramp-up 20 --duration 60
+    python run_load.py --mock --mock-latency 50 --users 50 --ramp-profile step --step-users 10 --ramp-up 30
+    python run_load.py --env mock --mock-payload-kb 512 --mock-elements 1000 --users 20
+    '''
+    sys.exit(main())
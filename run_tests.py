@@ -4,6 +4,8 @@ import os
 import sys
 import subprocess
 import argparse
+import glob
+import time
 from datetime import datetime
 
 def run_command(command, description, check=False, env=None):
@@ -39,10 +41,83 @@ def run_command(command, description, check=False, env=None):
         print("错误:", e.stderr)
         return False, e.stdout, e.stderr
 
+def link_allure_attachments(env, run_id, directory, pattern="*"):
+    """
+    启用产物存储时，将附件替换为指向blob的硬链接（相同内容只占一份磁盘）
+    
+    链接的附件记录到本次运行的产物清单（worker为allure），blob因此有引用，回收报告目录前不会被删除。
+    """
+    if not os.path.isdir(directory):
+        return
+    try:
+        # 父进程的 ENV 环境变量不一定是 --env，按 --env 显式读取测试数据
+        from config.config import Config
+        from utils.artifact_store import ArtifactStore
+        from utils.artifact_layout import ArtifactLayout
+        store_config = Config(env).ARTIFACT_STORE
+        if not store_config.get("enabled", False):
+            return
+        store = ArtifactStore(store_config.get("root", "./.cache/cas"))
+        linked = store.link_directory(directory, pattern)
+        layout = ArtifactLayout(f"./reports/{env}", run_id, "allure")
+        for path, digest in linked:
+            layout.record("attachments", path, "session", blob=digest)
+        stats = store.stats()
+        print(f"🔗 已将 {len(linked)} 个附件链接到产物存储，复用 {stats['reused']} 个，"
+              f"节省 {stats['bytes_reused'] / 1024 ** 2:.1f} MB")
+    except Exception as e:
+        print(f"⚠️ 附件链接到产物存储失败: {e}")
+
+def print_http_cache_summary(report_dir):
+    """汇总各worker的HTTP缓存命中统计"""
+    import json
+    
+    totals = {}
+    for stats_file in glob.glob(os.path.join(report_dir, "http_cache_stats_*.json")):
+        try:
+            with open(stats_file, "r", encoding="utf-8") as f:
+                for name, value in json.load(f).items():
+                    totals[name] = totals.get(name, 0) + value
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取HTTP缓存统计失败: {stats_file}, {e}")
+    requests = totals.get("hits", 0) + totals.get("misses", 0)
+    if requests:
+        print(f"🗄️ HTTP缓存: 命中 {totals['hits']}/{requests} ({totals['hits'] / requests:.0%})，"
+              f"未命中 {totals['misses']}，返回 {totals['bytes_served'] / 1024 ** 2:.1f} MB，"
+              f"写入 {totals['stored']} 条，淘汰 {totals['evicted']} 条")
+
+
+def print_screenshot_summary(report_dir):
+    """汇总各worker的截图统计，写入 screenshot_stats.json"""
+    import json
+    
+    totals = {}
+    for stats_file in glob.glob(os.path.join(report_dir, "screenshot_stats_*.json")):
+        try:
+            with open(stats_file, "r", encoding="utf-8") as f:
+                for name, value in json.load(f).items():
+                    if isinstance(value, dict):
+                        merged = totals.setdefault(name, {})
+                        for key, size in value.items():
+                            merged[key] = merged.get(key, 0) + size
+                    else:
+                        totals[name] = totals.get(name, 0) + value
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取截图统计失败: {stats_file}, {e}")
+    if not totals.get("count"):
+        return
+    with open(os.path.join(report_dir, "screenshot_stats.json"), "w", encoding="utf-8") as f:
+        json.dump(totals, f, ensure_ascii=False, indent=2)
+    print(f"📸 截图: 共 {totals['count']} 张，写入 {totals['bytes_written'] / 1024 ** 2:.1f} MB，"
+          f"相对PNG节省 {totals['bytes_saved'] / 1024 ** 2:.1f} MB"
+          f"(其中按 {totals.get('reference_samples', 0)} 张参照图估算 "
+          f"{totals.get('bytes_saved_estimated', 0) / 1024 ** 2:.1f} MB)，重复 {totals['duplicates']} 张")
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="TI-WebUI自动化测试 - 支持多环境")
-    parser.add_argument("--env", choices=["dev", "test", "prod"], 
+    parser.add_argument("--env", choices=["dev", "test", "prod", "mock"], 
                        default="test", help="测试环境")
     parser.add_argument("--browser", choices=["chromium", "firefox", "webkit"], 
                        default="chromium", help="浏览器类型")
@@ -51,11 +126,26 @@ def main():
     parser.add_argument("--test-file", help="测试文件")
     parser.add_argument("--test-function", help="测试函数")
     parser.add_argument("--parallel", action="store_true", help="并行运行")
+    parser.add_argument("--reruns", type=int, default=0, help="失败用例重跑次数（pytest-rerunfailures）")
     parser.add_argument("--allure", action="store_true", help="生成Allure报告")
     parser.add_argument("--install-browsers", action="store_true", help="安装浏览器")
     parser.add_argument("--ci", action="store_true", help="CI环境执行（Jenkins等）")
+    parser.add_argument("--gc-budget", type=int, help="报告目录磁盘预算(MB)，超出时从旧到新清理各次运行的产物")
+    parser.add_argument("--no-gc", action="store_true", help="不清理报告目录")
+    parser.add_argument("--browser-server", choices=["off", "session", "machine"],
+                       help="共享浏览器服务: session 本次运行共享 / machine 常驻复用（仅chromium）")
+    har_group = parser.add_mutually_exclusive_group()
+    har_group.add_argument("--record-har", action="store_true", help="录制每个用例及各页面的网络请求到HAR")
+    har_group.add_argument("--replay-har", action="store_true", help="从录制的HAR回放网络响应（离线运行）")
+    parser.add_argument("--persistent-profile", action="store_true",
+                       help="每个worker使用持久化用户数据目录，复用浏览器自身的缓存和Service Worker")
+    parser.add_argument("--http-cache", action="store_true", help="启用跨用例的HTTP静态资源磁盘缓存")
+    parser.add_argument("--deadline", type=float, help="每个用例的默认时间预算(秒)，操作超时不超过剩余时间")
+    parser.add_argument("--har-not-found", choices=["abort", "fallback"],
+                       help="回放时未命中HAR的请求: abort 拦截 / fallback 访问真实网络")
     
     args = parser.parse_args()
+    run_started_at = time.time()
     
     print("🚀 WebUI自动化测试运行器 - 多环境支持")
     print(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -66,6 +156,30 @@ def main():
     env_vars["ENV"] = args.env
     env_vars["BROWSER"] = args.browser
     env_vars["HEADLESS"] = str(args.headless).lower()
+    # 本次运行ID，用于产物目录分片和清单
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    env_vars["ARTIFACT_RUN_ID"] = run_id
+    # 并行运行时默认各worker共享一个Chromium
+    browser_server = args.browser_server
+    if browser_server is None and args.parallel and args.browser == "chromium" and not args.persistent_profile:
+        browser_server = "session"
+    if browser_server:
+        env_vars["BROWSER_SERVER"] = browser_server
+    if args.record_har or args.replay_har:
+        env_vars["HAR_MODE"] = "record" if args.record_har else "replay"
+        print(f"HAR: {env_vars['HAR_MODE']}")
+    if args.har_not_found:
+        env_vars["HAR_NOT_FOUND"] = args.har_not_found
+    if args.persistent_profile:
+        env_vars["PERSISTENT_PROFILE"] = "on"
+    if args.deadline is not None:
+        env_vars["TEST_DEADLINE"] = str(args.deadline)
+    # 清除上次运行的各worker截图和HTTP缓存统计，运行结束后汇总
+    for pattern in ("screenshot_stats_*.json", "http_cache_stats_*.json"):
+        for stats_file in glob.glob(f"./reports/{args.env}/{pattern}"):
+            os.remove(stats_file)
+    if args.http_cache:
+        env_vars["HTTP_CACHE"] = "on"
     
     # 安装浏览器
     if args.install_browsers:
@@ -91,6 +205,9 @@ def main():
     if args.parallel:
         pytest_cmd.extend(["-n", "auto"])
     
+    if args.reruns:
+        pytest_cmd.extend(["--reruns", str(args.reruns)])
+    
     # 清除之前的测试数据（在测试执行前）
     if args.allure:
         print("\n🧹 清除之前的测试数据...")
@@ -151,7 +268,7 @@ def main():
         result_data = get_test_result_data(stats, summary)
         import json
         print(f"TEST_RESULT_JSON: {json.dumps(result_data, ensure_ascii=False)}")
-        
+    
     except Exception as e:
         print(f"⚠️ 测试结果分析失败: {e}")
         # 创建默认结果
@@ -161,6 +278,34 @@ def main():
         import json
         print(f"TEST_RESULT_JSON: {json.dumps(result_data, ensure_ascii=False)}")
     
+    # 测试数据中启用HTTP缓存时不需要 --http-cache，按是否有统计文件输出
+    print_http_cache_summary(f"./reports/{args.env}")
+    print_screenshot_summary(f"./reports/{args.env}")
+    
+    # 启用产物存储时，将Allure结果中的附件副本替换为指向blob的硬链接
+    if args.allure:
+        link_allure_attachments(args.env, run_id, f"./reports/{args.env}/allure-results", "*-attachment*")
+    
+    # 按磁盘预算回收报告目录（本次运行产生的文件受保护）
+    if not args.no_gc:
+        try:
+            # 父进程的 ENV 环境变量不一定是 --env，按 --env 显式读取测试数据
+            from config.config import Config
+            if Config(args.env).REPORTS_GC.get("enabled", True):
+                from utils.reports_gc import run_reports_gc
+                from utils.artifact_layout import read_manifest
+                report_root = f"./reports/{args.env}"
+                protected = [os.path.join(report_root, entry["path"]) for entry in read_manifest(report_root, run_id)]
+                gc_stats = run_reports_gc(protect_since=run_started_at, protected_paths=protected,
+                                          budget_mb=args.gc_budget, env=args.env)
+                print(f"🧹 报告目录: {gc_stats['files']} 个文件，删除 {gc_stats['deleted']} 个，"
+                      f"释放 {gc_stats['freed_bytes'] / 1024 ** 2:.1f} MB")
+                if gc_stats.get("blobs_deleted"):
+                    print(f"🧹 产物存储: 删除 {gc_stats['blobs_deleted']} 个无引用blob，"
+                          f"释放 {gc_stats['blob_bytes_freed'] / 1024 ** 2:.1f} MB")
+        except Exception as e:
+            print(f"⚠️ 报告目录回收失败: {e}")
+    
     # 生成Allure报告 - 根据环境选择处理方式
     if args.allure:
         allure_results_dir = f"./reports/{args.env}/allure-results"
@@ -171,7 +316,7 @@ def main():
             allure_results_dir = f"./reports/{args.env}/allure-results"
             print(f"📁 Allure结果目录: {allure_results_dir}")
             print("✅ 测试结果已准备就绪，Jenkins将自动生成Allure报告")
-
+        
         else:
             # 本地环境 - 生成报告并启动服务器
             print("\n📊 生成Allure报告...")
@@ -181,6 +326,7 @@ def main():
                                     "生成Allure报告", check=False, env=env_vars)
             
             if allure_success:
+                link_allure_attachments(args.env, run_id, os.path.join(allure_report_dir, "data", "attachments"))
                 print("\n🌐 启动Allure报告服务器...，按 Ctrl+C 停止服务器")
                 run_command(f"allure serve {allure_results_dir}", "启动Allure报告服务器", check=False, env=env_vars)
             else:
@@ -203,4 +349,3 @@ if __name__ == "__main__":
     
     '''
     sys.exit(main()) 
-   
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+pytest插件 - 由 tests/conftest.py 通过 pytest_plugins 注册，按职责拆分的fixture和钩子
+"""
@@ -0,0 +1,96 @@
+"""
+产物 - 运行ID、产物归属、截图策略、视频保留，以及会话结束时等待后台写入并记录截图体积统计
+"""
+import json
+import os
+import pytest
+from config.config import Config
+from utils.screenshot import screenshot_stats, get_screenshot_deduplicator
+from utils.video_manager import VideoManager
+from utils.artifact_writer import shutdown_artifact_writer
+from utils.artifact_layout import get_artifact_layout, ensure_run_id
+from utils.screenshot_policy import ScreenshotPolicy, get_screenshot_policy, set_screenshot_policy
+from utils.logger import log
+from tests.plugins.outcome import is_failed
+
+# 视频在上下文关闭后才写完，call阶段记录下来等teardown阶段处理
+_video_key = pytest.StashKey()
+
+
+def pytest_configure(config):
+    """生成本次运行ID（xdist worker通过环境变量继承）"""
+    ensure_run_id()
+
+
+@pytest.fixture(autouse=True)
+def artifact_scope(request):
+    """产物归属 - 用例执行期间产生的产物按用例node id分片存放"""
+    layout = get_artifact_layout()
+    layout.set_current_test(request.node.nodeid)
+    yield layout
+    layout.set_current_test(None)
+
+
+@pytest.fixture(autouse=True)
+def screenshot_policy(request):
+    """截图策略 - 优先使用用例的 screenshot_policy 标记，否则使用环境配置"""
+    marker = request.node.get_closest_marker("screenshot_policy")
+    if marker:
+        from config.config import config
+        mode = marker.args[0] if marker.args else marker.kwargs.get("mode", "always")
+        # 标记未指定间隔时沿用环境配置
+        every_n = marker.args[1] if len(marker.args) > 1 else marker.kwargs.get(
+            "every_n", config.SCREENSHOT_POLICY["every_n"])
+        # 图片参数沿用环境配置
+        image = get_screenshot_policy().image
+        set_screenshot_policy(ScreenshotPolicy(mode=mode, every_n=every_n, image=image))
+    
+    policy = get_screenshot_policy()
+    policy.reset()
+    get_screenshot_deduplicator().reset()
+    yield policy
+    
+    # 恢复为环境配置的策略
+    if marker:
+        set_screenshot_policy(None)
+
+
+def pytest_runtest_makereport(item, call):
+    """测试报告钩子 - 按视频保留策略处理视频附件"""
+    if call.when == "call":
+        page = item.funcargs.get("page") if hasattr(item, "funcargs") else None
+        if page and page.video:
+            item.stash[_video_key] = page.video
+    
+    elif call.when == "teardown":
+        video = item.stash.get(_video_key, None)
+        if video is None:
+            return
+        
+        retention = Config().VIDEO_POLICY["retention"]
+        attempt = getattr(item, "execution_count", 1)
+        keep = VideoManager.should_keep(retention, is_failed(item), attempt)
+        
+        try:
+            VideoManager().finalize_video(video, item.name, keep)
+        except Exception as e:
+            log.warning(f"处理视频附件失败: {e}")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """会话结束 - 等待后台产物写入完成并记录截图体积统计"""
+    shutdown_artifact_writer()
+    
+    from config.config import config
+    
+    stats = screenshot_stats.to_dict()
+    if stats["count"]:
+        os.makedirs(config.REPORT_PATH, exist_ok=True)
+        # 每个xdist worker写各自的文件，由 run_tests.py 汇总为 screenshot_stats.json
+        worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+        stats_file = os.path.join(config.REPORT_PATH, f"screenshot_stats_{worker}.json")
+        with open(stats_file, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+        log.info(f"截图统计: 共 {stats['count']} 张，写入 {stats['bytes_written']} 字节，"
+                 f"相对PNG节省 {stats['bytes_saved']} 字节(估算 {stats['bytes_saved_estimated']} 字节)，"
+                 f"重复 {stats['duplicates']} 张(跳过 {stats['bytes_skipped']} 字节)")
@@ -0,0 +1,70 @@
+"""
+登录态 - login_as 标记的用例使用缓存的登录态，每个用户每次会话只登录一次
+"""
+import pytest
+from config.config import Config
+from utils.auth_state import get_auth_state_cache, login_via_ui, login_via_api, is_logged_in
+from utils.test_data_manager import TestDataManager
+
+
+@pytest.fixture
+def auth_user(request):
+    """login_as 标记指定的测试用户（未标记时为None）"""
+    marker = request.node.get_closest_marker("login_as")
+    if marker is None:
+        return None
+    username = marker.args[0] if marker.args else marker.kwargs.get("username")
+    user = TestDataManager().get_test_user(username)
+    if user is None:
+        pytest.fail(f"测试数据中不存在用户: {username}")
+    return user
+
+
+def _login(playwright, browser, user, context_args):
+    """按配置的登录方式登录，返回storage_state"""
+    auth_config = Config().AUTH
+    if auth_config["strategy"] == "api":
+        return login_via_api(playwright, user, auth_config["api"])
+    return login_via_ui(browser, user, auth_config["login"], context_args)
+
+
+@pytest.fixture
+def authenticated_context_args(request, auth_user, browser_context_args):
+    """注入缓存登录态的浏览器上下文参数（每个用户每次会话只登录一次）"""
+    if auth_user is None:
+        return browser_context_args
+    playwright = request.getfixturevalue("playwright")
+    browser = request.getfixturevalue("browser")
+    storage_state = get_auth_state_cache().get_or_login(
+        auth_user["username"],
+        lambda: _login(playwright, browser, auth_user, browser_context_args)
+    )
+    return {**browser_context_args, "storage_state": storage_state}
+
+
+def new_authenticated_context(request, auth_user, context_args):
+    """创建带登录态的上下文，登录校验失败时使缓存失效并重新登录一次"""
+    browser = request.getfixturevalue("browser")
+    context = browser.new_context(**context_args)
+    check_config = Config().AUTH["check"]
+    if not check_config.get("url"):
+        return context
+    
+    check_page = context.new_page()
+    logged_in = is_logged_in(check_page, check_config)
+    check_page.close()
+    if check_page.video:
+        check_page.video.delete()
+    if logged_in:
+        return context
+    
+    context.close()
+    cache = get_auth_state_cache()
+    cache.invalidate(auth_user["username"])
+    base_args = request.getfixturevalue("browser_context_args")
+    playwright = request.getfixturevalue("playwright")
+    storage_state = cache.get_or_login(
+        auth_user["username"],
+        lambda: _login(playwright, browser, auth_user, base_args)
+    )
+    return browser.new_context(**{**context_args, "storage_state": storage_state})
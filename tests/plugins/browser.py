@@ -0,0 +1,155 @@
+"""
+浏览器与页面 - 共享浏览器服务、上下文池/持久化配置目录、页面的超时、路由和trace
+"""
+import os
+import pytest
+from playwright.sync_api import Page
+from config.config import Config
+from utils.browser_server import SharedBrowser, get_browser_server
+from utils.context_pool import create_context_pool
+from utils.persistent_profile import PersistentContextPool, get_persistent_profile
+from utils.artifact_layout import get_artifact_layout
+from utils.trace_manager import get_trace_manager
+from utils.routing import get_routing_profiles
+from utils.har_archive import get_har_archive
+from utils.http_cache import get_http_cache
+from utils.adaptive_timeout import get_adaptive_timeouts
+from utils.deadline import clamp_timeout
+from tests.plugins.auth import new_authenticated_context
+from tests.plugins.outcome import is_failed
+
+
+@pytest.fixture(scope="session")
+def browser(playwright, browser_type, launch_browser):
+    """浏览器 - 启用共享浏览器服务时各worker连接同一个Chromium，否则各自启动"""
+    server = get_browser_server()
+    if server is None or browser_type.name != "chromium":
+        browser = launch_browser()
+        yield browser
+        browser.close()
+        return
+    
+    shared_browser = SharedBrowser(playwright, server)
+    yield shared_browser
+    shared_browser.close()
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args):
+    """浏览器上下文参数"""
+    from config.environments import EnvironmentManager
+    
+    # 获取当前环境
+    current_env = EnvironmentManager.get_current_env()
+    
+    video_policy = Config().VIDEO_POLICY
+    
+    context_args = {
+        **browser_context_args,
+        "viewport": {
+            "width": 1920,
+            "height": 1080
+        },
+        "ignore_https_errors": True,
+        "locale": "zh-CN",  # 设置中文语言环境
+        "extra_http_headers": {
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
+        }
+    }
+    
+    if video_policy["retention"] != "off":
+        # 按环境、运行和worker分目录录制视频，避免并行运行时单目录文件过多
+        layout = get_artifact_layout()
+        videos_dir = os.path.join(f"./reports/{current_env}/videos", layout.run_id, layout.worker)
+        os.makedirs(videos_dir, exist_ok=True)
+        context_args["record_video_dir"] = videos_dir
+        context_args["record_video_size"] = video_policy["size"]
+    
+    return context_args
+
+
+@pytest.fixture(scope="session")
+def context_pool(request, browser_type, browser_type_launch_args, browser_context_args):
+    """浏览器上下文池（未启用时为None）；启用持久化配置目录时为该worker的持久化上下文"""
+    profile = get_persistent_profile(browser_type.name)
+    if profile is not None:
+        pool = PersistentContextPool(profile, browser_type, browser_type_launch_args, browser_context_args)
+    else:
+        pool = create_context_pool(request.getfixturevalue("browser"), browser_context_args)
+    yield pool
+    if pool is not None:
+        pool.close()
+
+
+@pytest.fixture
+def page(request, context_pool, auth_user, authenticated_context_args, browser_context_args) -> Page:
+    """
+    页面对象
+    
+    - 默认从上下文池取已清理的上下文，fresh_context 标记的用例使用全新上下文；
+    - login_as 标记的用例使用注入了缓存登录态的独立上下文；
+    - 按 routing_profile 标记或测试数据中的路由配置拦截无关资源，启用HTTP缓存时静态资源从磁盘缓存返回；
+    - HAR录制时使用独立上下文，回放时从HAR返回响应。
+    """
+    har = get_har_archive()
+    pooled = (context_pool is not None and auth_user is None and not har.recording
+              and request.node.get_closest_marker("fresh_context") is None)
+    owned = False
+    if auth_user is not None:
+        context_args = authenticated_context_args
+        if har.recording:
+            context_args = {**context_args, **har.record_context_args(request.node.name)}
+        context = new_authenticated_context(request, auth_user, context_args)
+        owned = True
+    elif pooled:
+        context = context_pool.acquire()
+    elif har.recording:
+        # HAR在上下文关闭时写入，录制时每个用例使用独立上下文
+        context = request.getfixturevalue("browser").new_context(
+            **browser_context_args, **har.record_context_args(request.node.name))
+        owned = True
+    else:
+        context = request.getfixturevalue("context")
+    page = context.new_page()
+    
+    # 设置视口大小
+    page.set_viewport_size({
+        "width": 1920,
+        "height": 1080
+    })
+    
+    # 设置超时（页面对象的操作按历史耗时自适应，这里只是兜底的最长档位）；
+    # 设置了用例时间预算时不超过此时的剩余时间，直接调用 page.* 的单次操作也不会超出预算
+    page.set_default_timeout(clamp_timeout(get_adaptive_timeouts().page_default(), "页面默认超时"))
+    
+    # 路由（页面级注册，随页面关闭失效，不影响上下文池）；后注册的优先: HAR回放 > 路由配置 > HTTP缓存
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        http_cache.apply(page)
+    routing_marker = request.node.get_closest_marker("routing_profile")
+    get_routing_profiles().apply(page, routing_marker.args[0] if routing_marker else None,
+                                 test_name=request.node.originalname)
+    if har.replaying:
+        har.replay(page, request.node.name)
+    
+    # 启动trace（按trace策略，失败时才保存）
+    trace_manager = get_trace_manager()
+    trace_manager.start_test(page.context, request.node.name)
+    
+    yield page
+    
+    trace_manager.stop_test(page.context, request.node.name, is_failed(request.node))
+    
+    if pooled:
+        context_pool.release(context)
+    elif owned:
+        context.close()
+        if har.recording:
+            har.finish_recording(request.node.name)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """session范围的共享浏览器服务由主进程在所有worker结束后关闭"""
+    server = get_browser_server()
+    if server is not None and server.scope == "session" and not os.getenv("PYTEST_XDIST_WORKER"):
+        server.stop()
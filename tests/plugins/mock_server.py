@@ -0,0 +1,33 @@
+"""
+本地模拟站点 - mock环境由主进程启动 mock/teacherin_server.py，xdist worker共用
+"""
+import os
+import pytest
+from config.config import Config
+from utils.logger import log
+
+_mock_server_key = pytest.StashKey()
+
+
+def pytest_configure(config):
+    """mock环境由主进程启动本地模拟站点"""
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        return
+    mock_config = Config().MOCK_SERVER
+    if mock_config:
+        from mock.teacherin_server import MockTeacherInServer
+        try:
+            server = MockTeacherInServer.from_dict(mock_config).start()
+        except OSError as e:
+            # 端口已被占用时认为模拟站点已单独启动
+            log.warning(f"本地模拟站点未启动（{e}），使用已运行的站点")
+            return
+        config.stash[_mock_server_key] = server
+        log.info(f"本地模拟站点已启动: {server.base_url}")
+
+
+def pytest_unconfigure(config):
+    """关闭本地模拟站点"""
+    server = config.stash.get(_mock_server_key, None)
+    if server is not None:
+        server.stop()
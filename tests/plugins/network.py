@@ -0,0 +1,26 @@
+"""
+网络 - 会话结束时记录路由拦截和HTTP缓存统计（每个xdist worker写各自的文件，由 run_tests.py 汇总）
+"""
+import json
+import os
+from utils.routing import get_routing_profiles
+from utils.http_cache import get_http_cache
+
+
+def _write_stats(name: str, stats):
+    from config.config import config
+    os.makedirs(config.REPORT_PATH, exist_ok=True)
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    with open(os.path.join(config.REPORT_PATH, f"{name}_{worker}.json"), "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """会话结束 - 记录路由拦截统计和HTTP缓存命中统计"""
+    routing_stats = get_routing_profiles().report()
+    if routing_stats:
+        _write_stats("routing_stats", routing_stats)
+    
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        _write_stats("http_cache_stats", http_cache.report())
@@ -0,0 +1,18 @@
+"""
+用例执行结果 - 记录用例是否失败，供teardown阶段的trace、视频处理使用
+"""
+import pytest
+
+test_failed_key = pytest.StashKey()
+
+
+def is_failed(node) -> bool:
+    """用例（任一阶段）是否已失败"""
+    return node.stash.get(test_failed_key, False)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_makereport(item, call):
+    """各阶段出现异常（跳过除外）时标记用例失败"""
+    if call.excinfo is not None and not call.excinfo.errisinstance(pytest.skip.Exception):
+        item.stash[test_failed_key] = True
@@ -0,0 +1,45 @@
+"""
+超时 - 用例时间预算，会话结束时写回操作耗时历史
+"""
+import json
+import allure
+import pytest
+from utils.adaptive_timeout import get_adaptive_timeouts
+from utils.deadline import Deadline, set_deadline, resolve_budget
+from utils.logger import log
+
+
+@pytest.fixture(autouse=True)
+def deadline(request):
+    """
+    用例时间预算 - deadline 标记或测试数据 deadlines 中的预算(秒)，从用例准备阶段开始计时；
+    页面对象操作的超时不超过剩余时间，超出预算时报告耗时最多的步骤
+    """
+    marker = request.node.get_closest_marker("deadline")
+    budget = resolve_budget(marker.args[0] if marker else None, request.node.originalname)
+    if budget is None:
+        yield None
+        return
+    
+    test_deadline = Deadline(int(budget * 1000), request.node.name)
+    set_deadline(test_deadline)
+    try:
+        yield test_deadline
+    finally:
+        set_deadline(None)
+        if test_deadline.overrun:
+            report = test_deadline.report()
+            slowest = report["slowest_step"] or report["slowest_action"]
+            slowest_text = f"{slowest['name']} ({slowest['ms']:.0f}ms)" if slowest else "无"
+            log.error(f"用例超出时间预算: {request.node.name} 耗时 {report['elapsed_ms']:.0f}ms / "
+                      f"预算 {report['budget_ms']}ms，耗时最多的步骤: {slowest_text}")
+            allure.attach(json.dumps(report, ensure_ascii=False, indent=2), name="时间预算超出",
+                          attachment_type=allure.attachment_type.JSON)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """会话结束 - 合并写回本次会话的操作耗时"""
+    try:
+        get_adaptive_timeouts().save()
+    except Exception as e:
+        log.warning(f"保存操作耗时历史失败: {e}")
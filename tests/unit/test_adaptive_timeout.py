@@ -0,0 +1,141 @@
+"""
+自适应超时单元测试
+"""
+import json
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from utils.adaptive_timeout import AdaptiveTimeouts
+
+pytestmark = pytest.mark.unit
+
+TIERS = {"short": 5000, "medium": 10000, "long": 30000}
+URLS = {"teacherin_user_page": "https://www.teacherin.cn/user"}
+URL = "https://www.teacherin.cn/user/123"
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / "step_latencies.json")
+
+
+def make_timeouts(path, **options):
+    options = {"pct": 99, "margin": 1.5, "padding_ms": 500, "min_ms": 1000, "min_samples": 5, **options}
+    return AdaptiveTimeouts(path, TIERS, URLS, **options)
+
+
+class TestTimeoutFor:
+    def test_tier_until_enough_samples(self, history_path):
+        """样本不足时使用档位超时"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(4):
+            timeouts.record("click", "#star-course", URL, 400)
+        assert timeouts.timeout_for("click", "#star-course", URL) == 10000
+        assert timeouts.timeout_for("is_visible", "#star-course", URL) == 5000
+    
+    def test_learned(self, history_path):
+        """样本足够时为 分位数 * margin + padding_ms，限制在 [min_ms, 档位] 之间"""
+        timeouts = make_timeouts(history_path)
+        for duration in (100, 200, 300, 400, 2000):
+            timeouts.record("click", "#star-course", URL, duration)
+            timeouts.record("click", "#fast", URL, 10)
+            timeouts.record("click", "#slow", URL, 9000)
+        assert timeouts.timeout_for("click", "#star-course", URL) == 2000 * 1.5 + 500
+        assert timeouts.timeout_for("click", "#fast", URL) == 1000
+        assert timeouts.timeout_for("click", "#slow", URL) == 10000
+    
+    def test_keyed_by_page(self, history_path):
+        """按页面key区分，同一选择器在其他页面上仍使用档位超时"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 100)
+        assert timeouts.key("click", "#star-course", URL) == "click|teacherin_user_page|#star-course"
+        assert timeouts.timeout_for("click", "#star-course", "https://example.com/") == 10000
+    
+    def test_failure_widens(self, history_path):
+        """失败后按 failure_multiplier 放宽一次，连续失败不再放宽，下次成功后恢复按样本计算"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 1000)
+        learned = timeouts.timeout_for("click", "#star-course", URL)
+        assert learned == 1000 * 1.5 + 500
+        for _ in range(3):
+            timeouts.record("click", "#star-course", URL, learned, failed=True)
+            assert timeouts.timeout_for("click", "#star-course", URL) == learned * 2
+        timeouts.record("click", "#star-course", URL, 1000)
+        assert timeouts.timeout_for("click", "#star-course", URL) == learned
+    
+    def test_failure_capped(self, history_path):
+        """放宽后的超时不超过档位超时"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 4000)
+        timeouts.record("click", "#star-course", URL, 6500, failed=True)
+        assert timeouts.timeout_for("click", "#star-course", URL) == 10000
+    
+    def test_measure_records_failure(self, history_path):
+        """measure 中抛出异常时记为失败"""
+        timeouts = make_timeouts(history_path)
+        with pytest.raises(RuntimeError):
+            with timeouts.measure("click", "#star-course", URL, timeout=2000) as timeout:
+                assert timeout == 2000
+                raise RuntimeError("元素不存在")
+        assert timeouts._streak(timeouts.key("click", "#star-course", URL)) == 1
+    
+    def test_probe_timeout_not_failure(self, history_path):
+        """查询操作超时（元素不可见）是正常结果，不记为失败；其他操作超时记为失败"""
+        timeouts = make_timeouts(history_path)
+        for action in ("is_visible", "click"):
+            with pytest.raises(PlaywrightTimeoutError):
+                with timeouts.measure(action, "#absent", URL, timeout=1000):
+                    raise PlaywrightTimeoutError("Timeout 1000ms exceeded.")
+        assert timeouts._streak(timeouts.key("is_visible", "#absent", URL)) == 0
+        assert timeouts._streak(timeouts.key("click", "#absent", URL)) == 1
+    
+    def test_disabled(self, history_path):
+        """关闭学习时始终使用档位超时"""
+        timeouts = make_timeouts(history_path, enabled=False)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 100)
+        assert timeouts.timeout_for("click", "#star-course", URL) == 10000
+
+
+class TestSave:
+    def test_save_and_reload(self, history_path):
+        """写回后新实例读取到样本"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 2000)
+        timeouts.save()
+        assert make_timeouts(history_path).timeout_for("click", "#star-course", URL) == 2000 * 1.5 + 500
+    
+    def test_save_merges(self, history_path):
+        """两个会话（如两个xdist worker）的样本和失败次数合并，保留最近 max_samples 个"""
+        first = make_timeouts(history_path, max_samples=4)
+        second = make_timeouts(history_path, max_samples=4)
+        for duration in (1, 2, 3):
+            first.record("click", "#star-course", URL, duration)
+            second.record("click", "#star-course", URL, duration * 10)
+        second.record("click", "#star-course", URL, 50, failed=True)
+        first.save()
+        second.save()
+        with open(history_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)["click|teacherin_user_page|#star-course"]
+        assert entry["samples"] == [3, 10, 20, 30]
+        assert entry["censored"] == [50]
+        assert entry["failures"] == 1
+        assert entry["streak"] == 1
+    
+    def test_streak_persisted(self, history_path):
+        """连续失败次数写回后，下次会话仍先放宽超时"""
+        timeouts = make_timeouts(history_path)
+        for _ in range(5):
+            timeouts.record("click", "#star-course", URL, 1000)
+        timeouts.record("click", "#star-course", URL, 2000, failed=True)
+        timeouts.save()
+        assert make_timeouts(history_path).timeout_for("click", "#star-course", URL) == 2000 * 2
+    
+    def test_nothing_to_save(self, history_path):
+        """没有新样本时不写文件"""
+        make_timeouts(history_path).save()
+        with pytest.raises(FileNotFoundError):
+            open(history_path, "r", encoding="utf-8")
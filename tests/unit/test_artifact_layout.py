@@ -0,0 +1,64 @@
+"""
+产物目录布局单元测试
+"""
+import hashlib
+import os
+import pytest
+from utils.artifact_layout import ArtifactLayout, read_manifest, latest_run_id
+
+pytestmark = pytest.mark.unit
+
+NODEID = "tests/userpage/test_teacherin.py::TestTeacherInNavigation::test_teacherin_multi_page[chromium]"
+
+
+@pytest.fixture
+def layout(tmp_path):
+    return ArtifactLayout(str(tmp_path), run_id="20240101_000000_1", worker="gw0")
+
+
+class TestArtifactLayout:
+    def test_path_for(self, layout, tmp_path):
+        """{root}/{kind}/{run_id}/{worker}/{hash[:2]}/{seq}_{test}_{name}.{ext}"""
+        path = layout.path_for("screenshots", "点击 收藏/课程", ".png", nodeid=NODEID)
+        fanout = hashlib.sha1(NODEID.encode("utf-8")).hexdigest()[:2]
+        directory = os.path.join(str(tmp_path), "screenshots", "20240101_000000_1", "gw0", fanout)
+        assert os.path.dirname(path) == directory
+        assert os.path.basename(path) == "000001_test_teacherin_multi_page_chromium__点击_收藏_课程.png"
+        assert os.path.isdir(directory)
+    
+    def test_sequence_unique(self, layout):
+        """同一用例同名产物的路径也不重复"""
+        paths = {layout.path_for("screenshots", "step", "png", nodeid=NODEID) for _ in range(5)}
+        assert len(paths) == 5
+    
+    def test_create_false(self, layout):
+        """后台写入时不在调用线程创建目录"""
+        path = layout.path_for("videos", "video", "webm", nodeid=NODEID, create=False)
+        assert not os.path.exists(os.path.dirname(path))
+    
+    def test_current_test(self, layout):
+        """未指定node id时归属当前用例，清除后归属session"""
+        layout.set_current_test(NODEID)
+        assert "test_teacherin_multi_page" in layout.path_for("traces", "trace", "zip")
+        layout.set_current_test(None)
+        assert layout.current_test == "session"
+    
+    def test_record_and_read_manifest(self, layout, tmp_path):
+        """清单记录相对路径，按运行读取所有worker的记录"""
+        path = layout.path_for("screenshots", "step", "png", nodeid=NODEID)
+        layout.record("screenshots", path, nodeid=NODEID, blob="a" * 64)
+        other = ArtifactLayout(str(tmp_path), run_id="20240101_000000_1", worker="gw1")
+        other.record("videos", other.path_for("videos", "video", "webm", nodeid=NODEID), nodeid=NODEID)
+        
+        entries = sorted(read_manifest(str(tmp_path), "20240101_000000_1"), key=lambda entry: entry["worker"])
+        assert [entry["worker"] for entry in entries] == ["gw0", "gw1"]
+        assert entries[0]["path"] == os.path.relpath(path, str(tmp_path)).replace(os.sep, "/")
+        assert entries[0]["blob"] == "a" * 64
+        assert entries[1]["kind"] == "videos"
+    
+    def test_latest_run_id(self, layout, tmp_path):
+        """最近一次运行为清单目录中最大的运行ID"""
+        assert latest_run_id(str(tmp_path)) is None
+        layout.record("logs", layout.path_for("logs", "log", "txt", nodeid=NODEID))
+        ArtifactLayout(str(tmp_path), run_id="20240102_000000_1", worker="main").record("logs", str(tmp_path / "x"))
+        assert latest_run_id(str(tmp_path)) == "20240102_000000_1"
@@ -0,0 +1,100 @@
+"""
+内容寻址产物存储单元测试
+"""
+import json
+import os
+import time
+import pytest
+from utils.artifact_store import ArtifactStore, blob_digest_from_path
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / "cas"))
+
+
+@pytest.fixture
+def reports_root(tmp_path):
+    return str(tmp_path / "reports")
+
+
+def write_manifest(reports_root, env, run_id, digests):
+    directory = os.path.join(reports_root, env, "manifests", run_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "main.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for digest in digests:
+            f.write(json.dumps({"kind": "screenshots", "blob": digest}) + "\n")
+        f.write(json.dumps({"kind": "logs", "path": "logs/run.log"}) + "\n")
+    return path
+
+
+class TestArtifactStore:
+    def test_put_bytes_reuses(self, store):
+        """相同内容只存一份"""
+        digest, path = store.put_bytes(b"screenshot", "png")
+        assert store.put_bytes(b"screenshot", "png") == (digest, path)
+        assert path == os.path.join(store.root, digest[:2], digest[2:4], f"{digest}.png")
+        assert blob_digest_from_path(path) == digest
+        assert store.stats() == {"stored": 1, "reused": 1, "bytes_reused": len(b"screenshot")}
+    
+    def test_put_file_and_link(self, store, tmp_path):
+        """目录中的文件替换为指向blob的硬链接"""
+        attachment = tmp_path / "allure-results" / "a-attachment.png"
+        attachment.parent.mkdir()
+        attachment.write_bytes(b"image")
+        digest = store.link_into_store(str(attachment))
+        assert os.path.samefile(str(attachment), store.blob_path(digest, "png"))
+        assert os.stat(str(attachment)).st_nlink == 2
+    
+    def test_reference_counts(self, store, reports_root):
+        """引用计数 = 各环境、各运行清单中引用该blob的次数"""
+        write_manifest(reports_root, "test", "run1", ["a" * 64, "b" * 64])
+        write_manifest(reports_root, "mock", "run2", ["a" * 64])
+        assert store.reference_counts(reports_root) == {"a" * 64: 2, "b" * 64: 1}
+    
+    def test_collect(self, store, reports_root):
+        """删除无引用的blob和变空的分片目录，保留仍被引用的blob"""
+        kept, kept_path = store.put_bytes(b"kept", "png")
+        _, orphan_path = store.put_bytes(b"orphan", "png")
+        write_manifest(reports_root, "test", "run1", [kept])
+        
+        stats = store.collect(reports_root)
+        assert stats == {"blobs": 2, "deleted": 1, "freed_bytes": len(b"orphan")}
+        assert os.path.exists(kept_path)
+        assert not os.path.exists(orphan_path)
+        assert not os.path.exists(os.path.dirname(orphan_path))
+    
+    def test_collect_after_manifest_removed(self, store, reports_root):
+        """清单被回收后其引用的blob随之删除"""
+        digest, path = store.put_bytes(b"screenshot", "png")
+        manifest = write_manifest(reports_root, "test", "run1", [digest])
+        assert store.collect(reports_root)["deleted"] == 0
+        os.remove(manifest)
+        assert store.collect(reports_root)["deleted"] == 1
+        assert not os.path.exists(path)
+    
+    def test_collect_protects_current_run(self, store, reports_root):
+        """本次运行写入的blob即使尚未写入清单也不删除"""
+        _, path = store.put_bytes(b"pending", "png")
+        assert store.collect(reports_root, protect_since=time.time() - 60)["deleted"] == 0
+        assert os.path.exists(path)
+    
+    def test_collect_linked_blob(self, store, reports_root, tmp_path):
+        """仍有其他硬链接的blob删除后不计入释放字节数"""
+        attachment = tmp_path / "attachment.png"
+        attachment.write_bytes(b"linked")
+        store.link_into_store(str(attachment))
+        assert store.collect(reports_root) == {"blobs": 1, "deleted": 1, "freed_bytes": 0}
+        assert attachment.read_bytes() == b"linked"
+    
+    def test_link_directory_returns_digests(self, store, tmp_path):
+        """链接目录返回各附件的sha256，供调用方写入清单"""
+        directory = tmp_path / "allure-results"
+        directory.mkdir()
+        (directory / "a-attachment.png").write_bytes(b"a")
+        (directory / "b-result.json").write_bytes(b"{}")
+        linked = store.link_directory(str(directory), "*-attachment*")
+        assert linked == [(str(directory / "a-attachment.png"), store.file_digest(str(directory / "a-attachment.png")))]
@@ -0,0 +1,137 @@
+"""
+页面对象基类单元测试（同步和异步版本共用超时、日志和验证逻辑）
+"""
+import asyncio
+import pytest
+import pages.base_page
+from pages.async_base_page import AsyncBasePage
+from pages.base_page import BasePage
+from utils.adaptive_timeout import AdaptiveTimeouts
+from utils.async_runner import run_concurrently
+from utils.step_middleware import _concurrent
+
+pytestmark = pytest.mark.unit
+
+
+class FakeLocator:
+    """按调用方式返回结果或协程的定位器，missing 为True时模拟元素不存在"""
+    
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+    
+    @property
+    def first(self):
+        return self
+    
+    def _result(self, value=None):
+        self.page.calls.append(self.selector)
+        if self.selector in self.page.missing:
+            error = TimeoutError(f"等待超时: {self.selector}")
+            if self.page.is_async:
+                async def fail():
+                    raise error
+                return fail()
+            raise error
+        if self.page.is_async:
+            async def done():
+                return value
+            return done()
+        return value
+    
+    def click(self, timeout=None):
+        return self._result()
+    
+    def fill(self, text, timeout=None):
+        return self._result()
+    
+    def wait_for(self, state=None, timeout=None):
+        return self._result()
+    
+    def inner_text(self, timeout=None):
+        return self._result("课程")
+
+
+class FakePage:
+    def __init__(self, is_async=False, missing=(), title="TeacherIn 首页"):
+        self.is_async = is_async
+        self.missing = set(missing)
+        self.url = "https://example.com/home"
+        self.calls = []
+        self._title = title
+    
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+    
+    def title(self):
+        if self.is_async:
+            async def title():
+                return self._title
+            return title()
+        return self._title
+
+
+@pytest.fixture(autouse=True)
+def timeouts(tmp_path, monkeypatch):
+    timeouts = AdaptiveTimeouts(str(tmp_path / "step_latencies.json"), {"short": 1000, "medium": 5000, "long": 10000})
+    monkeypatch.setattr(pages.base_page, "get_adaptive_timeouts", lambda: timeouts)
+    return timeouts
+
+
+class TestBasePage:
+    def test_actions(self):
+        """操作成功返回True，异常时返回失败值而不抛出"""
+        page = BasePage(FakePage(missing=["#missing"]))
+        assert page.click("#ok") is True
+        assert page.type_text("#ok", "张三") is True
+        assert page.get_text("#ok") == "课程"
+        assert page.click("#missing") is False
+        assert page.get_text("#missing") == ""
+        assert page.is_element_visible("#missing") is False
+    
+    def test_failure_recorded(self, timeouts):
+        """异常计入自适应超时的失败"""
+        BasePage(FakePage(missing=["#missing"])).click("#missing")
+        assert timeouts._new_failures == {timeouts.key("click", "#missing", "https://example.com/home"): 1}
+    
+    def test_verify(self):
+        page = BasePage(FakePage())
+        assert page.verify_title("TeacherIn") is True
+        assert page.verify_title("课程") is False
+        assert page.verify_title_contains("teacherin") is True
+        assert page.verify_url_contains("/home") is True
+    
+    def test_click_and_verify(self):
+        page = BasePage(FakePage(missing=["#missing"]))
+        assert page.click_and_verify("#ok", "title_contains", "首页") is True
+        assert page.click_and_verify("#ok", "url_contains", "/profile") is False
+        assert page.click_and_verify("#missing") is False
+        assert page.click_text_element("发布的课程") is True
+        assert page.page.calls[-1] == BasePage.text_selector("发布的课程")
+
+
+class TestAsyncBasePage:
+    def test_same_results(self):
+        """异步版本与同步版本结果一致"""
+        page = AsyncBasePage(FakePage(is_async=True, missing=["#missing"]))
+        
+        async def flow():
+            return [
+                await page.click("#ok"),
+                await page.get_text("#ok"),
+                await page.click("#missing"),
+                await page.verify_title("课程"),
+                await page.click_and_verify("#ok", "title_contains", "首页"),
+            ]
+        
+        assert asyncio.run(flow()) == [True, "课程", False, False, True]
+    
+    def test_concurrent_flag(self):
+        """run_concurrently 中的任务标记为并发执行，之外不受影响"""
+        async def flag():
+            return _concurrent.get()
+        
+        async def main():
+            return await run_concurrently(flag(), flag()), _concurrent.get()
+        
+        assert asyncio.run(main()) == ([True, True], False)
@@ -0,0 +1,41 @@
+"""
+页面内等待条件单元测试
+"""
+import pytest
+from utils.conditions import PageCondition, text_present, next_condition_token, is_condition_message
+
+pytestmark = pytest.mark.unit
+
+
+class TestPageCondition:
+    @pytest.mark.parametrize("expression", [
+        "(arg) => arg > 1",
+        "arg => arg > 1",
+        "async () => true",
+        "function (arg) { return arg; }",
+    ])
+    def test_function_expression(self, expression):
+        """函数写法原样作为谓词"""
+        condition = PageCondition(expression)
+        assert condition.is_function
+        assert f"const predicate = {expression};" in condition.watch_script()
+    
+    def test_plain_expression(self):
+        """表达式包装为接收arg的箭头函数"""
+        condition = PageCondition("window.__appReady === true")
+        assert not condition.is_function
+        assert "const predicate = (arg) => (window.__appReady === true);" in condition.watch_script()
+    
+    def test_watch_script_notifies_with_console_debug(self):
+        """监听脚本接收 [消息, 超时, 轮询间隔, 参数]，满足时通过 console.debug 通知"""
+        script = text_present("收藏的课程").watch_script()
+        assert script.startswith("([message, timeout, pollMs, arg]) =>")
+        assert "console.debug(message)" in script
+        assert "new MutationObserver(check)" in script
+    
+    def test_condition_token(self):
+        """每次等待的消息前缀不同，且都能识别为条件消息"""
+        first, second = next_condition_token(), next_condition_token()
+        assert first != second
+        assert is_condition_message(f"{first}0")
+        assert not is_condition_message("普通日志")
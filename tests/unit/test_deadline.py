@@ -0,0 +1,76 @@
+"""
+用例时间预算单元测试
+"""
+from types import SimpleNamespace
+import pytest
+from utils.deadline import Deadline, DeadlineExceeded, clamp_timeout, resolve_budget, set_deadline
+
+pytestmark = pytest.mark.unit
+
+
+class TestDeadline:
+    def test_clamp_within_budget(self):
+        """超时不超过剩余时间，未指定超时时为剩余时间"""
+        deadline = Deadline(5000, "test_example")
+        assert deadline.clamp(1000) == 1000
+        assert 4000 < deadline.clamp(60000) <= 5000
+        assert 4000 < deadline.clamp(None) <= 5000
+        assert 4000 < deadline.clamp(0) <= 5000
+    
+    def test_clamp_exhausted(self):
+        """预算用完时抛出 DeadlineExceeded，且不会被 except Exception 吞掉"""
+        deadline = Deadline(0, "test_example")
+        deadline.start -= 0.01
+        assert deadline.overrun
+        with pytest.raises(DeadlineExceeded, match="点击"):
+            deadline.clamp(1000, "点击")
+        assert not issubclass(DeadlineExceeded, Exception)
+    
+    def test_clamp_timeout_without_deadline(self):
+        """没有截止时间时原样返回"""
+        set_deadline(None)
+        assert clamp_timeout(30000) == 30000
+        assert clamp_timeout(None) is None
+    
+    def test_clamp_timeout_with_deadline(self):
+        """设置截止时间后按剩余时间限制"""
+        set_deadline(Deadline(2000, "test_example"))
+        try:
+            assert clamp_timeout(30000) <= 2000
+        finally:
+            set_deadline(None)
+    
+    def test_report_slowest_step(self):
+        """报告最外层耗时最多的步骤和内层耗时最多的操作"""
+        deadline = Deadline(10000, "test_example")
+        deadline.record_step("打开首页", 1, 0.5)
+        deadline.record_step("点击收藏", 2, 0.8)
+        deadline.record_step("发布课程", 1, 1.2)
+        report = deadline.report()
+        assert report["slowest_step"] == {"name": "发布课程", "ms": 1200.0}
+        assert report["slowest_action"] == {"name": "点击收藏", "ms": 800.0}
+        assert [step["name"] for step in report["steps"]] == ["发布课程", "打开首页"]
+
+
+class TestResolveBudget:
+    @pytest.fixture
+    def deadlines(self, monkeypatch):
+        config = SimpleNamespace(DEADLINES={"default": 60, "tests": {"test_slow": 180, "test_unbounded": 0}})
+        monkeypatch.setattr("config.config.config", config)
+        return config.DEADLINES
+    
+    def test_marker_first(self, deadlines):
+        """deadline 标记优先，标记为0时不限"""
+        assert resolve_budget(5, "test_slow") == 5.0
+        assert resolve_budget(0, "test_slow") is None
+    
+    def test_test_data(self, deadlines):
+        """未标记时取 deadlines.tests 中的用例预算，否则取 default"""
+        assert resolve_budget(None, "test_slow") == 180.0
+        assert resolve_budget(None, "test_other") == 60.0
+        assert resolve_budget(None, "test_unbounded") is None
+    
+    def test_no_default(self, deadlines):
+        """没有默认预算时不限"""
+        deadlines["default"] = None
+        assert resolve_budget(None, "test_other") is None
@@ -0,0 +1,45 @@
+"""
+HTTP响应缓存单元测试
+"""
+from email.utils import formatdate
+import pytest
+from utils.http_cache import freshness_lifetime
+
+pytestmark = pytest.mark.unit
+
+NOW = 1_700_000_000
+
+
+class TestFreshnessLifetime:
+    @pytest.mark.parametrize("headers, expected", [
+        ({"cache-control": "public, max-age=600"}, 600),
+        ({"cache-control": "max-age=600, s-maxage=60"}, 60),
+        ({"cache-control": 'max-age="120"'}, 120),
+        ({"cache-control": "no-cache, max-age=600"}, 0),
+        ({"cache-control": "no-store"}, 0),
+        ({"cache-control": "private, max-age=600"}, 0),
+        ({"cache-control": "max-age=600", "set-cookie": "sid=1"}, 0),
+        ({}, 0),
+    ])
+    def test_cache_control(self, headers, expected):
+        """Cache-Control 优先，不可缓存的指令和 Set-Cookie 返回0"""
+        assert freshness_lifetime(200, headers) == expected
+    
+    def test_non_200(self):
+        """只缓存200响应"""
+        assert freshness_lifetime(404, {"cache-control": "max-age=600"}) == 0
+    
+    def test_expires(self):
+        """Expires 相对 Date 计算，已过期时为0"""
+        date = formatdate(NOW, usegmt=True)
+        assert freshness_lifetime(200, {"date": date, "expires": formatdate(NOW + 300, usegmt=True)}) == 300
+        assert freshness_lifetime(200, {"date": date, "expires": formatdate(NOW - 300, usegmt=True)}) == 0
+    
+    def test_last_modified_heuristic(self):
+        """只有 Last-Modified 时取距今时长的10%"""
+        headers = {"date": formatdate(NOW, usegmt=True), "last-modified": formatdate(NOW - 1000, usegmt=True)}
+        assert freshness_lifetime(200, headers) == pytest.approx(100)
+    
+    def test_invalid_date(self):
+        """无法解析的日期视为不可缓存"""
+        assert freshness_lifetime(200, {"expires": "0"}) == 0
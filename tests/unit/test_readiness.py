@@ -0,0 +1,36 @@
+"""
+页面就绪策略单元测试
+"""
+import time
+import pytest
+from utils.readiness import Readiness, ReadinessStrategy
+
+pytestmark = pytest.mark.unit
+
+
+class TestReadiness:
+    def test_remaining(self):
+        """剩余时间按截止时间换算为毫秒"""
+        strategy = ReadinessStrategy("load_state", state="load")
+        remaining = Readiness._remaining(time.perf_counter() + 2, strategy)
+        assert 1900 < remaining <= 2000
+    
+    def test_remaining_expired(self):
+        """截止时间已过时抛出超时，信息中带未完成的策略"""
+        strategy = ReadinessStrategy("dom_quiet", quiet_ms=300)
+        with pytest.raises(TimeoutError, match="dom_quiet"):
+            Readiness._remaining(time.perf_counter() - 0.001, strategy)
+    
+    def test_from_config(self):
+        """单个策略或策略列表"""
+        assert len(Readiness.from_config({"type": "load_state"}).strategies) == 1
+        readiness = Readiness.from_config([
+            {"type": "load_state", "state": "domcontentloaded"},
+            {"type": "selector", "selector": "#content"},
+        ])
+        assert [strategy.type for strategy in readiness.strategies] == ["load_state", "selector"]
+    
+    def test_unknown_strategy(self):
+        """未知的策略类型"""
+        with pytest.raises(ValueError):
+            ReadinessStrategy("networkidle")
@@ -0,0 +1,90 @@
+"""
+报告目录回收单元测试
+"""
+import os
+import time
+import pytest
+from utils.reports_gc import ReportsGC
+
+pytestmark = pytest.mark.unit
+
+NOW = time.time()
+
+
+def write(root, relative, size, age):
+    """写入指定大小的文件，修改时间为 age 秒前"""
+    path = os.path.join(str(root), relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return path
+
+
+class TestReportsGC:
+    def test_within_budget(self, tmp_path):
+        """未超出预算时不删除"""
+        write(tmp_path, "test/screenshots/run1/a.png", 100, 30)
+        stats = ReportsGC(str(tmp_path), budget_bytes=1000).collect()
+        assert stats == {"files": 1, "total_bytes": 100, "deleted": 0, "freed_bytes": 0, "remaining_bytes": 100}
+    
+    def test_oldest_first(self, tmp_path):
+        """超出预算时按修改时间从旧到新删除，直到不超出预算"""
+        oldest = write(tmp_path, "test/screenshots/run1/a.png", 100, 300)
+        older = write(tmp_path, "test/videos/run2/b.webm", 100, 200)
+        newest = write(tmp_path, "test/traces/run3/c.zip", 100, 100)
+        stats = ReportsGC(str(tmp_path), budget_bytes=150).collect()
+        assert (stats["deleted"], stats["freed_bytes"], stats["remaining_bytes"]) == (2, 200, 100)
+        assert not os.path.exists(oldest) and not os.path.exists(older)
+        assert os.path.exists(newest)
+    
+    def test_removes_empty_dirs(self, tmp_path):
+        """删除因回收变空的目录，保留回收范围的顶层目录"""
+        write(tmp_path, "test/screenshots/run1/gw0/ab/a.png", 100, 300)
+        ReportsGC(str(tmp_path), budget_bytes=0).collect()
+        assert not os.path.exists(tmp_path / "test" / "screenshots" / "run1")
+        assert os.path.isdir(tmp_path / "test" / "screenshots")
+    
+    def test_protected(self, tmp_path):
+        """本次运行产生的文件和受保护的文件不删除"""
+        protected = write(tmp_path, "test/screenshots/run1/a.png", 100, 300)
+        current = write(tmp_path, "test/screenshots/run2/b.png", 100, 1)
+        stats = ReportsGC(str(tmp_path), budget_bytes=0).collect(
+            protect_since=NOW - 60, protected_paths=[protected])
+        assert stats["deleted"] == 0
+        assert os.path.exists(protected) and os.path.exists(current)
+    
+    def test_scope(self, tmp_path):
+        """只回收 include 范围内的目录，* 不跨越 /"""
+        in_scope = write(tmp_path, "test/logs/a.log", 100, 300)
+        shared = write(tmp_path, "test/step_latencies.json", 100, 300)
+        nested = write(tmp_path, "test/cache/other/logs/b.log", 100, 300)
+        stats = ReportsGC(str(tmp_path), budget_bytes=0).collect()
+        assert (stats["files"], stats["deleted"]) == (1, 1)
+        assert not os.path.exists(in_scope)
+        assert os.path.exists(shared) and os.path.exists(nested)
+    
+    def test_hardlinks_counted_once(self, tmp_path):
+        """同一inode的链接只计一次大小，并一起删除"""
+        path = write(tmp_path, "test/allure-results/a.png", 100, 300)
+        link = os.path.join(str(tmp_path), "test", "allure-report", "data", "a.png")
+        os.makedirs(os.path.dirname(link))
+        os.link(path, link)
+        stats = ReportsGC(str(tmp_path), budget_bytes=50).collect()
+        assert (stats["total_bytes"], stats["deleted"], stats["freed_bytes"]) == (100, 2, 100)
+        assert not os.path.exists(link)
+    
+    def test_link_outside_scope(self, tmp_path):
+        """有链接在回收范围之外（如产物存储）时不计入大小"""
+        path = write(tmp_path, "test/screenshots/run1/a.png", 100, 300)
+        os.link(path, str(tmp_path / "blob.png"))
+        stats = ReportsGC(str(tmp_path), budget_bytes=50).collect()
+        assert (stats["total_bytes"], stats["deleted"]) == (0, 0)
+    
+    def test_index_reused(self, tmp_path):
+        """索引记录大小和修改时间，下次回收复用"""
+        write(tmp_path, "test/screenshots/run1/a.png", 100, 300)
+        ReportsGC(str(tmp_path), budget_bytes=1000).collect()
+        collector = ReportsGC(str(tmp_path), budget_bytes=1000)
+        assert collector._index["test/screenshots/run1/a.png"][0] == 100
+        assert collector.collect()["total_bytes"] == 100
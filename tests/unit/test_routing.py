@@ -0,0 +1,46 @@
+"""
+路由配置单元测试
+"""
+import pytest
+from utils.http_cache import HttpDiskCache
+from utils.routing import glob_to_regex, RouteSizeIndex, RouteStats
+
+pytestmark = pytest.mark.unit
+
+
+class TestGlobToRegex:
+    @pytest.mark.parametrize("pattern, url, matched", [
+        ("**/api/user/**", "https://www.teacherin.cn/api/user/info?id=1", True),
+        ("**/api/user/**", "https://www.teacherin.cn/api/course/list", False),
+        ("**/*.png", "https://cdn.example.com/img/a/b.png", True),
+        ("https://cdn.example.com/*.js", "https://cdn.example.com/app.js", True),
+        ("https://cdn.example.com/*.js", "https://cdn.example.com/js/app.js", False),
+        ("**/track?*", "https://www.teacherin.cn/track?e=1", True),
+        ("**/a.b", "https://x/aXb", False),
+    ])
+    def test_match(self, pattern, url, matched):
+        """** 匹配任意字符，* 不跨越 /，其余字符按字面匹配"""
+        assert bool(glob_to_regex(pattern).fullmatch(url)) is matched
+
+
+
+class TestBlockedBytes:
+    def test_size_from_http_cache(self, tmp_path):
+        """没有学习到的大小时按HTTP缓存中的响应体大小估算"""
+        cache = HttpDiskCache(str(tmp_path / "http"))
+        headers = {"cache-control": "max-age=60"}
+        assert cache.put("https://cdn.example.com/logo.png", {}, 200, headers, b"x" * 100)
+        sizes = RouteSizeIndex(str(tmp_path / "route_sizes.json"), cache)
+        assert sizes.size_of("https://cdn.example.com/logo.png", {}) == 100
+        assert sizes.size_of("https://cdn.example.com/other.png", {}) is None
+    
+    def test_unavailable(self):
+        """拦截的请求大小全部未知时 bytes_blocked 为None，部分已知时按已知部分累计"""
+        stats = RouteStats()
+        stats.record_blocked("lean", None)
+        stats.record_blocked("text_only", None)
+        stats.record_blocked("text_only", 200)
+        result = stats.to_dict()
+        assert result["lean"]["bytes_blocked"] is None
+        assert result["text_only"]["bytes_blocked"] == 200
+        assert result["text_only"]["unknown_size"] == 1
@@ -0,0 +1,48 @@
+"""
+压测统计单元测试
+"""
+from types import SimpleNamespace
+import pytest
+from run_load import build_report
+from utils.step_middleware import percentile
+
+pytestmark = pytest.mark.unit
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        """最近秩法: 取第 ceil(p/100*n) 个值"""
+        values = [float(value) for value in range(1, 11)]
+        assert percentile(values, 50) == 5
+        assert percentile(values, 95) == 10
+        assert percentile(values, 99) == 10
+        assert percentile(values, 0) == 1
+        assert percentile([3.0], 99) == 3
+    
+    def test_empty(self):
+        assert percentile([], 95) == 0.0
+
+
+class TestBuildReport:
+    def test_iterations(self):
+        """流程耗时按秒记录，报告中的分位数为毫秒，吞吐量按总耗时计算"""
+        args = SimpleNamespace(flow="teacherin_multi_page", env="mock", users=4, browsers=2,
+                               ramp_up=0, ramp_profile="linear")
+        results = [{"duration": duration, "passed": duration < 1.0}
+                   for duration in (0.4, 0.2, 0.3, 0.1, 1.5)]
+        steps = {"打开首页": {"count": 5, "failed": 0, "p50": 10.0, "p95": 20.0, "p99": 20.0}}
+        report = build_report(args, results, 10.0, steps)
+        iterations = report["iterations"]
+        assert iterations["count"] == 5
+        assert iterations["failed"] == 1
+        assert iterations["throughput"] == 0.5
+        assert iterations["p50"] == pytest.approx(300)
+        assert iterations["p95"] == pytest.approx(1500)
+        assert report["steps"]["打开首页"]["throughput"] == 0.5
+    
+    def test_no_elapsed(self):
+        """总耗时为0时吞吐量为0"""
+        args = SimpleNamespace(flow="f", env="mock", users=1, browsers=1, ramp_up=0, ramp_profile="linear")
+        report = build_report(args, [], 0, {})
+        assert report["iterations"]["throughput"] == 0.0
+        assert report["iterations"]["p99"] == 0.0
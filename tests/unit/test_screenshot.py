@@ -0,0 +1,130 @@
+"""
+截图工具单元测试
+"""
+import os
+from types import SimpleNamespace
+import pytest
+from utils.artifact_layout import ArtifactLayout, read_manifest
+from utils.screenshot import ImageSettings, Screenshot, ScreenshotStats, ScreenshotDeduplicator
+from utils.screenshot_policy import ScreenshotPolicy
+from utils.step_middleware import capture_step_screenshot
+
+pytestmark = pytest.mark.unit
+
+
+class FakeCapture:
+    """按截图参数返回固定大小数据的截图函数，记录每次调用的参数"""
+    
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.calls = []
+    
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        return b"x" * self.sizes[kwargs["type"]]
+
+
+class TestImageSettings:
+    def test_reference_kwargs(self):
+        """jpeg截图的参照图为同区域的PNG，PNG截图不需要参照图"""
+        settings = ImageSettings(format="jpeg", quality=60, full_page=False)
+        assert settings.screenshot_kwargs() == {"type": "jpeg", "full_page": False, "quality": 60}
+        assert settings.reference_kwargs() == {"type": "png", "full_page": False}
+        assert ImageSettings(format="png").reference_kwargs() is None
+
+
+class TestScreenshotStats:
+    def test_reference_due(self):
+        """第一张即抽样，之后每N张一次，0为不抽样"""
+        stats = ScreenshotStats()
+        assert [stats.reference_due(3) for _ in range(7)] == [True, False, False, True, False, False, True]
+        assert not ScreenshotStats().reference_due(0)
+    
+    def test_estimated_savings(self):
+        """没有参照图的jpeg截图按参照样本的压缩比估算节省量"""
+        stats = ScreenshotStats()
+        stats.record("jpeg", 100, original_size=400, reference=True)
+        stats.record("jpeg", 200)
+        stats.record("png", 500)
+        result = stats.to_dict()
+        assert result["bytes_written"] == 800
+        assert result["bytes_saved_estimated"] == 600
+        assert result["bytes_saved"] == 300 + 600
+        assert result["reference_samples"] == 1
+        assert result["by_format"] == {"jpeg": 300, "png": 500}
+    
+    def test_no_reference_samples(self):
+        """没有参照样本时不估算"""
+        stats = ScreenshotStats()
+        stats.record("jpeg", 200)
+        assert stats.to_dict()["bytes_saved"] == 0
+
+
+class TestCapture:
+    def test_jpeg_capture_samples_png_reference(self, monkeypatch):
+        """浏览器直接输出jpeg时按 reference_every（默认20）额外截取PNG参照图，其余截图按压缩比估算"""
+        stats = ScreenshotStats()
+        monkeypatch.setattr("utils.screenshot.screenshot_stats", stats)
+        capture = FakeCapture({"jpeg": 100, "png": 400})
+        settings = ImageSettings(format="jpeg", quality=60)
+        
+        for _ in range(3):
+            captured = Screenshot()._capture(capture, settings)
+            assert len(captured.data) == 100
+            Screenshot.record(captured, settings)
+        assert [call["type"] for call in capture.calls] == ["jpeg", "png", "jpeg", "jpeg"]
+        result = stats.to_dict()
+        assert result["reference_samples"] == 1
+        assert (result["bytes_saved"], result["bytes_saved_estimated"]) == (900, 600)
+
+
+class FakePage:
+    """返回固定图片数据的页面"""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def screenshot(self, **kwargs):
+        return self.data
+
+
+class TestDeduplicatedStats:
+    @pytest.fixture
+    def stats(self, monkeypatch):
+        stats = ScreenshotStats()
+        monkeypatch.setattr("utils.screenshot.screenshot_stats", stats)
+        return stats
+    
+    @pytest.fixture
+    def deduplicator(self, monkeypatch):
+        deduplicator = ScreenshotDeduplicator("exact")
+        monkeypatch.setattr("utils.step_middleware.get_screenshot_deduplicator", lambda: deduplicator)
+        return deduplicator
+    
+    def test_in_memory(self, stats, deduplicator, monkeypatch):
+        """重复截图只计入 duplicates，不计入 count 和 bytes_written"""
+        monkeypatch.setattr("config.config.config", SimpleNamespace(SCREENSHOT_PIPELINE={"reference_every": 0}))
+        page = FakePage(b"x" * 100)
+        for _ in range(3):
+            capture_step_screenshot(page, "点击元素", "成功", False, ScreenshotPolicy("always"))
+        result = stats.to_dict()
+        assert (result["count"], result["bytes_written"]) == (1, 100)
+        assert (result["duplicates"], result["bytes_skipped"]) == (2, 200)
+    
+    def test_on_disk(self, stats, deduplicator, monkeypatch, tmp_path):
+        """落盘模式先去重再写文件，重复截图不写入文件和清单"""
+        monkeypatch.setattr("config.config.config", SimpleNamespace(
+            SCREENSHOT_PIPELINE={"in_memory": False, "reference_every": 0}))
+        layout = ArtifactLayout(str(tmp_path), run_id="run1", worker="main")
+        monkeypatch.setattr("utils.screenshot.get_artifact_layout", lambda: layout)
+        monkeypatch.setattr("utils.screenshot.get_artifact_store", lambda: None)
+        page = FakePage(b"x" * 100)
+        for _ in range(2):
+            capture_step_screenshot(page, "点击元素", "成功", False, ScreenshotPolicy("always"))
+        
+        entries = read_manifest(str(tmp_path), "run1")
+        assert len(entries) == 1
+        assert os.path.exists(os.path.join(str(tmp_path), entries[0]["path"]))
+        assert len(os.listdir(os.path.dirname(os.path.join(str(tmp_path), entries[0]["path"])))) == 1
+        result = stats.to_dict()
+        assert (result["count"], result["duplicates"]) == (1, 1)
@@ -0,0 +1,48 @@
+"""
+截图策略单元测试
+"""
+import pytest
+from utils.screenshot_policy import ScreenshotPolicy
+
+pytestmark = pytest.mark.unit
+
+
+class TestScreenshotPolicy:
+    def test_always_and_never(self):
+        """always 总是截图，never 失败时也不截图"""
+        assert ScreenshotPolicy("always").should_capture(failed=False)
+        assert not ScreenshotPolicy("never").should_capture(failed=True)
+    
+    def test_on_failure(self):
+        """on_failure 只在失败时截图"""
+        policy = ScreenshotPolicy("on_failure")
+        assert not policy.should_capture(failed=False)
+        assert policy.should_capture(failed=True)
+    
+    def test_outermost(self):
+        """outermost 只截最外层步骤，内层步骤失败时仍截图"""
+        policy = ScreenshotPolicy("outermost")
+        assert policy.should_capture(failed=False, depth=1)
+        assert not policy.should_capture(failed=False, depth=2)
+        assert policy.should_capture(failed=True, depth=3)
+    
+    def test_every_n(self):
+        """every_n 每N个成功步骤截一张，失败步骤不计数，reset 后重新计数"""
+        policy = ScreenshotPolicy("every_n", every_n=3)
+        assert [policy.should_capture(failed=False) for _ in range(6)] == [False, False, True, False, False, True]
+        assert policy.should_capture(failed=True)
+        policy.should_capture(failed=False)
+        policy.reset()
+        assert [policy.should_capture(failed=False) for _ in range(3)] == [False, False, True]
+    
+    def test_unknown_mode_and_interval(self):
+        """未知策略回退为 always，间隔至少为1"""
+        assert ScreenshotPolicy("sometimes").mode == "always"
+        assert ScreenshotPolicy("every_n", every_n=0).every_n == 1
+    
+    def test_from_dict(self):
+        """从配置字典创建，缺省为 always"""
+        policy = ScreenshotPolicy.from_dict({"mode": "every_n", "every_n": 2, "image": {"step": {"format": "jpeg"}}})
+        assert (policy.mode, policy.every_n) == ("every_n", 2)
+        assert policy.image["step"]["format"] == "jpeg"
+        assert ScreenshotPolicy.from_dict(None).mode == "always"
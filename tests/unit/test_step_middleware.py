@@ -0,0 +1,69 @@
+"""
+步骤中间件单元测试
+"""
+import pytest
+from utils.step_middleware import StepMiddleware, StepPipeline, TimingMiddleware, step_timings
+
+pytestmark = pytest.mark.unit
+
+
+class RecordFailure(StepMiddleware):
+    """记录每次步骤是否失败"""
+    
+    def __init__(self):
+        self.failed = []
+    
+    def __call__(self, ctx, call_next):
+        try:
+            return call_next(ctx)
+        finally:
+            self.failed.append(ctx.failed)
+
+
+def make_step(fail_on_false: bool = False):
+    recorder = RecordFailure()
+    step = StepPipeline([recorder], fail_on_false).decorate("步骤")
+    return recorder, step
+
+
+class TestStepFailure:
+    def test_false_is_not_failure_by_default(self):
+        """查询方法返回False是正常结果"""
+        recorder, step = make_step()
+        assert step(lambda: False)() is False
+        assert recorder.failed == [False]
+    
+    def test_fail_on_false(self):
+        """声明 fail_on_false 的步骤返回False时视为失败，返回其他值不是失败"""
+        recorder, step = make_step(fail_on_false=True)
+        step(lambda: False)()
+        step(lambda: "")()
+        step(lambda: True)()
+        assert recorder.failed == [True, False, False]
+    
+    def test_exception(self):
+        """抛出异常总是失败"""
+        recorder, step = make_step()
+        
+        def broken():
+            raise RuntimeError("元素不存在")
+        
+        with pytest.raises(RuntimeError):
+            step(broken)()
+        assert recorder.failed == [True]
+
+
+class TestTimingMiddleware:
+    def test_nested_same_name_recorded_once(self):
+        """覆写方法和 super() 使用同一步骤名时只记录最外层，不同名的嵌套步骤各自记录"""
+        step_timings.reset()
+        step = StepPipeline([TimingMiddleware()]).decorate("验证页面内容包含")
+        inner_step = StepPipeline([TimingMiddleware()]).decorate("点击元素")
+        
+        base = step(lambda: inner_step(lambda: True)())
+        override = step(lambda: base())
+        assert override() is True
+        summary = step_timings.summary()
+        step_timings.reset()
+        assert summary["验证页面内容包含"]["count"] == 1
+        assert summary["点击元素"]["count"] == 1
@@ -0,0 +1,231 @@
+"""
+自适应超时 - 按选择器和页面key记录页面操作的实际耗时，用历史高分位数加安全余量作为超时时间，
+失效的选择器几秒内即失败，不必每次等满最坏情况的超时
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from utils.deadline import clamp_timeout
+from utils.file_lock import FileLock
+from utils.logger import log
+from utils.step_middleware import percentile
+
+# 各操作未学到耗时时使用的超时档位（测试数据 timeouts 中的 short/medium/long）
+ACTION_TIERS = {
+    "navigate": "long",
+    "page_load": "long",
+    "click": "medium",
+    "type": "medium",
+    "get_text": "medium",
+    "wait_for_selector": "medium",
+    "is_visible": "short",
+}
+
+# 查询类操作：超时表示结果为否（如元素不可见），是正常结果，不记为失败
+PROBE_ACTIONS = {"is_visible"}
+
+
+class AdaptiveTimeouts:
+    """
+    按 操作|页面key|选择器 学习的超时时间
+    
+    - 成功样本不少于 min_samples 时，超时 = p{percentile} * margin + padding_ms，
+      限制在 [min_ms, 档位超时] 之间；样本不足时使用档位超时；
+    - 最近一次操作失败（抛出异常或超时）的key（streak > 0）放宽为学到的超时 * failure_multiplier，
+      不超过档位超时；连续失败不再继续放宽，失效的选择器每次仍在几秒内失败；
+      偶发变慢的操作在放宽后成功，样本随之计入分位数，下次成功后恢复按样本计算；
+    - 失败的操作按已耗时记为删失样本（实际耗时至少为该值），只用于排查，不参与分位数计算，
+      否则每次失败都会按 margin 抬高超时，连续失败时一路升到档位超时；
+    - 查询类操作（PROBE_ACTIONS，如 is_visible）超时表示结果为否，不记为失败；
+    - 每个key各保留最近 max_samples 个成功样本和删失样本；
+    - 样本按环境持久化，会话结束时合并写回（多个xdist worker加锁合并）。
+    """
+    
+    def __init__(self, path: str, tiers: Dict[str, int], urls: Dict[str, str] = None, enabled: bool = True,
+                 pct: float = 99, margin: float = 1.5, padding_ms: int = 500, min_ms: int = 1000,
+                 min_samples: int = 5, max_samples: int = 50, failure_multiplier: float = 2):
+        self.path = path
+        self.tiers = tiers
+        self.urls = urls or {}
+        self.enabled = enabled
+        self.pct = pct
+        self.margin = margin
+        self.padding_ms = padding_ms
+        self.min_ms = min_ms
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.failure_multiplier = failure_multiplier
+        self._lock = threading.Lock()
+        # key -> {"samples": [毫秒...], "censored": [毫秒...], "failures": 次数, "streak": 连续失败次数}
+        self._history: Dict[str, Dict[str, Any]] = {}
+        # 本次会话新增的样本、删失样本和失败次数，写回时追加到文件中的记录
+        self._new_samples: Dict[str, List[float]] = {}
+        self._new_censored: Dict[str, List[float]] = {}
+        self._new_failures: Dict[str, int] = {}
+        # 本次会话中各key当前的连续失败次数，写回时覆盖文件中的记录
+        self._streaks: Dict[str, int] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._history = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._history = {}
+    
+    @classmethod
+    def from_config(cls, timeout_config: Dict[str, Any], tiers: Dict[str, int], path: str,
+                    urls: Dict[str, str] = None) -> "AdaptiveTimeouts":
+        """从测试数据的 adaptive_timeouts 配置创建"""
+        return cls(
+            path, tiers, urls,
+            enabled=bool(timeout_config.get("enabled", True)),
+            pct=float(timeout_config.get("percentile", 99)),
+            margin=float(timeout_config.get("margin", 1.5)),
+            padding_ms=int(timeout_config.get("padding_ms", 500)),
+            min_ms=int(timeout_config.get("min_ms", 1000)),
+            min_samples=int(timeout_config.get("min_samples", 5)),
+            max_samples=int(timeout_config.get("max_samples", 50)),
+            failure_multiplier=float(timeout_config.get("failure_multiplier", 2))
+        )
+    
+    def page_key(self, url: Optional[str]) -> str:
+        """URL对应的 urls 页面key，未匹配时为 *"""
+        for page_key, page_url in self.urls.items():
+            if url and page_url and url.startswith(page_url):
+                return page_key
+        return "*"
+    
+    def key(self, action: str, selector: str = None, url: str = None) -> str:
+        return f"{action}|{self.page_key(url)}|{selector or ''}"
+    
+    def tier_timeout(self, action: str) -> int:
+        """操作的档位超时(毫秒)"""
+        return int(self.tiers.get(ACTION_TIERS.get(action, "medium"), 10000))
+    
+    def page_default(self) -> int:
+        """页面默认超时（Playwright set_default_timeout），为最长档位"""
+        return int(self.tiers.get("long", 30000))
+    
+    def timeout_for(self, action: str, selector: str = None, url: str = None) -> int:
+        """操作的超时时间(毫秒)"""
+        ceiling = self.tier_timeout(action)
+        if not self.enabled:
+            return ceiling
+        key = self.key(action, selector, url)
+        with self._lock:
+            samples = self._samples(key)
+            failed_last = self._streak(key) > 0
+        if len(samples) < self.min_samples:
+            return ceiling
+        learned = max(percentile(sorted(samples), self.pct) * self.margin + self.padding_ms, self.min_ms)
+        if failed_last:
+            # 上次失败后按固定倍数放宽一次，避免按过短的历史耗时连续失败，也不会升到档位超时
+            learned *= self.failure_multiplier
+        return int(min(learned, ceiling))
+    
+    def record(self, action: str, selector: str = None, url: str = None, duration_ms: float = None,
+               failed: bool = False):
+        """
+        记录一次操作
+        
+        Args:
+            duration_ms: 耗时(毫秒)；失败时为失败前已耗时，记为删失样本，为None时只计失败次数
+            failed: 操作是否失败（含超时）
+        """
+        key = self.key(action, selector, url)
+        with self._lock:
+            if failed or duration_ms is None:
+                self._new_failures[key] = self._new_failures.get(key, 0) + 1
+                self._streaks[key] = self._streak(key) + 1
+                if duration_ms is not None:
+                    self._new_censored.setdefault(key, []).append(round(duration_ms, 1))
+            else:
+                self._new_samples.setdefault(key, []).append(round(duration_ms, 1))
+                self._streaks[key] = 0
+    
+    @contextmanager
+    def measure(self, action: str, selector: str = None, url: str = None, timeout: int = None):
+        """
+        计时执行一次操作，产出该操作使用的超时时间
+        
+        Args:
+            action: 操作名（见 ACTION_TIERS）
+            selector: 元素选择器
+            url: 页面URL，用于匹配页面key
+            timeout: 调用方显式指定的超时，为None时使用学到的超时；两者都不超过用例剩余时间
+        """
+        if timeout is None:
+            timeout = self.timeout_for(action, selector, url)
+        # 设置了用例时间预算时不超过剩余时间，预算用完直接抛出 DeadlineExceeded（不计入失败）
+        timeout = clamp_timeout(timeout, f"{action} {selector or url or ''}".strip())
+        start = time.monotonic()
+        try:
+            yield timeout
+        except (PlaywrightTimeoutError, TimeoutError):
+            if action not in PROBE_ACTIONS:
+                self.record(action, selector, url, (time.monotonic() - start) * 1000, failed=True)
+            raise
+        except Exception:
+            self.record(action, selector, url, (time.monotonic() - start) * 1000, failed=True)
+            raise
+        self.record(action, selector, url, (time.monotonic() - start) * 1000)
+    
+    def save(self):
+        """合并本次会话的样本写回磁盘"""
+        with self._lock:
+            if not self._new_samples and not self._new_failures:
+                return
+            new_samples, new_censored, new_failures = self._new_samples, self._new_censored, self._new_failures
+            streaks = dict(self._streaks)
+            self._new_samples, self._new_censored, self._new_failures = {}, {}, {}
+        # 多个xdist worker各自合并写回，加锁避免互相覆盖
+        with FileLock(f"{self.path}.lock", timeout=10):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (FileNotFoundError, ValueError):
+                merged = {}
+            for key in set(new_samples) | set(new_failures):
+                entry = merged.setdefault(key, {"samples": [], "failures": 0})
+                entry["samples"] = (entry["samples"] + new_samples.get(key, []))[-self.max_samples:]
+                entry["censored"] = (entry.get("censored", []) + new_censored.get(key, []))[-self.max_samples:]
+                entry["failures"] += new_failures.get(key, 0)
+                entry["streak"] = streaks.get(key, 0)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        with self._lock:
+            self._history = merged
+            # 已写回的连续失败次数以文件为准
+            for key in streaks:
+                if self._streaks.get(key) == streaks[key]:
+                    self._streaks.pop(key)
+        log.info(f"操作耗时历史已更新: {self.path} ({len(merged)} 个操作)")
+    
+    def _samples(self, key: str) -> List[float]:
+        samples = self._history.get(key, {}).get("samples", [])
+        return (samples + self._new_samples.get(key, []))[-self.max_samples:]
+    
+    def _streak(self, key: str) -> int:
+        if key in self._streaks:
+            return self._streaks[key]
+        return int(self._history.get(key, {}).get("streak", 0))
+
+
+_timeouts: Optional[AdaptiveTimeouts] = None
+
+
+def get_adaptive_timeouts() -> AdaptiveTimeouts:
+    """获取当前环境的自适应超时（样本保存在 reports/<env>/step_latencies.json）"""
+    global _timeouts
+    if _timeouts is None:
+        from config.config import config
+        from utils.test_data_manager import TestDataManager
+        _timeouts = AdaptiveTimeouts.from_config(
+            config.ADAPTIVE_TIMEOUTS, config.TIMEOUTS,
+            os.path.join(config.REPORT_PATH, "step_latencies.json"), TestDataManager().get_urls())
+    return _timeouts
@@ -0,0 +1,139 @@
+"""
+产物目录布局 - 按运行、xdist worker、用例哈希分片存放产物，文件名带单调递增序号，避免并行运行时冲突
+"""
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+RUN_ID_ENV = "ARTIFACT_RUN_ID"
+
+
+def get_worker_id() -> str:
+    """当前xdist worker标识，非并行运行时为main"""
+    return os.getenv("PYTEST_XDIST_WORKER", "main")
+
+
+def ensure_run_id() -> str:
+    """获取本次运行ID，不存在时生成并写入环境变量（xdist worker会继承）"""
+    run_id = os.getenv(RUN_ID_ENV)
+    if not run_id:
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+class ArtifactLayout:
+    """
+    产物目录布局
+    
+    路径格式: {root}/{kind}/{run_id}/{worker}/{hash[:2]}/{seq}_{test}_{name}.{ext}
+    每个worker在 {root}/manifests/{run_id}/{worker}.jsonl 中追加记录产物清单。
+    """
+    
+    def __init__(self, root: str, run_id: str = None, worker: str = None):
+        self.root = root
+        self.run_id = run_id or ensure_run_id()
+        self.worker = worker or get_worker_id()
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._current_test = "session"
+    
+    @property
+    def manifest_path(self) -> str:
+        """本worker的清单文件"""
+        return os.path.join(self.root, "manifests", self.run_id, f"{self.worker}.jsonl")
+    
+    def set_current_test(self, nodeid: Optional[str]):
+        """设置当前用例（产物默认归属）"""
+        self._current_test = nodeid or "session"
+    
+    @property
+    def current_test(self) -> str:
+        """当前用例node id"""
+        return self._current_test
+    
+    def path_for(self, kind: str, name: str, extension: str, nodeid: str = None, create: bool = True) -> str:
+        """
+        生成不冲突的产物路径
+        
+        Args:
+            kind: 产物类型(screenshots/videos/traces...)
+            name: 产物名称
+            extension: 扩展名（不含点）
+            nodeid: 用例node id，默认当前用例
+            create: 是否创建目录，后台写入时为False，由写入任务创建
+        """
+        nodeid = nodeid or self._current_test
+        sequence = next(self._sequence)
+        fanout = hashlib.sha1(nodeid.encode("utf-8")).hexdigest()[:2]
+        directory = os.path.join(self.root, kind, self.run_id, self.worker, fanout)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        test_name = self._safe(nodeid.split("::")[-1])
+        filename = f"{sequence:06d}_{test_name}_{self._safe(name)}.{extension.lstrip('.')}"
+        return os.path.join(directory, filename)
+    
+    def record(self, kind: str, path: str, nodeid: str = None, **extra: Any):
+        """将产物追加到本worker的清单"""
+        entry = {
+            "kind": kind,
+            "path": os.path.relpath(path, self.root).replace(os.sep, "/"),
+            "nodeid": nodeid or self._current_test,
+            "worker": self.worker,
+            "time": time.time(),
+            **extra
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    
+    @staticmethod
+    def _safe(name: str) -> str:
+        return re.sub(r"[^\w\-.]+", "_", name)[:60]
+
+
+def read_manifest(root: str, run_id: str) -> List[Dict[str, Any]]:
+    """读取一次运行所有worker的产物清单"""
+    entries = []
+    directory = os.path.join(root, "manifests", run_id)
+    if not os.path.isdir(directory):
+        return entries
+    with os.scandir(directory) as iterator:
+        for entry in iterator:
+            if not entry.name.endswith(".jsonl"):
+                continue
+            with open(entry.path, "r", encoding="utf-8") as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+    return entries
+
+
+def latest_run_id(root: str) -> Optional[str]:
+    """最近一次运行ID"""
+    directory = os.path.join(root, "manifests")
+    if not os.path.isdir(directory):
+        return None
+    with os.scandir(directory) as iterator:
+        run_ids = [entry.name for entry in iterator if entry.is_dir()]
+    return max(run_ids) if run_ids else None
+
+
+_layout: Optional[ArtifactLayout] = None
+_layout_lock = threading.Lock()
+
+
+def get_artifact_layout() -> ArtifactLayout:
+    """获取全局产物布局，根目录为当前环境报告目录"""
+    global _layout
+    with _layout_lock:
+        if _layout is None:
+            from config.config import config
+            _layout = ArtifactLayout(config.REPORT_PATH)
+        return _layout
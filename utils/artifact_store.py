@@ -0,0 +1,229 @@
+"""
+内容寻址产物存储 - 截图、视频等产物按内容哈希存放，跨运行共享相同内容
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Optional, Dict, List, Tuple
+from utils.logger import log
+
+
+class ArtifactStore:
+    """
+    内容寻址存储
+    
+    blob路径: {root}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{ext}
+    引用关系记录在各运行的产物清单(manifests)中（blob字段），
+    引用计数 = 仍存在的清单中引用该blob的次数，报告目录回收清单后由 collect 删除无引用的blob。
+    存储目录在 reports/ 之外，不随CI归档，也不在报告目录回收范围内。
+    """
+    
+    def __init__(self, root: str = "./.cache/cas"):
+        self.root = root
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.reused = 0
+        self.bytes_reused = 0
+    
+    def blob_path(self, digest: str, extension: str) -> str:
+        """blob文件路径"""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{extension.lstrip('.')}")
+    
+    def put_bytes(self, data: bytes, extension: str, digest: str = None) -> Tuple[str, str]:
+        """
+        存入数据，内容已存在时直接复用
+        
+        Args:
+            data: 数据
+            extension: 文件扩展名
+            digest: 调用方已计算的sha256，为None时在此计算
+        
+        Returns:
+            (sha256, blob路径)
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest, extension)
+        if self._exists(path, len(data)):
+            return digest, path
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._count_stored()
+        return digest, path
+    
+    def put_file(self, source: str, extension: str = None) -> Tuple[str, str]:
+        """
+        存入文件（优先硬链接，跨文件系统时复制），内容已存在时直接复用
+        
+        Returns:
+            (sha256, blob路径)
+        """
+        extension = extension or os.path.splitext(source)[1].lstrip(".") or "bin"
+        digest = self.file_digest(source)
+        path = self.blob_path(digest, extension)
+        if self._exists(path, os.path.getsize(source)):
+            return digest, path
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        self._count_stored()
+        return digest, path
+    
+    def link_into_store(self, path: str) -> Optional[str]:
+        """
+        将目录中的现有文件替换为指向blob的硬链接（内容相同的文件只占一份磁盘）
+        
+        用于 allure-results / allure-report 中的附件副本。
+        
+        Returns:
+            sha256，失败时返回None
+        """
+        try:
+            digest, blob = self.put_file(path)
+            if os.path.samefile(path, blob):
+                return digest
+            tmp_path = f"{path}.{os.getpid()}.link.tmp"
+            os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+            return digest
+        except OSError as e:
+            log.debug(f"附件链接到产物存储失败: {path}, 错误: {e}")
+            return None
+    
+    def link_directory(self, directory: str, pattern: str = "*") -> List[Tuple[str, str]]:
+        """
+        将目录下匹配的文件全部链接到blob
+        
+        Returns:
+            [(文件路径, sha256)]，调用方需将其记录到产物清单，否则blob没有引用，下次回收时会被删除
+        """
+        linked = []
+        for path in glob.glob(os.path.join(directory, pattern)):
+            if not os.path.isfile(path):
+                continue
+            digest = self.link_into_store(path)
+            if digest:
+                linked.append((path, digest))
+        return linked
+    
+    def reference_counts(self, reports_root: str) -> Dict[str, int]:
+        """统计仍存在的运行清单对各blob的引用次数"""
+        counts: Dict[str, int] = {}
+        for manifest in glob.glob(os.path.join(reports_root, "*", "manifests", "*", "*.jsonl")):
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if '"blob"' not in line:
+                            continue
+                        digest = json.loads(line).get("blob")
+                        if digest:
+                            counts[digest] = counts.get(digest, 0) + 1
+            except (OSError, ValueError) as e:
+                log.warning(f"读取产物清单失败: {manifest}, 错误: {e}")
+        return counts
+    
+    def collect(self, reports_root: str, protect_since: float = None) -> Dict[str, int]:
+        """
+        删除不再被任何运行清单引用的blob，以及因此变空的分片目录
+        
+        Args:
+            reports_root: 报告根目录（各环境的清单在 <reports_root>/<env>/manifests 下）
+            protect_since: 该时间戳之后写入的blob不删除（通常为本次运行开始时间）
+        
+        Returns:
+            统计: blob数、删除数、释放字节数
+        """
+        referenced = self.reference_counts(reports_root)
+        stats = {"blobs": 0, "deleted": 0, "freed_bytes": 0}
+        if not os.path.isdir(self.root):
+            return stats
+        for directory, _, files in os.walk(self.root, topdown=False):
+            for name in files:
+                digest = blob_digest_from_path(name)
+                if digest is None:
+                    continue
+                stats["blobs"] += 1
+                if digest in referenced:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                    if protect_since and stat.st_mtime >= protect_since:
+                        continue
+                    os.remove(path)
+                except OSError as e:
+                    log.debug(f"删除无引用blob失败: {path}, 错误: {e}")
+                    continue
+                stats["deleted"] += 1
+                # 仍有其他硬链接（如Allure附件）时磁盘空间不会释放
+                if stat.st_nlink <= 1:
+                    stats["freed_bytes"] += stat.st_size
+            if directory != self.root:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+        if stats["deleted"]:
+            log.info(f"产物存储回收: 删除 {stats['deleted']} 个无引用blob，释放 {stats['freed_bytes']} 字节")
+        return stats
+    
+    def stats(self) -> Dict[str, int]:
+        """本进程写入/复用统计"""
+        with self._lock:
+            return {"stored": self.stored, "reused": self.reused, "bytes_reused": self.bytes_reused}
+    
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """计算文件sha256"""
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+    
+    def _exists(self, path: str, size: int) -> bool:
+        if os.path.exists(path):
+            with self._lock:
+                self.reused += 1
+                self.bytes_reused += size
+            return True
+        return False
+    
+    def _count_stored(self):
+        with self._lock:
+            self.stored += 1
+
+
+def blob_digest_from_path(path: str) -> Optional[str]:
+    """从blob路径中解析sha256"""
+    name = os.path.basename(path).split(".", 1)[0]
+    return name if len(name) == 64 else None
+
+
+_store: Optional[ArtifactStore] = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """获取全局产物存储，未启用时返回None"""
+    global _store, _store_loaded
+    with _store_lock:
+        if not _store_loaded:
+            from config.config import config
+            store_config = config.ARTIFACT_STORE
+            if store_config.get("enabled", False):
+                _store = ArtifactStore(store_config.get("root", "./.cache/cas"))
+            _store_loaded = True
+        return _store
@@ -0,0 +1,130 @@
+"""
+产物后台写入模块 - 截图等产物的落盘和缩略图在后台线程池中执行
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, Callable
+from utils.logger import log
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow为可选依赖，未安装时不生成缩略图
+    Image = None
+
+
+class ArtifactWriter:
+    """产物后台写入器 - 有界线程池，测试线程不等待文件I/O"""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32):
+        """
+        Args:
+            max_workers: 后台线程数
+            max_pending: 最大排队任务数，超出后丢弃落盘任务（附件已在内存中完成）
+        """
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """
+        提交后台任务
+
+        Returns:
+            是否已提交，队列已满时返回False
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.dropped += 1
+            log.warning(f"产物写入队列已满({self.max_pending})，丢弃任务: {getattr(fn, '__name__', fn)}")
+            return False
+
+        future = self._executor.submit(self._run, fn, *args, **kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+        return True
+
+    def write_bytes(self, path: str, data: bytes, thumbnail_width: int = 0,
+                    on_written: Optional[Callable[[], None]] = None) -> bool:
+        """后台写入文件（目录在后台创建），可选生成缩略图，写入后在后台线程调用 on_written"""
+        return self.submit(self._write_bytes, path, data, thumbnail_width, on_written)
+
+    def drain(self, timeout: Optional[float] = None):
+        """等待所有已提交任务完成"""
+        with self._lock:
+            pending = list(self._futures)
+        if pending:
+            log.info(f"等待 {len(pending)} 个产物写入任务完成")
+            wait(pending, timeout=timeout)
+        if self.dropped:
+            log.warning(f"本次运行共丢弃 {self.dropped} 个产物写入任务")
+
+    def shutdown(self):
+        """等待任务完成并关闭线程池"""
+        self.drain()
+        self._executor.shutdown(wait=True)
+
+    def _run(self, fn: Callable, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            log.error(f"后台产物任务失败: {e}")
+
+    def _on_done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    @staticmethod
+    def _write_bytes(path: str, data: bytes, thumbnail_width: int = 0,
+                     on_written: Optional[Callable[[], None]] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        if thumbnail_width:
+            ArtifactWriter._write_thumbnail(path, thumbnail_width)
+        if on_written is not None:
+            on_written()
+
+    @staticmethod
+    def _write_thumbnail(path: str, width: int):
+        if Image is None:
+            log.debug("未安装Pillow，跳过缩略图生成")
+            return
+        root, ext = os.path.splitext(path)
+        with Image.open(path) as image:
+            if image.width > width:
+                height = int(image.height * width / image.width)
+                image = image.resize((width, height))
+            image.save(f"{root}_thumb{ext}")
+
+
+_writer: Optional[ArtifactWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """获取全局产物写入器"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            from config.config import config
+            pipeline = config.SCREENSHOT_PIPELINE
+            _writer = ArtifactWriter(
+                max_workers=pipeline.get("workers", 2),
+                max_pending=pipeline.get("max_pending", 32)
+            )
+        return _writer
+
+
+def shutdown_artifact_writer():
+    """会话结束时等待所有产物写入完成"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.shutdown()
@@ -0,0 +1,252 @@
+"""
+异步基础页面类 - utils.base_page.BasePage 基于 playwright.async_api 的版本，方法相同（均为协程）
+"""
+from typing import Optional
+from playwright.async_api import Page
+from utils.async_wait import AsyncWait
+from utils.base_page import BasePage
+from utils.logger import log, log_exceptions
+
+
+class AsyncBasePage(BasePage):
+    """异步基础页面类"""
+    
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.wait = AsyncWait(page)
+    
+    async def navigate_to(self, url: str) -> bool:
+        """
+        导航到指定URL
+        
+        Args:
+            url: 目标URL
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("导航", url):
+            log.info(f"导航到: {url}")
+            await self.page.goto(url)
+            await self.wait.wait_for_page_load()
+            return True
+        return False
+    
+    async def click(self, selector: str, timeout: int = 10000) -> bool:
+        """
+        点击元素
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("点击元素", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                await element.click()
+                log.info(f"点击元素: {selector}")
+                return True
+        return False
+    
+    async def type_text(self, selector: str, text: str, timeout: int = 10000) -> bool:
+        """
+        输入文本
+        
+        Args:
+            selector: 元素选择器
+            text: 要输入的文本
+            timeout: 超时时间
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("输入文本", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                await element.fill(text)
+                log.info(f"输入文本: {text} 到 {selector}")
+                return True
+        return False
+    
+    async def get_text(self, selector: str, timeout: int = 10000) -> Optional[str]:
+        """
+        获取元素文本
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            元素文本
+        """
+        with log_exceptions("获取文本", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                text = await element.text_content()
+                log.info(f"获取文本: {text} 从 {selector}")
+                return text
+        return None
+    
+    async def get_attribute(self, selector: str, attribute: str, timeout: int = 10000) -> Optional[str]:
+        """
+        获取元素属性
+        
+        Args:
+            selector: 元素选择器
+            attribute: 属性名
+            timeout: 超时时间
+        
+        Returns:
+            属性值
+        """
+        with log_exceptions("获取属性", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                value = await element.get_attribute(attribute)
+                log.info(f"获取属性: {attribute}={value} 从 {selector}")
+                return value
+        return None
+    
+    async def is_element_visible(self, selector: str, timeout: int = 5000) -> bool:
+        """
+        检查元素是否可见
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            是否可见
+        """
+        with log_exceptions("检查元素可见性", selector):
+            element = self.page.locator(selector)
+            return await element.is_visible(timeout=timeout)
+        return False
+    
+    async def is_element_enabled(self, selector: str, timeout: int = 5000) -> bool:
+        """
+        检查元素是否启用
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            是否启用
+        """
+        with log_exceptions("检查元素启用状态", selector):
+            element = self.page.locator(selector)
+            return await element.is_enabled(timeout=timeout)
+        return False
+    
+    async def select_option(self, selector: str, value: str, timeout: int = 10000) -> bool:
+        """
+        选择下拉框选项
+        
+        Args:
+            selector: 下拉框选择器
+            value: 选项值
+            timeout: 超时时间
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("选择选项", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                await element.select_option(value=value)
+                log.info(f"选择选项: {value} 从 {selector}")
+                return True
+        return False
+    
+    async def hover(self, selector: str, timeout: int = 10000) -> bool:
+        """
+        鼠标悬停
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("鼠标悬停", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                await element.hover()
+                log.info(f"鼠标悬停: {selector}")
+                return True
+        return False
+    
+    async def scroll_to_element(self, selector: str, timeout: int = 10000) -> bool:
+        """
+        滚动到元素
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("滚动到元素", selector):
+            element = await self.wait.wait_for_element(selector, timeout)
+            if element:
+                await element.scroll_into_view_if_needed()
+                log.info(f"滚动到元素: {selector}")
+                return True
+        return False
+    
+    async def get_page_title(self) -> str:
+        """
+        获取页面标题
+        
+        Returns:
+            页面标题
+        """
+        return await self.page.title()
+    
+    async def refresh_page(self) -> bool:
+        """
+        刷新页面
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("刷新页面"):
+            await self.page.reload()
+            await self.wait.wait_for_page_load()
+            log.info("页面已刷新")
+            return True
+        return False
+    
+    async def go_back(self) -> bool:
+        """
+        返回上一页
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("返回上一页"):
+            await self.page.go_back()
+            await self.wait.wait_for_page_load()
+            log.info("已返回上一页")
+            return True
+        return False
+    
+    async def go_forward(self) -> bool:
+        """
+        前进到下一页
+        
+        Returns:
+            是否成功
+        """
+        with log_exceptions("前进到下一页"):
+            await self.page.go_forward()
+            await self.wait.wait_for_page_load()
+            log.info("已前进到下一页")
+            return True
+        return False
@@ -0,0 +1,89 @@
+"""
+异步并发工具 - 在同步测试中运行异步页面对象，多个页面对象在同一浏览器上下文的多个标签页中并发执行
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from playwright.async_api import async_playwright, BrowserContext, Page
+from utils.logger import log
+from utils.step_middleware import mark_concurrent, unmark_concurrent
+
+
+def run_async(coro_func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    在独立线程的事件循环中运行协程并返回结果
+    
+    pytest-playwright 的同步API已占用当前线程的事件循环，不能在同步测试中直接 asyncio.run。
+    """
+    result: Dict[str, Any] = {}
+    
+    def target():
+        try:
+            result["value"] = asyncio.run(coro_func(*args, **kwargs))
+        except BaseException as e:
+            result["error"] = e
+    
+    thread = threading.Thread(target=target, name="async-runner")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
+
+
+@asynccontextmanager
+async def async_browser_context(context_args: Optional[Dict[str, Any]] = None, headless: bool = True):
+    """
+    启动（或连接共享浏览器服务的）Chromium并创建上下文
+    
+    Args:
+        context_args: 浏览器上下文参数，通常取 browser_context_args fixture
+        headless: 是否无头模式
+    """
+    from utils.browser_server import get_browser_server
+    
+    async with async_playwright() as playwright:
+        server = get_browser_server()
+        if server is not None:
+            endpoint = await asyncio.to_thread(server.ensure_running, playwright.chromium.executable_path)
+            browser = await playwright.chromium.connect_over_cdp(endpoint)
+        else:
+            browser = await playwright.chromium.launch(headless=headless)
+        context = await browser.new_context(**(context_args or {}))
+        try:
+            yield context
+        finally:
+            await context.close()
+            await browser.close()
+
+
+async def open_pages(context: BrowserContext, count: int) -> List[Page]:
+    """并发打开多个标签页"""
+    return list(await asyncio.gather(*(context.new_page() for _ in range(count))))
+
+
+async def run_concurrently(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    并发执行多个页面对象流程，按传入顺序返回结果
+    
+    任一流程抛出异常时取消其余流程并抛出该异常。
+    
+    Allure的步骤栈按线程记录，并发流程在同一线程上交替执行，各流程的 allure_step 不记录为Allure步骤
+    （否则会互相嵌套），步骤日志、截图附件、trace和耗时统计照常记录。
+    """
+    # 任务创建时复制当前上下文，并发标记只对这些任务生效
+    token = mark_concurrent()
+    try:
+        tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    finally:
+        unmark_concurrent(token)
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        log.error("并发流程执行失败，已取消其余流程")
+        raise
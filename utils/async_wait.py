@@ -0,0 +1,245 @@
+"""
+异步等待工具类 - Wait 的 playwright.async_api 版本，方法与 Wait 一致
+"""
+import asyncio
+import inspect
+import time
+from typing import Optional, Callable, Union, Any
+from playwright.async_api import Page, Frame, Locator
+from utils.conditions import PageCondition, next_condition_token
+from utils.logger import log
+from utils.readiness import get_readiness_registry
+
+# Python条件的首次检查间隔(秒)，之后翻倍直到interval
+_MIN_POLL_INTERVAL = 0.01
+
+class AsyncWait:
+    """异步等待工具类"""
+    
+    def __init__(self, page: Page):
+        self.page = page
+    
+    async def wait_for_element(self, selector: str, timeout: int = 10000) -> Optional[Locator]:
+        """
+        等待元素出现
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间(毫秒)
+        
+        Returns:
+            元素定位器
+        """
+        try:
+            element = self.page.locator(selector)
+            await element.wait_for(state="visible", timeout=timeout)
+            log.info(f"元素已出现: {selector}")
+            return element
+        except Exception as e:
+            log.error(f"等待元素超时: {selector}, 错误: {str(e)}")
+            return None
+    
+    async def wait_for_element_disappear(self, selector: str, timeout: int = 10000) -> bool:
+        """
+        等待元素消失
+        
+        Args:
+            selector: 元素选择器
+            timeout: 超时时间(毫秒)
+        
+        Returns:
+            是否消失
+        """
+        try:
+            element = self.page.locator(selector)
+            await element.wait_for(state="hidden", timeout=timeout)
+            log.info(f"元素已消失: {selector}")
+            return True
+        except Exception as e:
+            log.error(f"等待元素消失超时: {selector}, 错误: {str(e)}")
+            return False
+    
+    async def wait_for_page_load(self, timeout: int = 30000, readiness=None) -> bool:
+        """
+        按就绪策略等待页面加载完成
+        
+        Args:
+            timeout: 超时时间(毫秒)
+            readiness: 页面key或策略配置，为None时按当前URL匹配页面key
+        
+        Returns:
+            是否加载完成
+        """
+        try:
+            await get_readiness_registry().resolve(readiness, self.page.url).wait_async(self.page, timeout)
+            log.info("页面加载完成")
+            return True
+        except Exception as e:
+            log.error(f"页面加载超时: {str(e)}")
+            return False
+    
+    async def wait_for_url(self, url: str, timeout: int = 10000) -> bool:
+        """
+        等待URL变化
+        
+        Args:
+            url: 期望的URL
+            timeout: 超时时间(毫秒)
+        
+        Returns:
+            是否匹配
+        """
+        try:
+            await self.page.wait_for_url(url, timeout=timeout)
+            log.info(f"URL已匹配: {url}")
+            return True
+        except Exception as e:
+            log.error(f"等待URL超时: {url}, 错误: {str(e)}")
+            return False
+    
+    async def wait_for_condition(self, condition: Union[Callable, str, PageCondition], timeout: int = 10000,
+                                 interval: float = 0.5, arg: Any = None, frame: Optional[Frame] = None) -> bool:
+        """
+        等待自定义条件
+        
+        JS表达式/函数和 PageCondition 在页面内等待（见 wait_for_frame_condition）；
+        Python函数按指数退避轮询，间隔从10ms翻倍到interval。
+        
+        Args:
+            condition: 条件函数（可返回协程）、JS表达式/函数或 PageCondition
+            timeout: 超时时间(毫秒)
+            interval: Python条件的最大检查间隔(秒)
+            arg: 传给JS函数的参数
+            frame: 只在该frame内等待，默认所有frame
+        
+        Returns:
+            条件是否满足
+        """
+        if isinstance(condition, (str, PageCondition)):
+            return await self.wait_for_frame_condition(condition, timeout, arg, frame) is not None
+        
+        deadline = time.monotonic() + timeout / 1000
+        delay = min(_MIN_POLL_INTERVAL, interval)
+        while True:
+            try:
+                result = condition()
+                if inspect.isawaitable(result):
+                    result = await result
+                if result:
+                    log.info("自定义条件已满足")
+                    return True
+            except Exception as e:
+                log.debug(f"检查条件时出错: {str(e)}")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, interval)
+        
+        log.error(f"等待自定义条件超时: {timeout}ms")
+        return False
+    
+    async def wait_for_frame_condition(self, condition: Union[str, PageCondition], timeout: int = 10000,
+                                       arg: Any = None, frame: Optional[Frame] = None,
+                                       poll_interval: int = 100) -> Optional[Frame]:
+        """
+        在页面内等待JS条件，返回条件成立的frame（说明见 Wait.wait_for_frame_condition）
+        
+        Args:
+            condition: JS表达式、接收arg的JS函数或 PageCondition
+            timeout: 超时时间(毫秒)
+            arg: 传给JS函数的参数（PageCondition 自带参数时忽略）
+            frame: 只在该frame内等待，默认所有frame
+            poll_interval: 页面内兜底检查间隔(毫秒)，0为只依赖DOM变化
+        
+        Returns:
+            条件成立的frame，超时返回None
+        """
+        if not isinstance(condition, PageCondition):
+            condition = PageCondition(condition, arg)
+        script = condition.watch_script()
+        token = next_condition_token()
+        frames = [frame] if frame is not None else list(self.page.frames)
+        deadline = time.monotonic() + timeout / 1000
+        hits = []
+        
+        def on_console(message):
+            if message.text.startswith(token):
+                hits.append(message.text)
+        
+        async def inject(index: int):
+            target = frames[index]
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if hits or remaining <= 0:
+                return
+            try:
+                if await target.evaluate(script, [f"{token}{index}", remaining, poll_interval, condition.arg]):
+                    hits.append(f"{token}{index}")
+            except Exception as e:
+                log.debug(f"条件注入frame失败: {target.url}, 错误: {str(e)}")
+        
+        async def on_navigated(navigated: Frame):
+            # 导航后原文档中的监听随之销毁，在新文档中重新注入
+            if frame is not None and navigated != frame:
+                return
+            if navigated not in frames:
+                frames.append(navigated)
+            await inject(frames.index(navigated))
+        
+        self.page.on("console", on_console)
+        self.page.on("framenavigated", on_navigated)
+        try:
+            for index in range(len(frames)):
+                await inject(index)
+            if not hits:
+                remaining = max(deadline - time.monotonic(), 0.001)
+                message = await self.page.wait_for_event(
+                    "console", predicate=lambda m: m.text.startswith(token), timeout=remaining * 1000)
+                hits.append(message.text)
+            matched = frames[int(hits[0][len(token):])]
+            log.info(f"自定义条件已满足: {condition.description} (frame: {matched.url})")
+            return matched
+        except Exception as e:
+            log.error(f"等待自定义条件超时: {condition.description}, 错误: {str(e)}")
+            return None
+        finally:
+            self.page.remove_listener("console", on_console)
+            self.page.remove_listener("framenavigated", on_navigated)
+    
+    async def wait_for_text(self, text: str, timeout: int = 10000) -> bool:
+        """
+        等待文本出现
+        
+        Args:
+            text: 期望的文本
+            timeout: 超时时间(毫秒)
+        
+        Returns:
+            是否出现
+        """
+        try:
+            await self.page.wait_for_selector(f"text={text}", timeout=timeout)
+            log.info(f"文本已出现: {text}")
+            return True
+        except Exception as e:
+            log.error(f"等待文本超时: {text}, 错误: {str(e)}")
+            return False
+    
+    async def wait_for_network_idle(self, timeout: int = 10000) -> bool:
+        """
+        等待网络空闲
+        
+        Args:
+            timeout: 超时时间(毫秒)
+        
+        Returns:
+            是否空闲
+        """
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=timeout)
+            log.info("网络已空闲")
+            return True
+        except Exception as e:
+            log.error(f"等待网络空闲超时: {str(e)}")
+            return False 
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+登录态缓存 - 每个测试用户每次会话只登录一次，storage_state 落盘并带过期时间，供各用例的浏览器上下文注入
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Optional, Dict, Any, Callable
+from playwright.sync_api import Browser, Playwright, Page
+from utils.file_lock import FileLock
+from utils.logger import log
+
+# 页面登录的上下文不录制视频和HAR（这些文件不会被附加到报告，也不会被清理）
+_RECORDING_ARGS = ("record_video_dir", "record_video_size", "record_har_path", "record_har_content",
+                   "record_har_mode", "record_har_omit_content", "record_har_url_filter")
+
+
+class AuthStateCache:
+    """
+    登录态缓存
+    
+    - 缓存文件: {cache_dir}/{sha1(username)[:12]}.json，内容为 storage_state（cookie和token）及过期时间，
+      仅当前用户可读写；
+    - 多个xdist worker同时需要同一用户的登录态时，通过锁文件保证只有一个worker执行登录；
+    - 登录校验失败时调用 invalidate 删除缓存，下次获取时重新登录。
+    """
+    
+    def __init__(self, cache_dir: str, ttl_seconds: int = 3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.logins = 0
+    
+    def path_for(self, username: str) -> str:
+        """用户登录态文件路径"""
+        digest = hashlib.sha1(username.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+    
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的登录态，不存在或已过期时返回None"""
+        try:
+            with open(self.path_for(username), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry.get("storage_state")
+    
+    def save(self, username: str, storage_state: Dict[str, Any]):
+        """保存登录态"""
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        path = self.path_for(username)
+        entry = {
+            "username": username,
+            "saved_at": time.time(),
+            "expires_at": time.time() + self.ttl_seconds,
+            "storage_state": storage_state
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def invalidate(self, username: str):
+        """删除用户登录态"""
+        try:
+            os.remove(self.path_for(username))
+            log.info(f"登录态已失效: {username}")
+        except FileNotFoundError:
+            pass
+    
+    def get_or_login(self, username: str, login: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        获取登录态，缓存不可用时执行登录并保存
+        
+        Args:
+            username: 用户名
+            login: 执行登录并返回 storage_state 的函数
+        """
+        storage_state = self.get(username)
+        if storage_state is not None:
+            self.hits += 1
+            return storage_state
+        
+        with FileLock(f"{self.path_for(username)}.lock", timeout=120):
+            # 其他worker可能已在等锁期间完成登录
+            storage_state = self.get(username)
+            if storage_state is not None:
+                self.hits += 1
+                return storage_state
+            
+            start = time.perf_counter()
+            storage_state = login()
+            self.logins += 1
+            self.save(username, storage_state)
+            log.info(f"登录态已缓存: {username} (登录耗时 {(time.perf_counter() - start) * 1000:.0f}ms)")
+            return storage_state
+
+
+def login_via_ui(browser: Browser, user: Dict[str, str], login_config: Dict[str, Any],
+                 context_args: Dict[str, Any] = None) -> Dict[str, Any]:
+    """通过登录页面登录，返回 storage_state（去掉上下文参数中的录制参数）"""
+    context_args = {key: value for key, value in (context_args or {}).items() if key not in _RECORDING_ARGS}
+    context = browser.new_context(**context_args)
+    try:
+        page = context.new_page()
+        page.goto(login_config["url"])
+        page.fill(login_config["username_selector"], user["username"])
+        page.fill(login_config["password_selector"], user["password"])
+        page.click(login_config["submit_selector"])
+        if login_config.get("success_url_contains"):
+            page.wait_for_url(f"**{login_config['success_url_contains']}**")
+        else:
+            page.wait_for_load_state("networkidle")
+        return context.storage_state()
+    finally:
+        context.close()
+
+
+def login_via_api(playwright: Playwright, user: Dict[str, str], api_config: Dict[str, Any]) -> Dict[str, Any]:
+    """通过登录接口登录（不启动页面），返回接口响应设置的 storage_state"""
+    request_context = playwright.request.new_context(ignore_https_errors=True)
+    try:
+        payload = {
+            api_config.get("username_field", "username"): user["username"],
+            api_config.get("password_field", "password"): user["password"]
+        }
+        response = request_context.fetch(api_config["url"], method=api_config.get("method", "POST"), data=payload)
+        if not response.ok:
+            raise RuntimeError(f"接口登录失败: {response.status} {response.status_text}")
+        return request_context.storage_state()
+    finally:
+        request_context.dispose()
+
+
+def is_logged_in(page: Page, check_config: Dict[str, Any]) -> bool:
+    """
+    登录校验：打开校验页面并检查登录后才出现的元素
+    
+    未配置校验时视为已登录。
+    """
+    if not check_config.get("url"):
+        return True
+    try:
+        page.goto(check_config["url"])
+        if check_config.get("logged_in_selector"):
+            page.wait_for_selector(check_config["logged_in_selector"],
+                                   timeout=check_config.get("timeout", 5000))
+        if check_config.get("login_url_contains") and check_config["login_url_contains"] in page.url:
+            return False
+        return True
+    except Exception as e:
+        log.warning(f"登录校验失败: {e}")
+        return False
+
+
+_cache: Optional[AuthStateCache] = None
+
+
+def get_auth_state_cache() -> AuthStateCache:
+    """获取全局登录态缓存，目录为 auth.dir 下的当前环境子目录（默认 ./.cache/auth/<env>，不在报告目录中）"""
+    global _cache
+    if _cache is None:
+        from config.config import config
+        auth_config = config.AUTH
+        _cache = AuthStateCache(os.path.join(auth_config.get("dir", "./.cache/auth"), config.ENV),
+                                int(auth_config.get("ttl_seconds", 3600)))
+    return _cache
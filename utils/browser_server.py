@@ -0,0 +1,213 @@
+"""
+共享浏览器服务 - 每次运行（或每台机器）只启动一个Chromium，xdist各worker通过本地CDP端点连接
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Optional, Dict, Any
+from playwright.sync_api import Browser, Playwright
+from utils.file_lock import FileLock
+from utils.logger import log
+
+SCOPES = ("off", "session", "machine")
+
+
+class BrowserServer:
+    """
+    共享浏览器服务
+    
+    - 以 --remote-debugging-port 启动Playwright自带的Chromium，状态写入 {state_dir}/.browser_server.json；
+    - session: 由 run_tests.py 启动并在运行结束后关闭；machine: 启动后常驻，后续运行直接复用；
+    - 健康检查失败（进程崩溃/端口无响应）时自动重启，多个worker并发时通过锁文件保证只启动一次。
+    """
+    
+    STATE_FILE = ".browser_server.json"
+    
+    def __init__(self, port: int = 9333, headless: bool = True, state_dir: str = "./reports",
+                 startup_timeout: float = 30, scope: str = "session"):
+        self.port = port
+        self.headless = headless
+        self.scope = scope
+        self.startup_timeout = startup_timeout
+        self.state_path = os.path.join(state_dir, self.STATE_FILE)
+        self.lock_path = f"{self.state_path}.lock"
+    
+    @property
+    def http_endpoint(self) -> str:
+        """CDP HTTP端点"""
+        return f"http://127.0.0.1:{self.port}"
+    
+    def is_healthy(self) -> bool:
+        """端点是否可用"""
+        try:
+            with urllib.request.urlopen(f"{self.http_endpoint}/json/version", timeout=2) as response:
+                return "webSocketDebuggerUrl" in json.loads(response.read().decode("utf-8"))
+        except Exception:
+            return False
+    
+    def ensure_running(self, executable_path: str) -> str:
+        """
+        确保服务可用，未启动或已崩溃时（重新）启动
+        
+        Args:
+            executable_path: Chromium可执行文件路径（playwright.chromium.executable_path）
+        
+        Returns:
+            CDP HTTP端点
+        """
+        if self.is_healthy():
+            return self.http_endpoint
+        
+        with self._file_lock():
+            # 其他worker可能已在等锁期间启动完成
+            if self.is_healthy():
+                return self.http_endpoint
+            self._kill_stale()
+            self._launch(executable_path)
+        return self.http_endpoint
+    
+    def stop(self):
+        """关闭服务"""
+        state = self._read_state()
+        pid = state.get("pid")
+        if pid:
+            self._terminate(pid)
+            log.info(f"共享浏览器服务已关闭: pid={pid}")
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+    
+    def _launch(self, executable_path: str):
+        user_data_dir = os.path.join(tempfile.gettempdir(), f"ti_webui_browser_server_{self.port}")
+        command = [
+            executable_path,
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+        ]
+        if self.headless:
+            command.append("--headless=new")
+        
+        popen_args: Dict[str, Any] = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+        if sys.platform == "win32":
+            popen_args["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        else:
+            # 脱离pytest进程组，worker退出时不会连带关闭浏览器
+            popen_args["start_new_session"] = True
+        process = subprocess.Popen(command, **popen_args)
+        
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.is_healthy():
+                self._write_state({"pid": process.pid, "port": self.port, "scope": self.scope,
+                                   "started_at": time.time()})
+                log.info(f"共享浏览器服务已启动: {self.http_endpoint} (pid={process.pid})")
+                return
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+        
+        process.kill()
+        raise RuntimeError(f"共享浏览器服务启动失败: {self.http_endpoint}")
+    
+    def _kill_stale(self):
+        """清理已无响应的旧进程"""
+        pid = self._read_state().get("pid")
+        if pid:
+            log.warning(f"共享浏览器服务无响应，重新启动: pid={pid}")
+            self._terminate(pid)
+    
+    @staticmethod
+    def _terminate(pid: int):
+        try:
+            if sys.platform == "win32":
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.kill(pid, 15)
+        except (OSError, ProcessLookupError):
+            pass
+    
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _write_state(self, state: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+    
+    def _file_lock(self):
+        return FileLock(self.lock_path, timeout=self.startup_timeout + 10)
+
+
+class SharedBrowser:
+    """
+    连接共享浏览器服务的Browser代理
+    
+    供pytest-playwright的context/page fixture使用；每次创建上下文前检查连接，
+    服务崩溃时自动重启并重新连接。
+    """
+    
+    def __init__(self, playwright: Playwright, server: BrowserServer):
+        self._playwright = playwright
+        self._server = server
+        self._browser: Optional[Browser] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def browser(self) -> Browser:
+        """当前连接的Browser"""
+        with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    log.warning("共享浏览器连接已断开，正在重新连接")
+                endpoint = self._server.ensure_running(self._playwright.chromium.executable_path)
+                self._browser = self._playwright.chromium.connect_over_cdp(endpoint)
+            return self._browser
+    
+    def new_context(self, **kwargs):
+        return self.browser.new_context(**kwargs)
+    
+    def new_page(self, **kwargs):
+        return self.browser.new_page(**kwargs)
+    
+    def close(self):
+        """断开连接（服务本身由启动方关闭）"""
+        with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                self._browser.close()
+            self._browser = None
+    
+    def __getattr__(self, name):
+        return getattr(self.browser, name)
+
+
+def get_browser_server() -> Optional[BrowserServer]:
+    """按配置获取共享浏览器服务，未启用时返回None"""
+    from config.config import config
+    server_config = config.BROWSER_SERVER
+    if server_config.get("scope", "off") == "off":
+        return None
+    return BrowserServer(
+        port=int(server_config.get("port", 9333)),
+        headless=config.HEADLESS,
+        state_dir=server_config.get("state_dir", "./reports"),
+        startup_timeout=float(server_config.get("startup_timeout", 30)),
+        scope=server_config["scope"]
+    )
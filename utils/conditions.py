@@ -0,0 +1,106 @@
+"""
+页面内等待条件 - 把条件编译为在各frame内执行的谓词，由 MutationObserver 在DOM变化时重新判断，
+满足时通过一条console消息通知Python，等待期间不再逐次往返轮询
+"""
+import itertools
+import re
+from typing import Any, Optional
+
+# console消息前缀，ConsoleLogMiddleware 据此过滤
+CONDITION_MESSAGE_PREFIX = "__condition_met__:"
+
+_FUNCTION_PATTERN = re.compile(r"^\s*(async\s+)?(function\b|\([^)]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)")
+_tokens = itertools.count(1)
+
+# 参数: [通知消息, 超时(毫秒), 兜底轮询间隔(毫秒), 条件参数]；条件满足时发出通知（立即满足时同时返回true）。
+# 通知依赖 console.debug 产生Playwright的console事件，页面替换了 console.debug 时收不到通知
+_WATCH_SCRIPT = """([message, timeout, pollMs, arg]) => {
+  const predicate = %s;
+  let done = false;
+  let observer = null, timer = null, deadline = null;
+  const stop = () => {
+    done = true;
+    if (observer) observer.disconnect();
+    clearInterval(timer);
+    clearTimeout(deadline);
+  };
+  const check = () => {
+    if (done) return false;
+    let satisfied = false;
+    try { satisfied = !!predicate(arg); } catch (e) {}
+    if (satisfied) {
+      stop();
+      console.debug(message);
+    }
+    return satisfied;
+  };
+  if (check()) return true;
+  observer = new MutationObserver(check);
+  observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  if (pollMs > 0) timer = setInterval(check, pollMs);
+  deadline = setTimeout(stop, timeout);
+  return false;
+}"""
+
+
+class PageCondition:
+    """
+    页面内条件
+    
+    Args:
+        expression: JS表达式或接收arg的JS函数（须为同步函数）
+        arg: 传给函数的参数，需可序列化
+        description: 日志中的描述
+    """
+    
+    def __init__(self, expression: str, arg: Any = None, description: Optional[str] = None):
+        self.expression = expression
+        self.arg = arg
+        self.description = description or expression
+    
+    @property
+    def is_function(self) -> bool:
+        return bool(_FUNCTION_PATTERN.match(self.expression))
+    
+    def watch_script(self) -> str:
+        """编译为 frame.evaluate 执行的监听脚本"""
+        predicate = self.expression if self.is_function else f"(arg) => ({self.expression})"
+        return _WATCH_SCRIPT % predicate
+    
+    def __repr__(self):
+        return f"PageCondition({self.description})"
+
+
+def next_condition_token() -> str:
+    """生成一次等待专用的消息前缀，消息为 前缀 + frame序号"""
+    return f"{CONDITION_MESSAGE_PREFIX}{next(_tokens)}:"
+
+
+def is_condition_message(text: str) -> bool:
+    """是否为条件通知消息"""
+    return text.startswith(CONDITION_MESSAGE_PREFIX)
+
+
+def text_present(text: str) -> PageCondition:
+    """页面可见文本包含text"""
+    return PageCondition("(text) => !!document.body && document.body.innerText.includes(text)",
+                         text, f"文本出现: {text}")
+
+
+def selector_count(selector: str, minimum: int = 1) -> PageCondition:
+    """CSS选择器匹配的元素数不少于minimum"""
+    return PageCondition("([selector, minimum]) => document.querySelectorAll(selector).length >= minimum",
+                         [selector, minimum], f"{selector} 数量 >= {minimum}")
+
+
+def element_text(selector: str, text: str) -> PageCondition:
+    """CSS选择器匹配的第一个元素文本包含text"""
+    return PageCondition(
+        "([selector, text]) => { const el = document.querySelector(selector); "
+        "return !!el && el.textContent.includes(text); }",
+        [selector, text], f"{selector} 文本包含: {text}")
+
+
+def window_flag(name: str, value: Any = True) -> PageCondition:
+    """window上的全局变量等于value"""
+    return PageCondition("([name, value]) => window[name] === value", [name, value], f"window.{name} === {value!r}")
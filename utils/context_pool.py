@@ -0,0 +1,173 @@
+"""
+浏览器上下文池 - 预先创建上下文，用例之间清理状态后复用，省去每个用例新建上下文的开销
+"""
+from collections import deque
+from typing import Optional, Dict, Any, Deque
+from playwright.sync_api import BrowserContext
+from utils.logger import log
+
+
+class ContextPool:
+    """
+    浏览器上下文池
+    
+    - 启动时预先创建 size 个上下文，acquire 取出空闲上下文，没有时临时创建；
+    - release 时清理状态：关闭页面、清除cookie、权限、路由以及各源的存储（localStorage/
+      sessionStorage/IndexedDB/Cache等），清理失败的上下文直接关闭丢弃；
+    - 每个上下文最多复用 max_uses 次，避免长时间运行的浏览器进程积累内存。
+    """
+    
+    # CDP Storage.clearDataForOrigin 清除的存储类型
+    storage_types = "all"
+    
+    def __init__(self, browser, context_args: Dict[str, Any], size: int = 2, max_uses: int = 50):
+        self.browser = browser
+        self.context_args = context_args
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: Deque[BrowserContext] = deque()
+        self._uses: Dict[int, int] = {}
+        self.created = 0
+        self.reused = 0
+    
+    def warm_up(self):
+        """预先创建上下文"""
+        while len(self._idle) < self.size:
+            self._idle.append(self._create())
+    
+    def acquire(self) -> BrowserContext:
+        """取出一个干净的上下文"""
+        while self._idle:
+            context = self._idle.popleft()
+            if self._is_alive(context):
+                self.reused += 1
+                self._uses[id(context)] = self._uses.get(id(context), 0) + 1
+                return context
+            self._discard(context)
+        context = self._create()
+        self._uses[id(context)] = 1
+        return context
+    
+    def release(self, context: BrowserContext):
+        """归还上下文，清理成功且未超过复用次数时放回池中"""
+        if self._uses.get(id(context), 0) >= self.max_uses or len(self._idle) >= self.size:
+            self._discard(context)
+            return
+        try:
+            self.scrub(context)
+        except Exception as e:
+            log.warning(f"清理浏览器上下文失败，丢弃该上下文: {e}")
+            self._discard(context)
+            return
+        self._idle.append(context)
+    
+    def scrub(self, context: BrowserContext):
+        """清理上下文状态"""
+        origins = set()
+        try:
+            origins.update(origin["origin"] for origin in context.storage_state().get("origins", []))
+        except Exception as e:
+            log.debug(f"读取上下文存储状态失败: {e}")
+        for page in context.pages:
+            if page.url.startswith("http"):
+                origins.add(self._origin(page.url))
+        
+        self._clear_origins(context, origins)
+        
+        for page in list(context.pages):
+            page.close()
+        context.clear_cookies()
+        context.clear_permissions()
+        self._clear_routes(context)
+        context.set_extra_http_headers(self.context_args.get("extra_http_headers", {}))
+        context.set_offline(False)
+    
+    def close(self):
+        """关闭池中所有上下文"""
+        while self._idle:
+            self._discard(self._idle.popleft())
+        log.info(f"上下文池关闭: 新建 {self.created} 个，复用 {self.reused} 次")
+    
+    def _clear_origins(self, context: BrowserContext, origins):
+        """清除各源的存储，chromium下通过CDP一次清除 storage_types 指定的存储类型"""
+        if not origins:
+            return
+        scratch_page = None
+        if context.pages:
+            page = context.pages[0]
+        else:
+            page = scratch_page = context.new_page()
+        try:
+            session = context.new_cdp_session(page)
+        except Exception:
+            session = None
+        
+        try:
+            if session is not None:
+                for origin in origins:
+                    session.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": self.storage_types})
+                session.detach()
+                return
+        finally:
+            if scratch_page is not None:
+                # 临时页面不需要录制视频
+                scratch_page.close()
+                if scratch_page.video:
+                    scratch_page.video.delete()
+        
+        # 非chromium：只能在页面当前所在的源中清除，其余源有残留存储时不复用该上下文
+        cleared = set()
+        for open_page in context.pages:
+            if open_page.url.startswith("http"):
+                open_page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+                cleared.add(self._origin(open_page.url))
+        if origins - cleared:
+            raise RuntimeError(f"无法清除以下源的存储: {sorted(origins - cleared)}")
+    
+    @staticmethod
+    def _clear_routes(context: BrowserContext):
+        """清除上下文路由，不支持 unroute_all 的版本中存在路由时不复用该上下文"""
+        unroute_all = getattr(context, "unroute_all", None)
+        if unroute_all is not None:
+            unroute_all(behavior="ignoreErrors")
+            return
+        routes = getattr(getattr(context, "_impl_obj", None), "_routes", None)
+        if routes:
+            raise RuntimeError("当前Playwright版本不支持unroute_all，上下文存在路由")
+    
+    def _create(self) -> BrowserContext:
+        self.created += 1
+        return self.browser.new_context(**self.context_args)
+    
+    def _discard(self, context: BrowserContext):
+        self._uses.pop(id(context), None)
+        try:
+            context.close()
+        except Exception as e:
+            log.debug(f"关闭浏览器上下文失败: {e}")
+    
+    @staticmethod
+    def _is_alive(context: BrowserContext) -> bool:
+        browser = context.browser
+        return browser is None or browser.is_connected()
+    
+    @staticmethod
+    def _origin(url: str) -> str:
+        scheme, _, rest = url.partition("://")
+        return f"{scheme}://{rest.split('/', 1)[0]}"
+
+
+def create_context_pool(browser, context_args: Dict[str, Any]) -> Optional[ContextPool]:
+    """按配置创建上下文池，未启用时返回None"""
+    from config.config import config
+    pool_config = config.CONTEXT_POOL
+    if not pool_config.get("enabled", False):
+        return None
+    pool = ContextPool(
+        browser,
+        context_args,
+        size=int(pool_config.get("size", 2)),
+        max_uses=int(pool_config.get("max_uses", 50))
+    )
+    pool.warm_up()
+    return pool
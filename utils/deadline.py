@@ -0,0 +1,131 @@
+"""
+用例时间预算 - 整个用例共用一个截止时间，页面对象的点击、等待元素、导航等操作的超时不超过剩余时间，
+超出预算时报告耗时最多的步骤
+"""
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+
+class DeadlineExceeded(BaseException):
+    """
+    用例时间预算已用完
+    
+    继承 BaseException 而不是 TimeoutError：页面对象和 Wait 的方法用 except Exception
+    把操作失败转换为返回False，预算用完时需要穿过这些处理直接结束用例。
+    """
+
+
+class Deadline:
+    """
+    单个用例的截止时间
+    
+    Args:
+        budget_ms: 时间预算(毫秒)
+        test_name: 用例名
+    """
+    
+    def __init__(self, budget_ms: int, test_name: str = ""):
+        self.budget_ms = budget_ms
+        self.test_name = test_name
+        self.start = time.monotonic()
+        self._lock = threading.Lock()
+        # (步骤名, 嵌套深度, 耗时毫秒)
+        self._steps: List[Tuple[str, int, float]] = []
+    
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.start) * 1000
+    
+    @property
+    def remaining_ms(self) -> float:
+        return self.budget_ms - self.elapsed_ms
+    
+    @property
+    def overrun(self) -> bool:
+        return self.remaining_ms < 0
+    
+    def clamp(self, timeout: Optional[int], action: str = "") -> int:
+        """
+        把操作的超时限制在剩余时间内
+        
+        Args:
+            timeout: 操作原本的超时(毫秒)，None或0表示不限
+            action: 操作名，用于错误信息
+        
+        Raises:
+            DeadlineExceeded: 预算已用完
+        """
+        remaining = self.remaining_ms
+        if remaining <= 0:
+            raise DeadlineExceeded(f"用例 {self.test_name} 已超出时间预算 {self.budget_ms}ms，不再执行: {action}")
+        if not timeout:
+            return max(int(remaining), 1)
+        return max(int(min(timeout, remaining)), 1)
+    
+    def record_step(self, name: str, depth: int, duration: float):
+        """记录步骤耗时(秒)"""
+        with self._lock:
+            self._steps.append((name, depth, duration * 1000))
+    
+    def slowest_step(self, min_depth: int = 1, max_depth: int = 1) -> Optional[Tuple[str, float]]:
+        """嵌套深度在 [min_depth, max_depth] 内耗时最多的步骤(名称, 毫秒)，默认为最外层步骤"""
+        with self._lock:
+            steps = [(name, ms) for name, depth, ms in self._steps if min_depth <= depth <= max_depth]
+        return max(steps, key=lambda step: step[1]) if steps else None
+    
+    def report(self) -> Dict[str, Any]:
+        """预算使用情况: 预算、耗时、超出时间，以及按耗时排序的最外层步骤"""
+        with self._lock:
+            outermost = sorted(((name, ms) for name, depth, ms in self._steps if depth == 1),
+                               key=lambda step: step[1], reverse=True)
+        slowest = self.slowest_step()
+        # 最外层步骤内部耗时最多的页面操作
+        slowest_action = self.slowest_step(min_depth=2, max_depth=1 << 16)
+        return {
+            "test": self.test_name,
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "overrun_ms": round(max(-self.remaining_ms, 0), 1),
+            "slowest_step": {"name": slowest[0], "ms": round(slowest[1], 1)} if slowest else None,
+            "slowest_action": {"name": slowest_action[0], "ms": round(slowest_action[1], 1)} if slowest_action else None,
+            "steps": [{"name": name, "ms": round(ms, 1)} for name, ms in outermost[:10]]
+        }
+
+
+_active_deadline: Optional[Deadline] = None
+
+
+def get_deadline() -> Optional[Deadline]:
+    """当前用例的截止时间，未设置预算时为None"""
+    return _active_deadline
+
+
+def set_deadline(deadline: Optional[Deadline]):
+    """设置当前用例的截止时间（进程内全局，异步页面对象在其他线程中同样生效）"""
+    global _active_deadline
+    _active_deadline = deadline
+
+
+def clamp_timeout(timeout: Optional[int], action: str = "") -> Optional[int]:
+    """按当前用例的剩余时间限制超时，没有截止时间时原样返回"""
+    deadline = _active_deadline
+    if deadline is None:
+        return timeout
+    return deadline.clamp(timeout, action)
+
+
+def resolve_budget(marker_seconds: Optional[float], test_name: str) -> Optional[float]:
+    """
+    用例的时间预算(秒)：deadline 标记 > 测试数据 deadlines.tests > deadlines.default，0或None为不限
+    
+    Args:
+        marker_seconds: deadline 标记的参数
+        test_name: 用例函数名
+    """
+    if marker_seconds is not None:
+        return float(marker_seconds) or None
+    from config.config import config
+    deadlines = config.DEADLINES
+    budget = deadlines["tests"].get(test_name, deadlines.get("default"))
+    return float(budget) if budget else None
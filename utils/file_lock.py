@@ -0,0 +1,41 @@
+"""
+跨进程文件锁 - xdist各worker之间协调只执行一次的初始化操作
+"""
+import os
+import time
+from utils.logger import log
+
+
+class FileLock:
+    """基于O_EXCL的跨进程锁，超时视为持锁进程已退出"""
+    
+    def __init__(self, path: str, timeout: float):
+        self.path = path
+        self.timeout = timeout
+    
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode("ascii"))
+                os.close(fd)
+                return self
+            except FileExistsError:
+                if time.time() > deadline:
+                    log.warning(f"等待锁超时，强制获取: {self.path}")
+                    try:
+                        os.remove(self.path)
+                    except FileNotFoundError:
+                        pass
+                    deadline = time.time() + self.timeout
+                    continue
+                time.sleep(0.1)
+    
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return False
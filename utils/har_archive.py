@@ -0,0 +1,149 @@
+"""
+HAR录制回放 - 录制每个用例及 urls 中各页面的网络请求，回放时通过Playwright路由从磁盘返回响应
+"""
+import glob
+import json
+import os
+import re
+from typing import Optional, Dict, Any, List
+from playwright.sync_api import Page
+from utils.file_lock import FileLock
+from utils.logger import log
+
+
+class HarArchive:
+    """
+    HAR存档
+    
+    - 用例HAR: {root}/tests/{用例名}.har，录制时每个用例使用独立上下文，上下文关闭时写入；
+    - 页面HAR: {root}/pages/{页面key}.har，录制结束后按导航的页面URL从用例HAR中拆分合并，
+      回放时作为用例HAR之外的兜底（多个用例访问同一页面时共享）；
+    - 回放时未命中的请求按 not_found 处理: abort 拦截（完全离线）/ fallback 放行到真实网络。
+    """
+    
+    def __init__(self, root: str, mode: str = "off", not_found: str = "abort", urls: Dict[str, str] = None):
+        self.root = root
+        self.mode = mode
+        self.not_found = not_found
+        self.urls = urls or {}
+    
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+    
+    def test_har_path(self, test_name: str) -> str:
+        """用例HAR路径"""
+        return os.path.join(self.root, "tests", f"{re.sub(r'[^0-9A-Za-z_.-]', '_', test_name)}.har")
+    
+    def page_har_path(self, page_key: str) -> str:
+        """页面HAR路径"""
+        return os.path.join(self.root, "pages", f"{page_key}.har")
+    
+    def record_context_args(self, test_name: str) -> Dict[str, Any]:
+        """录制用例HAR的浏览器上下文参数"""
+        path = self.test_har_path(test_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return {"record_har_path": path, "record_har_mode": "full"}
+    
+    def finish_recording(self, test_name: str):
+        """上下文关闭后调用：将用例HAR按页面拆分合并到页面HAR"""
+        path = self.test_har_path(test_name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                har = json.load(f)
+        except (FileNotFoundError, ValueError) as e:
+            log.warning(f"读取HAR失败: {path}, 错误: {e}")
+            return
+        
+        entries_by_page = self._split_by_page_key(har["log"].get("entries", []))
+        for page_key, entries in entries_by_page.items():
+            self._merge_page_har(page_key, entries)
+        log.info(f"HAR已录制: {path} ({len(har['log'].get('entries', []))} 个请求，"
+                 f"页面: {', '.join(sorted(entries_by_page)) or '无'})")
+    
+    def replay(self, page: Page, test_name: str) -> int:
+        """
+        在页面上注册回放路由，返回使用的HAR文件数
+        
+        后注册的路由优先：用例HAR > 页面HAR > 未命中处理。
+        """
+        paths = sorted(glob.glob(os.path.join(self.root, "pages", "*.har")))
+        test_path = self.test_har_path(test_name)
+        if os.path.exists(test_path):
+            paths.append(test_path)
+        
+        if self.not_found == "abort":
+            page.route("**/*", lambda route: route.abort("internetdisconnected"))
+        for path in paths:
+            page.route_from_har(path, not_found="fallback")
+        if not paths:
+            log.warning(f"没有可回放的HAR: {test_name}")
+        return len(paths)
+    
+    def _page_key_for(self, url: str) -> Optional[str]:
+        for page_key, page_url in self.urls.items():
+            if page_url and url.startswith(page_url):
+                return page_key
+        return None
+    
+    def _split_by_page_key(self, entries: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """按每个标签页最近一次导航的文档URL将请求归属到页面key"""
+        current: Dict[str, Optional[str]] = {}
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in sorted(entries, key=lambda item: item.get("startedDateTime", "")):
+            pageref = entry.get("pageref", "")
+            if _is_document(entry):
+                current[pageref] = self._page_key_for(entry["request"]["url"])
+            page_key = current.get(pageref)
+            if page_key:
+                result.setdefault(page_key, []).append(entry)
+        return result
+    
+    def _merge_page_har(self, page_key: str, entries: List[Dict[str, Any]]):
+        """合并到页面HAR，同一请求保留最新录制的响应"""
+        path = self.page_har_path(page_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with FileLock(f"{path}.lock", timeout=30):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    existing = json.load(f)["log"]["entries"]
+            except (FileNotFoundError, ValueError, KeyError):
+                existing = []
+            
+            merged = {}
+            for entry in existing + entries:
+                entry = {key: value for key, value in entry.items() if key != "pageref"}
+                merged[(entry["request"]["method"], entry["request"]["url"])] = entry
+            har = {"log": {"version": "1.2", "creator": {"name": "ti-webui"}, "pages": [],
+                           "entries": list(merged.values())}}
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(har, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+
+def _is_document(entry: Dict[str, Any]) -> bool:
+    """是否为页面导航请求"""
+    if entry.get("_resourceType"):
+        return entry["_resourceType"] == "document"
+    mime_type = entry.get("response", {}).get("content", {}).get("mimeType", "")
+    return mime_type.startswith("text/html")
+
+
+_archive: Optional[HarArchive] = None
+
+
+def get_har_archive() -> HarArchive:
+    """获取当前环境的HAR存档（模式由 run_tests.py 通过环境变量 HAR_MODE 传入）"""
+    global _archive
+    if _archive is None:
+        from config.config import config
+        from utils.test_data_manager import TestDataManager
+        har_config = config.HAR
+        _archive = HarArchive(os.path.join(har_config["dir"], config.ENV), har_config["mode"],
+                              har_config["not_found"], TestDataManager().get_urls())
+    return _archive
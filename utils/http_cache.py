@@ -0,0 +1,259 @@
+"""
+HTTP响应磁盘缓存 - 通过页面路由缓存静态资源（JS/CSS/字体/图片），各xdist worker及多次运行共享，
+全新上下文中的冷启动页面也不必重复下载
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, List
+from playwright.sync_api import Page, Route
+from utils.file_lock import FileLock
+from utils.logger import log
+from utils.routing import RESOURCE_TYPE_EXTENSIONS
+
+# fulfill 时由Playwright重新计算或已解压，不能原样返回
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+# 没有max-age/Expires时按Last-Modified启发式计算的最长新鲜期
+_HEURISTIC_MAX_SECONDS = 24 * 3600
+
+
+class HttpDiskCache:
+    """
+    HTTP响应磁盘缓存
+    
+    - 键: URL + 响应Vary头列出的请求头取值，{root}/{sha1(url)}.vary 记录该URL的Vary头；
+    - 条目: {key}.json 保存状态码、响应头和过期时间，{key}.body 保存响应体；
+    - 只缓存 GET 200 且无 no-store/no-cache/private/Set-Cookie 的响应，新鲜期取 s-maxage/max-age，
+      其次 Expires，再次按 Last-Modified 的10%（最长1天）；
+    - 命中时更新文件修改时间，超出 max_mb 时按修改时间淘汰最久未使用的条目，并删除其URL的 .vary 文件
+      （同一URL的其他条目下次请求时重新写入）。
+    """
+    
+    def __init__(self, root: str, max_mb: int = 512, resource_types: List[str] = None):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.resource_types = set(resource_types or ["script", "stylesheet", "font", "image"])
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "uncacheable": 0, "bytes_served": 0, "evicted": 0}
+    
+    def apply(self, page: Page):
+        """在页面上注册缓存路由（应先于路由配置注册，使拦截规则优先）"""
+        mapped = [RESOURCE_TYPE_EXTENSIONS[resource_type] for resource_type in self.resource_types
+                  if resource_type in RESOURCE_TYPE_EXTENSIONS]
+        if self.resource_types - set(RESOURCE_TYPE_EXTENSIONS):
+            page.route("**/*", self._handle)
+        elif mapped:
+            page.route(re.compile(rf"\.({'|'.join(mapped)})(\?|#|$)", re.IGNORECASE), self._handle)
+    
+    def _handle(self, route: Route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            route.fallback()
+            return
+        
+        headers = request.headers
+        entry = self.get(request.url, headers)
+        if entry is not None:
+            meta, body = entry
+            self._count("hits", bytes_served=len(body))
+            route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return
+        
+        self._count("misses")
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception as e:
+            log.debug(f"缓存回源失败，交给浏览器处理: {request.url}, 错误: {e}")
+            route.fallback()
+            return
+        if self.put(request.url, headers, response.status, response.headers, body):
+            self._count("stored")
+        else:
+            self._count("uncacheable")
+        route.fulfill(response=response, body=body)
+    
+    def get(self, url: str, request_headers: Dict[str, str]) -> Optional[tuple]:
+        """读取未过期的缓存条目，返回 (meta, body)"""
+        vary = self._read_vary(url)
+        if vary is None:
+            return None
+        path = self._entry_path(url, vary, request_headers)
+        try:
+            with open(f"{path}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["expires_at"] <= time.time():
+                return None
+            with open(f"{path}.body", "rb") as f:
+                body = f.read()
+            # 修改时间作为LRU的最近使用时间
+            os.utime(f"{path}.json")
+            return meta, body
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+    
+    def size_of(self, url: str, request_headers: Dict[str, str] = None) -> Optional[int]:
+        """缓存中该URL响应体的字节数（包括已过期的条目），没有缓存时返回None；用于估算被拦截请求的大小"""
+        vary = self._read_vary(url)
+        if vary is None:
+            return None
+        path = self._entry_path(url, vary, request_headers or {})
+        try:
+            with open(f"{path}.json", "r", encoding="utf-8") as f:
+                return int(json.load(f)["size"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+    
+    def put(self, url: str, request_headers: Dict[str, str], status: int, headers: Dict[str, str],
+            body: bytes) -> bool:
+        """按Cache-Control写入缓存，不可缓存时返回False"""
+        ttl = freshness_lifetime(status, headers)
+        if ttl <= 0 or len(body) > self.max_bytes // 10:
+            return False
+        vary = [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+        if "*" in vary:
+            return False
+        
+        os.makedirs(self.root, exist_ok=True)
+        path = self._entry_path(url, vary, request_headers)
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS},
+            "expires_at": time.time() + ttl,
+            "size": len(body)
+        }
+        _atomic_write(f"{path}.body", body)
+        _atomic_write(f"{path}.json", json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        _atomic_write(self._vary_path(url), json.dumps(vary).encode("utf-8"))
+        return True
+    
+    def evict(self) -> int:
+        """超出容量时按最近使用时间淘汰条目，返回淘汰数"""
+        if not os.path.isdir(self.root):
+            return 0
+        with FileLock(os.path.join(self.root, ".evict.lock"), timeout=30):
+            entries = []
+            total = 0
+            for name in os.listdir(self.root):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.root, name[:-len(".json")])
+                try:
+                    size = os.path.getsize(f"{path}.body")
+                    entries.append((os.path.getmtime(f"{path}.json"), path, size))
+                    total += size
+                except OSError:
+                    continue
+            
+            evicted = 0
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    with open(f"{path}.json", "r", encoding="utf-8") as f:
+                        url = json.load(f).get("url")
+                    if url:
+                        os.remove(self._vary_path(url))
+                except (OSError, ValueError):
+                    pass
+                for suffix in (".json", ".body"):
+                    try:
+                        os.remove(f"{path}{suffix}")
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                evicted += 1
+        self._count("evicted", evicted)
+        return evicted
+    
+    def report(self) -> Dict[str, int]:
+        """淘汰超出容量的条目，输出并返回统计"""
+        try:
+            self.evict()
+        except Exception as e:
+            log.warning(f"HTTP缓存淘汰失败: {e}")
+        stats = dict(self.stats)
+        requests = stats["hits"] + stats["misses"]
+        if requests:
+            log.info(f"HTTP缓存: 命中 {stats['hits']}/{requests} ({stats['hits'] / requests:.0%})，"
+                     f"返回 {stats['bytes_served']} 字节，写入 {stats['stored']} 条，淘汰 {stats['evicted']} 条")
+        return stats
+    
+    def _count(self, name: str, value: int = 1, bytes_served: int = 0):
+        with self._lock:
+            self.stats[name] += value
+            self.stats["bytes_served"] += bytes_served
+    
+    def _vary_path(self, url: str) -> str:
+        return os.path.join(self.root, f"{_sha1(url)}.vary")
+    
+    def _read_vary(self, url: str) -> Optional[List[str]]:
+        try:
+            with open(self._vary_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def _entry_path(self, url: str, vary: List[str], request_headers: Dict[str, str]) -> str:
+        vary_values = "\n".join(f"{name}:{request_headers.get(name, '')}" for name in sorted(vary))
+        return os.path.join(self.root, _sha1(f"{url}\n{vary_values}"))
+
+
+def freshness_lifetime(status: int, headers: Dict[str, str]) -> float:
+    """按响应头计算可缓存秒数，不可缓存时返回0"""
+    if status != 200 or "set-cookie" in headers:
+        return 0
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    if {"no-store", "no-cache", "private"} & set(directives):
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            return int(directives[name])
+    
+    try:
+        date = parsedate_to_datetime(headers["date"]).timestamp() if "date" in headers else time.time()
+        if "expires" in headers:
+            return max(parsedate_to_datetime(headers["expires"]).timestamp() - date, 0)
+        if "last-modified" in headers:
+            age = date - parsedate_to_datetime(headers["last-modified"]).timestamp()
+            return min(max(age * 0.1, 0), _HEURISTIC_MAX_SECONDS)
+    except (TypeError, ValueError):
+        pass
+    return 0
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_cache: Optional[HttpDiskCache] = None
+_cache_loaded = False
+
+
+def get_http_cache() -> Optional[HttpDiskCache]:
+    """获取HTTP响应缓存（未启用时为None）"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        from config.config import config
+        cache_config = config.HTTP_CACHE
+        if cache_config.get("enabled"):
+            _cache = HttpDiskCache(cache_config["dir"], int(cache_config.get("max_mb", 512)),
+                                   cache_config.get("resource_types"))
+        _cache_loaded = True
+    return _cache
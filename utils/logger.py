@@ -3,6 +3,7 @@
 """
 import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime
 from loguru import logger
 
@@ -83,6 +84,18 @@ class Logger:
 # 全局日志实例
 log = Logger().get_logger()
 
+@contextmanager
+def log_exceptions(description: str, target: str = None):
+    """
+    执行页面操作，异常时记录"{description}失败"并吞掉异常，调用方在 with 块之后返回失败值
+    
+    同步和异步页面对象共用（with 块内可以 await），异步版本只保留 await 调用的一层。
+    """
+    try:
+        yield
+    except Exception as e:
+        log.error(f"{description}失败: {target}, 错误: {str(e)}" if target else f"{description}失败: {str(e)}")
+
 # 美化日志输出函数
 def log_step(step_name: str, status: str = "开始", details: str = ""):
     """记录测试步骤"""
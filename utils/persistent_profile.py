@@ -0,0 +1,145 @@
+"""
+持久化浏览器配置目录 - 每个worker使用固定的用户数据目录，浏览器自身的HTTP磁盘缓存、代码缓存和
+Service Worker 在用例之间及多次运行之间保留，cookie和各源存储仍按用例隔离
+"""
+import os
+import shutil
+import time
+from typing import Optional, Dict, Any
+from playwright.sync_api import BrowserContext, BrowserType
+from utils.context_pool import ContextPool
+from utils.logger import log
+
+# 启动前删除的上次运行遗留的登录态和存储，保留 Cache / Code Cache / Service Worker 等目录
+_STORAGE_ENTRIES = [
+    "Cookies", "Cookies-journal", "Network/Cookies", "Network/Cookies-journal",
+    "Local Storage", "Session Storage", "IndexedDB", "WebStorage", "databases", "File System"
+]
+_LAST_USED_FILE = ".last_used"
+
+
+class PersistentProfile:
+    """
+    worker的持久化用户数据目录: {root}/{browser}/{worker}
+    
+    - 启动前超过 max_mb 的目录整体删除重建，并清理 max_age_days 天未使用的其他worker目录；
+    - 启动前删除上次遗留的cookie和存储，缓存保留。
+    """
+    
+    def __init__(self, root: str, browser_name: str, worker: str, max_mb: int = 1024, max_age_days: int = 7):
+        self.root = os.path.join(root, browser_name)
+        self.worker = worker
+        self.user_data_dir = os.path.join(self.root, worker)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 24 * 3600
+    
+    def prepare(self) -> str:
+        """按容量和有效期清理后返回用户数据目录"""
+        self.cleanup_stale()
+        size = directory_size(self.user_data_dir)
+        if size > self.max_bytes:
+            log.info(f"持久化配置目录超出上限({size / 1024 ** 2:.0f} MB)，重建: {self.user_data_dir}")
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        self._reset_storage()
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        with open(os.path.join(self.user_data_dir, _LAST_USED_FILE), "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+        return self.user_data_dir
+    
+    def cleanup_stale(self) -> int:
+        """删除长期未使用的其他worker目录，返回删除数"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name == self.worker or not os.path.isdir(path):
+                continue
+            marker = os.path.join(path, _LAST_USED_FILE)
+            last_used = os.path.getmtime(marker) if os.path.exists(marker) else os.path.getmtime(path)
+            if time.time() - last_used > self.max_age_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            log.info(f"已删除 {removed} 个过期的持久化配置目录")
+        return removed
+    
+    def launch(self, browser_type: BrowserType, launch_args: Dict[str, Any],
+               context_args: Dict[str, Any]) -> BrowserContext:
+        """启动使用该目录的持久化上下文"""
+        return browser_type.launch_persistent_context(self.prepare(), **{**launch_args, **context_args})
+    
+    def _reset_storage(self):
+        for base in (self.user_data_dir, os.path.join(self.user_data_dir, "Default")):
+            for entry in _STORAGE_ENTRIES:
+                path = os.path.join(base, entry)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.exists(path):
+                    os.remove(path)
+
+
+class PersistentContextPool(ContextPool):
+    """
+    持久化上下文池：只有一个持久化上下文，用例之间按 ContextPool 的方式清理，
+    但保留 Cache Storage 和 Service Worker；清理失败时关闭，下个用例重新启动
+    """
+    
+    storage_types = "cookies,local_storage,indexeddb,websql,file_systems,shader_cache"
+    
+    def __init__(self, profile: PersistentProfile, browser_type: BrowserType, launch_args: Dict[str, Any],
+                 context_args: Dict[str, Any]):
+        super().__init__(None, context_args, size=1, max_uses=0)
+        self.profile = profile
+        self.browser_type = browser_type
+        self.launch_args = launch_args
+        self._closed = set()
+    
+    def release(self, context: BrowserContext):
+        """归还上下文（持久化上下文不受复用次数限制）"""
+        try:
+            self.scrub(context)
+        except Exception as e:
+            log.warning(f"清理持久化上下文失败，关闭后重新启动: {e}")
+            self._discard(context)
+            return
+        self._idle.append(context)
+    
+    def _create(self) -> BrowserContext:
+        self.created += 1
+        context = self.profile.launch(self.browser_type, self.launch_args, self.context_args)
+        context.on("close", lambda closed: self._closed.add(id(closed)))
+        # 持久化上下文启动时自带一个空白页，交给第一个用例前关闭
+        for page in list(context.pages):
+            page.close()
+        return context
+    
+    def _is_alive(self, context: BrowserContext) -> bool:
+        return id(context) not in self._closed
+
+
+def directory_size(path: str) -> int:
+    """目录总字节数"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+    return total
+
+
+def get_persistent_profile(browser_name: str) -> Optional[PersistentProfile]:
+    """按配置获取当前worker的持久化配置目录（未启用时为None）"""
+    from config.config import config
+    profile_config = config.PERSISTENT_PROFILE
+    if not profile_config.get("enabled"):
+        return None
+    return PersistentProfile(
+        profile_config["dir"],
+        browser_name,
+        os.getenv("PYTEST_XDIST_WORKER", "main"),
+        max_mb=int(profile_config.get("max_mb", 1024)),
+        max_age_days=int(profile_config.get("max_age_days", 7))
+    )
@@ -0,0 +1,159 @@
+"""
+页面就绪检测 - 按页面key选择就绪策略，替代一律等待 networkidle（轮询、统计脚本、长连接会让networkidle
+至少多等500ms，甚至等满超时）
+"""
+import time
+from typing import Optional, Dict, Any, List, Union
+from utils.logger import log
+from utils.routing import glob_to_regex
+
+# DOM在quietMs内没有变化时resolve，超时reject
+DOM_QUIET_SCRIPT = """
+({quietMs, timeout}) => new Promise((resolve, reject) => {
+  let timer = setTimeout(done, quietMs);
+  const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(done, quietMs);
+  });
+  const limit = setTimeout(() => {
+    observer.disconnect();
+    clearTimeout(timer);
+    reject(new Error(`DOM在${timeout}ms内未静默`));
+  }, timeout);
+  function done() {
+    observer.disconnect();
+    clearTimeout(limit);
+    resolve(true);
+  }
+  observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+})
+"""
+
+# 资源计时中每个URL正则都有已完成的请求
+REQUESTS_DONE_SCRIPT = """
+(patterns) => patterns.every(source => {
+  const regex = new RegExp(source);
+  return performance.getEntriesByType('resource').some(entry => regex.test(entry.name) && entry.responseEnd > 0);
+})
+"""
+
+
+class ReadinessStrategy:
+    """
+    就绪策略
+    
+    - load_state: 等待加载状态 {"type": "load_state", "state": "load"}
+    - selector: 元素达到指定状态 {"type": "selector", "selector": "text=收藏的课程", "state": "visible"}
+    - dom_quiet: DOM在N毫秒内没有变化 {"type": "dom_quiet", "quiet_ms": 300}
+    - js_signal: 页面自定义的就绪标志 {"type": "js_signal", "expression": "window.__appReady === true"}
+    - requests: 指定请求已完成 {"type": "requests", "url_patterns": ["**/api/user/**"]}
+    """
+    
+    TYPES = ("load_state", "selector", "dom_quiet", "js_signal", "requests")
+    
+    def __init__(self, strategy_type: str, **options):
+        if strategy_type not in self.TYPES:
+            raise ValueError(f"未知的就绪策略: {strategy_type}")
+        self.type = strategy_type
+        self.options = options
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReadinessStrategy":
+        """从测试数据构建"""
+        data = dict(data)
+        return cls(data.pop("type"), **data)
+    
+    def call(self, page, timeout: float):
+        """执行等待，异步页面返回协程"""
+        if self.type == "load_state":
+            return page.wait_for_load_state(self.options.get("state", "load"), timeout=timeout)
+        if self.type == "selector":
+            return page.locator(self.options["selector"]).first.wait_for(
+                state=self.options.get("state", "visible"), timeout=timeout)
+        if self.type == "dom_quiet":
+            return page.evaluate(DOM_QUIET_SCRIPT, {"quietMs": self.options.get("quiet_ms", 300), "timeout": timeout})
+        if self.type == "js_signal":
+            return page.wait_for_function(self.options["expression"], timeout=timeout)
+        patterns = [glob_to_regex(pattern).pattern for pattern in self.options.get("url_patterns", [])]
+        return page.wait_for_function(REQUESTS_DONE_SCRIPT, arg=patterns, timeout=timeout)
+    
+    def __repr__(self) -> str:
+        return f"{self.type}({', '.join(f'{key}={value}' for key, value in self.options.items())})"
+
+
+class Readiness:
+    """依次满足的一组就绪策略，共用一个超时时间"""
+    
+    def __init__(self, strategies: List[ReadinessStrategy]):
+        self.strategies = strategies
+    
+    @classmethod
+    def from_config(cls, config: Union[Dict[str, Any], List[Dict[str, Any]]]) -> "Readiness":
+        """单个策略或策略列表"""
+        items = config if isinstance(config, list) else [config]
+        return cls([ReadinessStrategy.from_dict(item) for item in items])
+    
+    def wait(self, page, timeout: float = 30000):
+        """等待页面就绪，超时抛出异常"""
+        deadline = time.perf_counter() + timeout / 1000
+        for strategy in self.strategies:
+            strategy.call(page, self._remaining(deadline, strategy))
+    
+    async def wait_async(self, page, timeout: float = 30000):
+        """等待页面就绪（异步页面）"""
+        deadline = time.perf_counter() + timeout / 1000
+        for strategy in self.strategies:
+            await strategy.call(page, self._remaining(deadline, strategy))
+    
+    @staticmethod
+    def _remaining(deadline: float, strategy: ReadinessStrategy) -> float:
+        remaining = (deadline - time.perf_counter()) * 1000
+        if remaining <= 0:
+            raise TimeoutError(f"页面就绪等待超时，未完成: {strategy}")
+        return remaining
+    
+    def __repr__(self) -> str:
+        return " + ".join(repr(strategy) for strategy in self.strategies)
+
+
+class ReadinessRegistry:
+    """测试数据中的就绪策略: default 默认策略，pages 为 urls 中的页面key -> 策略"""
+    
+    def __init__(self, config: Dict[str, Any], urls: Dict[str, str] = None):
+        self.default = Readiness.from_config(config.get("default") or {"type": "load_state", "state": "load"})
+        self.pages = {page_key: Readiness.from_config(item) for page_key, item in config.get("pages", {}).items()}
+        self.urls = urls or {}
+    
+    def resolve(self, choice: Union[None, str, Dict[str, Any], List[Dict[str, Any]]] = None,
+                url: str = None) -> Readiness:
+        """
+        选择就绪策略：页面对象指定的策略或页面key > URL匹配的页面key > 默认策略
+        
+        Args:
+            choice: 页面对象的 readiness 属性（策略配置或页面key）
+            url: 页面URL
+        """
+        if isinstance(choice, (dict, list)):
+            return Readiness.from_config(choice)
+        if isinstance(choice, str):
+            if choice in self.pages:
+                return self.pages[choice]
+            log.warning(f"页面 {choice} 未配置就绪策略，使用默认策略")
+            return self.default
+        for page_key, page_url in self.urls.items():
+            if url and page_url and url.startswith(page_url) and page_key in self.pages:
+                return self.pages[page_key]
+        return self.default
+
+
+_registry: Optional[ReadinessRegistry] = None
+
+
+def get_readiness_registry() -> ReadinessRegistry:
+    """获取当前环境的就绪策略"""
+    global _registry
+    if _registry is None:
+        from config.config import config
+        from utils.test_data_manager import TestDataManager
+        _registry = ReadinessRegistry(config.READINESS, TestDataManager().get_urls())
+    return _registry
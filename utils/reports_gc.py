@@ -0,0 +1,205 @@
+"""
+报告目录垃圾回收 - 按磁盘预算从旧到新(修改时间)清理 reports/ 下各次运行的产物
+"""
+import fnmatch
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.logger import log
+
+# 默认回收范围（相对回收根目录的子目录）：各次运行的截图、视频、trace、日志、清单和Allure结果。
+# HTTP缓存、登录态、浏览器服务状态、耗时历史等运行间共享的状态不在范围内
+DEFAULT_INCLUDE = (
+    "screenshots", "videos", "logs",
+    "*/screenshots", "*/videos", "*/traces", "*/logs", "*/manifests",
+    "*/allure-results", "*/allure-report",
+)
+
+
+class ReportsGC:
+    """
+    报告目录垃圾回收器
+    
+    - 只遍历 include 匹配的子目录，一次 scandir 遍历收集文件；已在索引中且inode未变、
+      没有其他硬链接的文件直接复用索引记录的大小和修改时间，其余文件取 stat；
+    - 同一inode的多个硬链接只计一次大小；有链接在回收范围之外时不计入大小（删除也不释放空间）；
+    - 总大小超出预算时按修改时间从旧到新删除（同一inode的链接一起删除），并删除因此变空的目录；
+    - 本次运行产生的文件和清单中引用的文件受保护，不会被删除。
+    
+    产物存储(cas)不在报告目录中，清单回收后由 run_reports_gc 调用 ArtifactStore.collect 删除无引用的blob。
+    """
+    
+    INDEX_FILE = ".gc_index.json"
+    
+    def __init__(self, root: str = "./reports", budget_bytes: int = 2 * 1024 ** 3,
+                 include: Iterable[str] = DEFAULT_INCLUDE):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.include = tuple(include)
+        self.index_path = os.path.join(root, self.INDEX_FILE)
+        # 相对路径 -> [大小, 修改时间, inode, 硬链接数]
+        self._index: Dict[str, List[float]] = {}
+        self._load_index()
+    
+    def collect(self, protect_since: float = None, protected_paths: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        执行回收
+        
+        Args:
+            protect_since: 该时间戳之后修改的文件不回收（通常为本次运行开始时间）
+            protected_paths: 额外受保护的文件
+        
+        Returns:
+            回收统计: 文件数、总大小、删除文件数、释放字节数
+        """
+        entries = self._scan()
+        protected = {self._key(path) for path in protected_paths}
+        
+        # 按inode分组: inode -> 范围内的链接
+        groups: Dict[int, List[str]] = {}
+        for key, (_, _, inode, _) in entries.items():
+            groups.setdefault(inode, []).append(key)
+        
+        def group_size(keys: List[str]) -> int:
+            size, _, _, nlink = entries[keys[0]]
+            # 还有链接在回收范围之外时，删除这些链接不释放空间
+            return size if nlink <= len(keys) else 0
+        
+        total = sum(group_size(keys) for keys in groups.values())
+        stats = {"files": len(entries), "total_bytes": total, "deleted": 0, "freed_bytes": 0}
+        
+        if total > self.budget_bytes:
+            candidates = sorted(
+                (keys for keys in groups.values()
+                 if not any(key in protected for key in keys)
+                 and not (protect_since and max(entries[key][1] for key in keys) >= protect_since)),
+                key=lambda keys: max(entries[key][1] for key in keys)
+            )
+            emptied = set()
+            for keys in candidates:
+                if total <= self.budget_bytes:
+                    break
+                size = group_size(keys)
+                for key in keys:
+                    try:
+                        os.remove(os.path.join(self.root, key))
+                    except FileNotFoundError:
+                        pass
+                    except Exception as e:
+                        log.warning(f"删除报告文件失败: {key}, 错误: {e}")
+                        continue
+                    entries.pop(key, None)
+                    emptied.add(os.path.dirname(key))
+                    stats["deleted"] += 1
+                total -= size
+                stats["freed_bytes"] += size
+            self._remove_empty_dirs(emptied)
+        
+        self._index = {key: list(entry) for key, entry in entries.items()}
+        self._save_index()
+        stats["remaining_bytes"] = total
+        if stats["deleted"]:
+            log.info(f"报告目录回收: 删除 {stats['deleted']} 个文件，释放 {stats['freed_bytes']} 字节，"
+                     f"剩余 {total} 字节")
+        return stats
+    
+    def _is_scope_root(self, key: str) -> bool:
+        """目录本身是否匹配 include（按路径层级逐级匹配，* 不跨越 /）"""
+        depth = key.count("/")
+        return any(pattern.count("/") == depth and fnmatch.fnmatchcase(key, pattern) for pattern in self.include)
+    
+    def _in_scope(self, key: str) -> bool:
+        """目录是否在回收范围内（自身或某个上级目录匹配 include）"""
+        parts = key.split("/")
+        return any(self._is_scope_root("/".join(parts[:depth])) for depth in range(1, len(parts) + 1))
+    
+    def _scan(self) -> Dict[str, Tuple[int, float, int, int]]:
+        """遍历回收范围，返回 相对路径 -> (大小, 修改时间, inode, 硬链接数)"""
+        entries = {}
+        if not os.path.isdir(self.root):
+            return entries
+        
+        # 范围外的目录只下探到 include 模式的深度，不遍历缓存等大目录
+        max_depth = max((pattern.count("/") + 1 for pattern in self.include), default=0)
+        stack = [(self.root, "", False)]
+        while stack:
+            directory, rel_dir, in_scope = stack.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    for entry in iterator:
+                        key = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            child_in_scope = in_scope or self._in_scope(key)
+                            if child_in_scope or key.count("/") + 1 < max_depth:
+                                stack.append((entry.path, key, child_in_scope))
+                            continue
+                        if not in_scope or not entry.is_file(follow_symlinks=False):
+                            continue
+                        cached = self._index.get(key)
+                        # inode未变且没有其他硬链接时复用索引，硬链接数可能已变化的文件重新 stat
+                        if cached is not None and len(cached) == 4 and cached[2] == entry.inode() and cached[3] == 1:
+                            entries[key] = (int(cached[0]), cached[1], int(cached[2]), 1)
+                        else:
+                            stat = entry.stat(follow_symlinks=False)
+                            entries[key] = (stat.st_size, stat.st_mtime, stat.st_ino, stat.st_nlink)
+            except FileNotFoundError:
+                continue
+        return entries
+    
+    def _remove_empty_dirs(self, directories: Iterable[str]):
+        """删除回收后变空的目录（逐级向上，保留回收范围的顶层目录）"""
+        for directory in sorted(directories, key=lambda d: d.count("/"), reverse=True):
+            while directory and not self._is_scope_root(directory) and self._in_scope(directory):
+                try:
+                    os.rmdir(os.path.join(self.root, directory))
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+    
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.root)).replace(os.sep, "/")
+    
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            self._index = {}
+        except Exception as e:
+            log.warning(f"报告回收索引损坏，重新建立: {e}")
+            self._index = {}
+    
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+def run_reports_gc(protect_since: float = None, protected_paths: Iterable[str] = (),
+                   budget_mb: Optional[int] = None, env: str = None) -> Dict[str, int]:
+    """
+    按配置执行报告目录回收
+    
+    Args:
+        env: 读取哪个环境的测试数据，默认为当前进程的 ENV（run_tests.py 传入 --env）
+    """
+    from config.config import Config, config
+    env_config = Config(env) if env else config
+    gc_config = env_config.REPORTS_GC
+    budget = budget_mb if budget_mb is not None else gc_config.get("budget_mb", 2048)
+    root = gc_config.get("root", "./reports")
+    collector = ReportsGC(root, int(budget) * 1024 ** 2, gc_config.get("include", DEFAULT_INCLUDE))
+    
+    stats = collector.collect(protect_since=protect_since, protected_paths=protected_paths)
+    
+    # 清单回收后，删除产物存储中不再被任何清单引用的blob
+    store_config = env_config.ARTIFACT_STORE
+    if store_config.get("enabled", False):
+        from utils.artifact_store import ArtifactStore
+        store = ArtifactStore(store_config.get("root", "./.cache/cas"))
+        store_stats = store.collect(root, protect_since=protect_since)
+        stats["blobs_deleted"] = store_stats["deleted"]
+        stats["blob_bytes_freed"] = store_stats["freed_bytes"]
+    return stats
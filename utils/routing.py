@@ -0,0 +1,333 @@
+"""
+请求路由配置 - 按测试数据中的路由配置拦截或替换图片、字体、统计脚本等与断言无关的资源
+"""
+import json
+import os
+import re
+import threading
+import weakref
+from typing import Optional, Dict, Any, List, Pattern, Tuple, Union, Callable
+from playwright.sync_api import Page, Route
+from utils.file_lock import FileLock
+from utils.logger import log
+
+# 按扩展名匹配资源类型，只对可能命中的请求开启拦截，其余请求不经过Python回调
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": "png|jpe?g|gif|webp|avif|svg|ico|bmp",
+    "font": "woff2?|ttf|otf|eot",
+    "media": "mp4|webm|ogg|mp3|wav|m4a|m3u8",
+    "stylesheet": "css",
+    "script": "m?js",
+}
+
+
+class RoutingProfile:
+    """
+    路由配置
+    
+    block_resource_types: 拦截的资源类型(image/font/media/stylesheet/script...)
+    block_url_patterns: 拦截的URL（glob，如 **/google-analytics.com/**）
+    allow_url_patterns: 白名单，优先于拦截规则
+    stubs: 替换响应 [{"url": glob, "status": 204, "content_type": "...", "body": "..."}]
+    """
+    
+    def __init__(self, name: str, block_resource_types: List[str] = None, block_url_patterns: List[str] = None,
+                 allow_url_patterns: List[str] = None, stubs: List[Dict[str, Any]] = None):
+        self.name = name
+        self.block_resource_types = set(block_resource_types or [])
+        self.block_url_patterns = list(block_url_patterns or [])
+        self.allow_url_patterns = [glob_to_regex(pattern) for pattern in allow_url_patterns or []]
+        self.stubs = list(stubs or [])
+    
+    @classmethod
+    def from_dict(cls, name: str, data: Optional[Dict[str, Any]]) -> "RoutingProfile":
+        """从测试数据构建"""
+        data = data or {}
+        return cls(
+            name,
+            block_resource_types=data.get("block_resource_types"),
+            block_url_patterns=data.get("block_url_patterns"),
+            allow_url_patterns=data.get("allow_url_patterns"),
+            stubs=data.get("stubs")
+        )
+    
+    @property
+    def is_empty(self) -> bool:
+        return not (self.block_resource_types or self.block_url_patterns or self.stubs)
+    
+    def is_allowed(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.allow_url_patterns)
+    
+    def routes(self, stats: "RouteStats", sizes: "RouteSizeIndex") -> List[Tuple[Union[str, Pattern], Callable]]:
+        """
+        路由规则 [(URL匹配, 处理函数)]，同步和异步页面共用
+        
+        处理函数返回 route.fallback()/abort()/fulfill() 的结果：同步API下为None，
+        异步API下为协程，由Playwright等待完成。
+        """
+        routes = [(stub["url"], self._stub_handler(stub, stats)) for stub in self.stubs]
+        routes.extend((pattern, self._block_handler(stats, sizes)) for pattern in self.block_url_patterns)
+        
+        types = self.block_resource_types
+        mapped = [RESOURCE_TYPE_EXTENSIONS[resource_type] for resource_type in types
+                  if resource_type in RESOURCE_TYPE_EXTENSIONS]
+        if types - set(RESOURCE_TYPE_EXTENSIONS):
+            # 无法按扩展名判断的类型（如beacon/xhr）需要拦截全部请求
+            routes.append(("**/*", self._type_handler(stats, sizes)))
+        elif mapped:
+            pattern = re.compile(rf"\.({'|'.join(mapped)})(\?|#|$)", re.IGNORECASE)
+            routes.append((pattern, self._type_handler(stats, sizes)))
+        return routes
+    
+    def apply(self, page: Page, stats: "RouteStats", sizes: "RouteSizeIndex"):
+        """在页面上注册路由（页面关闭时随之失效，不影响上下文池中的上下文）"""
+        for url, handler in self.routes(stats, sizes):
+            page.route(url, handler)
+    
+    async def apply_async(self, page, stats: "RouteStats", sizes: "RouteSizeIndex"):
+        """在异步页面（playwright.async_api）上注册路由"""
+        for url, handler in self.routes(stats, sizes):
+            await page.route(url, handler)
+    
+    def _block_handler(self, stats, sizes):
+        def handler(route: Route):
+            url = route.request.url
+            if self.is_allowed(url):
+                return route.fallback()
+            stats.record_blocked(self.name, sizes.size_of(url, route.request.headers))
+            return route.abort("blockedbyclient")
+        return handler
+    
+    def _type_handler(self, stats, sizes):
+        def handler(route: Route):
+            request = route.request
+            if request.resource_type not in self.block_resource_types or self.is_allowed(request.url):
+                return route.fallback()
+            stats.record_blocked(self.name, sizes.size_of(request.url, request.headers))
+            return route.abort("blockedbyclient")
+        return handler
+    
+    def _stub_handler(self, stub, stats):
+        def handler(route: Route):
+            stats.record_stubbed(self.name)
+            return route.fulfill(
+                status=stub.get("status", 200),
+                content_type=stub.get("content_type", "text/plain"),
+                body=stub.get("body", "")
+            )
+        return handler
+
+
+class RouteStats:
+    """各路由配置拦截的请求数和字节数（字节数按历史响应大小估算）"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def _entry(self, name: str) -> Dict[str, int]:
+        return self._stats.setdefault(name, {"blocked": 0, "stubbed": 0, "bytes_blocked": 0, "unknown_size": 0})
+    
+    def record_blocked(self, name: str, size: Optional[int]):
+        with self._lock:
+            entry = self._entry(name)
+            entry["blocked"] += 1
+            if size is None:
+                entry["unknown_size"] += 1
+            else:
+                entry["bytes_blocked"] += size
+    
+    def record_stubbed(self, name: str):
+        with self._lock:
+            self._entry(name)["stubbed"] += 1
+    
+    def to_dict(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """各配置的统计；拦截的请求大小全部未知时 bytes_blocked 为None（不可用），而不是0"""
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self._stats.items()}
+        for entry in stats.values():
+            if entry["blocked"] and entry["unknown_size"] == entry["blocked"]:
+                entry["bytes_blocked"] = None
+        return stats
+
+
+class RouteSizeIndex:
+    """
+    URL -> 响应大小索引
+    
+    被拦截的请求不会产生响应，拦截字节数按此前未拦截时见过的Content-Length估算。
+    只在未应用路由配置的页面上学习（如 ROUTING_PROFILE=off 的运行）；没有学习数据时按HTTP响应缓存
+    中该URL的响应体大小估算，两者都没有时记为大小未知。索引在会话结束时合并写回磁盘。
+    """
+    
+    def __init__(self, path: str, http_cache=None):
+        self.path = path
+        # HttpDiskCache，估算没有学习数据的URL
+        self.http_cache = http_cache
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._sizes = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._sizes = {}
+    
+    def size_of(self, url: str, request_headers: Dict[str, str] = None) -> Optional[int]:
+        with self._lock:
+            size = self._sizes.get(_strip_query(url))
+        if size is None and self.http_cache is not None:
+            size = self.http_cache.size_of(url, request_headers)
+        return size
+    
+    def learn_from_response(self, response):
+        length = response.headers.get("content-length")
+        if not length or not length.isdigit():
+            return
+        with self._lock:
+            self._sizes[_strip_query(response.url)] = int(length)
+            self._dirty = True
+    
+    def save(self):
+        if not self._dirty:
+            return
+        # 多个xdist worker各自合并写回，加锁避免互相覆盖
+        with self._lock, FileLock(f"{self.path}.lock", timeout=10):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (FileNotFoundError, ValueError):
+                merged = {}
+            merged.update(self._sizes)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+class RoutingProfiles:
+    """
+    测试数据中的路由配置集合
+    
+    - profiles: 配置名 -> 拦截/替换规则；
+    - default: 默认配置，off 表示不拦截（环境变量 ROUTING_PROFILE 可覆盖）；
+    - tests: 用例名 -> 配置名；
+    - pages: urls 中的页面key -> 配置名，页面对象导航到该页面时叠加应用。
+    """
+    
+    _LEARNING = "__learn_sizes__"
+    
+    def __init__(self, config: Dict[str, Any], report_path: str, urls: Dict[str, str] = None, http_cache=None):
+        self.profiles = {name: RoutingProfile.from_dict(name, data)
+                         for name, data in config.get("profiles", {}).items()}
+        self.default = config.get("default")
+        self.tests = config.get("tests", {})
+        self.pages = config.get("pages", {})
+        self.urls = urls or {}
+        self.stats = RouteStats()
+        self.sizes = RouteSizeIndex(os.path.join(report_path, "route_sizes.json"), http_cache)
+        # page -> 已应用的配置名（_LEARNING 表示已注册响应大小学习）
+        self._applied = weakref.WeakKeyDictionary()
+    
+    def resolve(self, name: Optional[str] = None, test_name: str = None) -> Optional[RoutingProfile]:
+        """按 显式名称 > 用例配置 > 默认配置 选择路由配置"""
+        name = name or self.tests.get(test_name or "") or self.default
+        if not name or name == "off":
+            return None
+        profile = self.profiles.get(name)
+        if profile is None:
+            log.warning(f"未定义的路由配置: {name}")
+        return profile
+    
+    def apply(self, page: Page, name: str = None, test_name: str = None) -> Optional[RoutingProfile]:
+        """为页面应用路由配置，同一页面重复应用同一配置时忽略"""
+        profile = self.resolve(name, test_name)
+        if profile is None or profile.is_empty:
+            self._learn_sizes(page)
+            return None
+        applied = self._applied.setdefault(page, set())
+        if profile.name in applied:
+            return profile
+        profile.apply(page, self.stats, self.sizes)
+        applied.add(profile.name)
+        log.debug(f"已应用路由配置: {profile.name}")
+        return profile
+    
+    async def apply_async(self, page, name: str = None, test_name: str = None) -> Optional[RoutingProfile]:
+        """为异步页面（playwright.async_api）应用路由配置，同一页面重复应用同一配置时忽略"""
+        profile = self.resolve(name, test_name)
+        if profile is None or profile.is_empty:
+            self._learn_sizes(page)
+            return None
+        applied = self._applied.setdefault(page, set())
+        if profile.name in applied:
+            return profile
+        await profile.apply_async(page, self.stats, self.sizes)
+        applied.add(profile.name)
+        log.debug(f"已应用路由配置: {profile.name}")
+        return profile
+    
+    def _learn_sizes(self, page):
+        """未拦截的页面记录响应大小，供之后拦截时估算字节数（每个页面只注册一次）"""
+        applied = self._applied.setdefault(page, set())
+        if self._LEARNING not in applied:
+            page.on("response", self.sizes.learn_from_response)
+            applied.add(self._LEARNING)
+    
+    def page_profile(self, url: str) -> Optional[str]:
+        """URL对应的 pages 路由配置名"""
+        for page_key, name in self.pages.items():
+            page_url = self.urls.get(page_key)
+            if page_url and url.startswith(page_url):
+                return name
+        return None
+    
+    def apply_for_url(self, page: Page, url: str) -> Optional[RoutingProfile]:
+        """按 pages 配置为即将打开的页面应用路由配置"""
+        name = self.page_profile(url)
+        return self.apply(page, name) if name else None
+    
+    async def apply_for_url_async(self, page, url: str) -> Optional[RoutingProfile]:
+        """按 pages 配置为即将打开的异步页面应用路由配置"""
+        name = self.page_profile(url)
+        return await self.apply_async(page, name) if name else None
+    
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """输出并返回拦截统计"""
+        stats = self.stats.to_dict()
+        for name, entry in stats.items():
+            if entry["bytes_blocked"] is not None:
+                size_text = f"约 {entry['bytes_blocked']} 字节，{entry['unknown_size']} 个大小未知"
+            else:
+                # 没有未拦截时的响应大小或HTTP缓存可供估算（先以 ROUTING_PROFILE=off 运行一次学习）
+                size_text = "字节数不可用"
+            log.info(f"路由配置 {name}: 拦截 {entry['blocked']} 个请求（{size_text}），替换 {entry['stubbed']} 个响应")
+        self.sizes.save()
+        return stats
+
+
+def _strip_query(url: str) -> str:
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """glob（** 任意字符，* 不含/）转正则"""
+    regex = re.escape(pattern).replace(r"\*\*", ".*").replace(r"\*", "[^/]*")
+    return re.compile(regex)
+
+
+_profiles: Optional[RoutingProfiles] = None
+
+
+def get_routing_profiles() -> RoutingProfiles:
+    """获取当前环境的路由配置"""
+    global _profiles
+    if _profiles is None:
+        from config.config import config
+        from utils.test_data_manager import TestDataManager
+        from utils.http_cache import get_http_cache
+        _profiles = RoutingProfiles(config.ROUTING, config.REPORT_PATH, TestDataManager().get_urls(),
+                                    get_http_cache())
+    return _profiles
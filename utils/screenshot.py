@@ -1,23 +1,373 @@
 """
 截图工具类 - 支持每个步骤截图
 """
+import functools
+import hashlib
+import io
 import os
-from datetime import datetime
+import threading
+import weakref
+from typing import Optional, Dict, Any, Callable
+import allure
 from playwright.sync_api import Page
-from utils.logger import log_screenshot, log_error
+from utils.logger import log, log_screenshot, log_error
+from utils.artifact_writer import get_artifact_writer
+from utils.artifact_layout import get_artifact_layout
+from utils.artifact_store import get_artifact_store
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow为可选依赖，缺失时不支持WebP转码和缩放
+    Image = None
+
+
+_webp_fallback_warned = False
+
+
+class ImageSettings:
+    """
+    截图图片参数
+    
+    Playwright 原生支持 png/jpeg；webp 和 max_width 缩放需要 Pillow，
+    未安装时 webp 降级为 jpeg（format、扩展名、附件类型和统计均按 jpeg），缩放被忽略。
+    """
+    
+    FORMATS = ("png", "jpeg", "webp")
+    
+    def __init__(self, format: str = "png", quality: int = None, full_page: bool = True,
+                 clip: Dict[str, float] = None, max_width: int = 0):
+        if format == "jpg":
+            format = "jpeg"
+        if format not in self.FORMATS:
+            log.warning(f"不支持的截图格式: {format}，使用png")
+            format = "png"
+        if format == "webp" and Image is None:
+            # 浏览器不能直接输出webp，在此确定实际格式，扩展名、附件类型和统计都以此为准
+            global _webp_fallback_warned
+            if not _webp_fallback_warned:
+                log.warning("未安装Pillow，webp截图降级为jpeg")
+                _webp_fallback_warned = True
+            format = "jpeg"
+        self.format = format
+        self.quality = quality
+        self.full_page = full_page
+        self.clip = clip
+        self.max_width = max_width or 0
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ImageSettings":
+        """从配置字典创建图片参数"""
+        data = data or {}
+        return cls(
+            format=data.get("format", "png"),
+            quality=data.get("quality"),
+            full_page=data.get("full_page", True),
+            clip=data.get("clip"),
+            max_width=data.get("max_width", 0)
+        )
+    
+    @property
+    def extension(self) -> str:
+        """文件扩展名"""
+        return "jpg" if self.format == "jpeg" else self.format
+    
+    @property
+    def needs_transcode(self) -> bool:
+        """是否需要Pillow本地转码"""
+        return Image is not None and (self.format == "webp" or self.max_width > 0)
+    
+    def attachment_type(self):
+        """Allure附件类型"""
+        if self.format == "jpeg":
+            return allure.attachment_type.JPG
+        if self.format == "webp":
+            return "image/webp"
+        return allure.attachment_type.PNG
+    
+    def screenshot_kwargs(self) -> Dict[str, Any]:
+        """Playwright截图参数"""
+        # 需要本地转码（webp或缩放）时先截取无损PNG
+        capture_format = "png" if self.needs_transcode else self.format
+        
+        kwargs = {"type": capture_format}
+        if self.clip:
+            kwargs["clip"] = self.clip
+        else:
+            kwargs["full_page"] = self.full_page
+        if capture_format == "jpeg" and self.quality is not None:
+            kwargs["quality"] = self.quality
+        return kwargs
+    
+    def reference_kwargs(self) -> Optional[Dict[str, Any]]:
+        """同一截图的PNG参照截图参数，浏览器直接输出PNG或本地转码（已有PNG原图）时为None"""
+        kwargs = self.screenshot_kwargs()
+        if kwargs["type"] == "png":
+            return None
+        kwargs["type"] = "png"
+        kwargs.pop("quality", None)
+        return kwargs
+
+
+class ScreenshotStats:
+    """
+    截图体积统计
+    
+    bytes_saved 为相对同一截图PNG原图节省的字节数：
+    - Pillow本地转码和缩放时，与浏览器截取的PNG原图比较；
+    - 浏览器直接输出jpeg时，每 reference_every 张额外截取一张PNG参照图，按参照样本中该格式的
+      压缩比估算其余截图的节省量（估算部分另记在 bytes_saved_estimated 中）。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.bytes_written = 0
+        self.bytes_saved = 0
+        self.by_format = {}
+        self.duplicates = 0
+        self.bytes_skipped = 0
+        self.reference_samples = 0
+        self._references = 0
+        # 格式 -> [PNG原图字节数, 输出字节数]（有原图可比较的截图）
+        self._ratios: Dict[str, list] = {}
+        # 格式 -> 没有原图可比较的压缩截图字节数
+        self._unmeasured: Dict[str, int] = {}
+    
+    def reference_due(self, every: int) -> bool:
+        """是否为本张压缩截图额外截取PNG参照图（每 every 张一次，0为不截取）"""
+        if every <= 0:
+            return False
+        with self._lock:
+            self._references += 1
+            # 第一张压缩截图即抽样，之后每 every 张一次
+            return (self._references - 1) % every == 0
+    
+    def record_duplicate(self, size: int):
+        """记录一次重复截图（未重复存储）"""
+        with self._lock:
+            self.duplicates += 1
+            self.bytes_skipped += size
+    
+    def record(self, fmt: str, size: int, original_size: int = None, reference: bool = False):
+        """
+        记录一次截图
+        
+        Args:
+            fmt: 输出格式
+            size: 输出字节数
+            original_size: 同一截图的PNG原图字节数，未知时为None
+            reference: original_size 是否来自额外截取的参照图
+        """
+        with self._lock:
+            self.count += 1
+            self.bytes_written += size
+            self.by_format[fmt] = self.by_format.get(fmt, 0) + size
+            if reference:
+                self.reference_samples += 1
+            if original_size:
+                self.bytes_saved += max(original_size - size, 0)
+                ratio = self._ratios.setdefault(fmt, [0, 0])
+                ratio[0] += original_size
+                ratio[1] += size
+            elif fmt != "png":
+                self._unmeasured[fmt] = self._unmeasured.get(fmt, 0) + size
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """统计信息"""
+        with self._lock:
+            estimated = 0
+            for fmt, size in self._unmeasured.items():
+                original, output = self._ratios.get(fmt, (0, 0))
+                if output:
+                    estimated += int(size * max(original / output - 1, 0))
+            return {
+                "count": self.count,
+                "bytes_written": self.bytes_written,
+                "bytes_saved": self.bytes_saved + estimated,
+                "bytes_saved_estimated": estimated,
+                "reference_samples": self.reference_samples,
+                "duplicates": self.duplicates,
+                "bytes_skipped": self.bytes_skipped,
+                "by_format": dict(self.by_format)
+            }
+
+
+screenshot_stats = ScreenshotStats()
+
+
+class ScreenshotDeduplicator:
+    """
+    截图去重 - 同一页面连续两次截图内容相同时复用上一次的附件
+    
+    支持的模式:
+        off: 不去重
+        exact: 按图片字节的SHA1判断
+        perceptual: 按差值哈希(dHash)判断，汉明距离不超过阈值即视为相同，需要Pillow
+    """
+    
+    MODES = ("off", "exact", "perceptual")
+    
+    def __init__(self, mode: str = "off", threshold: int = 0):
+        if mode not in self.MODES:
+            log.warning(f"未知的截图去重模式: {mode}，不去重")
+            mode = "off"
+        if mode == "perceptual" and Image is None:
+            log.warning("未安装Pillow，感知哈希去重降级为精确去重")
+            mode = "exact"
+        self.mode = mode
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # page -> (哈希, 上一次附件名称)
+        self._last = weakref.WeakKeyDictionary()
+    
+    def check(self, page: Page, data: bytes, attachment_name: str) -> Optional[str]:
+        """
+        检查截图是否与该页面上一张截图相同
+        
+        Args:
+            page: Playwright页面对象
+            data: 图片数据
+            attachment_name: 本次截图的附件名称
+            
+        Returns:
+            相同时返回上一张截图的附件名称，否则返回None并记录本次截图
+        """
+        if self.mode == "off" or not data:
+            return None
+        
+        digest = self._hash(data)
+        with self._lock:
+            previous = self._last.get(page)
+            if previous and self._matches(previous[0], digest):
+                screenshot_stats.record_duplicate(len(data))
+                return previous[1]
+            self._last[page] = (digest, attachment_name)
+        return None
+    
+    def reset(self):
+        """清空记录（每个用例开始时调用）"""
+        with self._lock:
+            self._last = weakref.WeakKeyDictionary()
+    
+    def _hash(self, data: bytes):
+        if self.mode == "perceptual":
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    pixels = list(image.convert("L").resize((9, 8)).getdata())
+                bits = 0
+                for row in range(8):
+                    for col in range(8):
+                        left = pixels[row * 9 + col]
+                        right = pixels[row * 9 + col + 1]
+                        bits = (bits << 1) | (1 if left > right else 0)
+                return bits
+            except Exception as e:
+                log.debug(f"感知哈希计算失败，使用精确哈希: {e}")
+        return hashlib.sha1(data).hexdigest()
+    
+    def _matches(self, previous, current) -> bool:
+        if isinstance(previous, int) and isinstance(current, int):
+            return bin(previous ^ current).count("1") <= self.threshold
+        return previous == current
+
+
+_deduplicator: Optional[ScreenshotDeduplicator] = None
+
+
+def get_screenshot_deduplicator() -> ScreenshotDeduplicator:
+    """获取全局截图去重器，按截图管线配置初始化"""
+    global _deduplicator
+    if _deduplicator is None:
+        from config.config import config
+        pipeline = config.SCREENSHOT_PIPELINE
+        _deduplicator = ScreenshotDeduplicator(
+            mode=pipeline.get("dedup", "off"),
+            threshold=pipeline.get("dedup_threshold", 0)
+        )
+    return _deduplicator
+
+
+class CapturedScreenshot:
+    """
+    一次截图的结果（尚未计入体积统计，去重后由 Screenshot.record 计入）
+    
+    Args:
+        data: 图片数据
+        original_size: 同一截图PNG原图的字节数，未知时为None
+        reference: original_size 是否来自额外截取的参照图
+    """
+    
+    def __init__(self, data: bytes, original_size: int = None, reference: bool = False):
+        self.data = data
+        self.original_size = original_size
+        self.reference = reference
+
 
 class Screenshot:
     """截图工具类"""
     
-    def __init__(self):
-        self._ensure_screenshot_dir()
+    def _base_name(self, name: str) -> str:
+        """去掉调用方传入的图片后缀，后缀由产物布局按图片格式生成"""
+        root, ext = os.path.splitext(name)
+        return root if ext.lower() in (".png", ".jpg", ".jpeg", ".webp") else name
+    
+    def _reference_kwargs(self, settings: ImageSettings) -> Optional[Dict[str, Any]]:
+        """按截图管线的 reference_every 抽样，需要截取PNG参照图时返回参照截图参数"""
+        reference = settings.reference_kwargs()
+        if reference is None:
+            return None
+        from config.config import config
+        every = int(config.SCREENSHOT_PIPELINE.get("reference_every", 0))
+        return reference if screenshot_stats.reference_due(every) else None
+    
+    def _capture(self, screenshot: Callable[..., bytes], settings: ImageSettings) -> CapturedScreenshot:
+        """截图并编码；按抽样额外截取PNG参照图，用于统计浏览器直接输出jpeg节省的字节数"""
+        data = screenshot(**settings.screenshot_kwargs())
+        reference = self._reference_kwargs(settings)
+        reference_size = len(screenshot(**reference)) if reference else None
+        return self._encode(data, settings, reference_size)
+    
+    async def _capture_async(self, screenshot: Callable[..., Any], settings: ImageSettings) -> CapturedScreenshot:
+        """异步页面的 _capture"""
+        data = await screenshot(**settings.screenshot_kwargs())
+        reference = self._reference_kwargs(settings)
+        reference_size = len(await screenshot(**reference)) if reference else None
+        return self._encode(data, settings, reference_size)
     
-    def _ensure_screenshot_dir(self):
-        """确保截图目录存在"""
-        screenshot_dir = "./reports/screenshots"
-        os.makedirs(screenshot_dir, exist_ok=True)
+    @staticmethod
+    def record(captured: CapturedScreenshot, settings: ImageSettings):
+        """将实际保存或附加的截图计入体积统计（去重跳过的截图只计入 duplicates）"""
+        screenshot_stats.record(settings.format, len(captured.data), captured.original_size, captured.reference)
     
-    def take_screenshot(self, page: Page, name: str = None, full_page: bool = True) -> str:
+    def _encode(self, data: bytes, settings: ImageSettings, reference_size: int = None) -> CapturedScreenshot:
+        """
+        按图片参数进行缩放和转码
+        
+        Args:
+            data: 浏览器输出的图片
+            settings: 图片参数
+            reference_size: 同一截图PNG参照图的字节数（浏览器直接输出jpeg时抽样截取）
+        """
+        original_size = reference_size
+        if settings.needs_transcode:
+            original_size = len(data)
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    if settings.max_width and image.width > settings.max_width:
+                        height = int(image.height * settings.max_width / image.width)
+                        image = image.resize((settings.max_width, height))
+                    if settings.format == "jpeg" and image.mode != "RGB":
+                        image = image.convert("RGB")
+                    buffer = io.BytesIO()
+                    save_kwargs = {"quality": settings.quality} if settings.quality is not None else {}
+                    image.save(buffer, format=settings.format.upper(), **save_kwargs)
+                    data = buffer.getvalue()
+            except Exception as e:
+                log.warning(f"截图转码失败，保留原图: {e}")
+        return CapturedScreenshot(data, original_size, reference_size is not None)
+    
+    def take_screenshot(self, page: Page, name: str = None, full_page: bool = True,
+                        settings: ImageSettings = None) -> str:
         """
         截图
         
@@ -25,65 +375,205 @@ class Screenshot:
             page: Playwright页面对象
             name: 截图文件名
             full_page: 是否截取完整页面
-            
+            settings: 图片参数，不提供时为完整PNG
+        
         Returns:
             截图文件路径
         """
-        if name is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            name = f"screenshot_{timestamp}.png"
-        
-        # 确保文件名有.png后缀
-        if not name.endswith('.png'):
-            name += '.png'
+        settings = settings or ImageSettings(full_page=full_page)
+        try:
+            captured = self._capture(page.screenshot, settings)
+        except Exception as e:
+            log_error(f"截图失败: {str(e)}")
+            return None
+        return self.save_captured(captured, self._base_name(name or "screenshot"), settings=settings)
+    
+    def _write(self, captured: CapturedScreenshot, file_path: str, settings: ImageSettings) -> Optional[str]:
+        """写入截图文件并计入体积统计"""
+        try:
+            with open(file_path, "wb") as f:
+                f.write(captured.data)
+        except Exception as e:
+            log_error(f"截图保存失败: {str(e)}")
+            return None
+        self.record(captured, settings)
+        log_screenshot(file_path)
+        return file_path
+    
+    def capture(self, page: Page, settings: ImageSettings = None) -> Optional[CapturedScreenshot]:
+        """
+        截图到内存，暂不计入体积统计（用于先去重、再保存或附加的步骤截图）
         
-        screenshot_dir = "./reports/screenshots"
-        file_path = os.path.join(screenshot_dir, name)
+        Args:
+            page: Playwright页面对象
+            settings: 图片参数，不提供时为完整PNG
         
+        Returns:
+            截图结果，失败时为None
+        """
+        settings = settings or ImageSettings()
         try:
-            page.screenshot(path=file_path, full_page=full_page)
-            log_screenshot(file_path)
-            return file_path
+            return self._capture(page.screenshot, settings)
+        except Exception as e:
+            log_error(f"截图失败: {str(e)}")
+            return None
+    
+    async def capture_async(self, page, settings: ImageSettings = None) -> Optional[CapturedScreenshot]:
+        """异步页面截图到内存（playwright.async_api），暂不计入体积统计"""
+        settings = settings or ImageSettings()
+        try:
+            return await self._capture_async(page.screenshot, settings)
         except Exception as e:
             log_error(f"截图失败: {str(e)}")
             return None
     
-    def take_step_screenshot(self, page: Page, step_name: str, test_name: str = None) -> str:
+    def take_screenshot_bytes(self, page: Page, full_page: bool = True,
+                              settings: ImageSettings = None) -> Optional[bytes]:
+        """
+        截图到内存，不写入磁盘
+        
+        Args:
+            page: Playwright页面对象
+            full_page: 是否截取完整页面
+            settings: 图片参数，不提供时为完整PNG
+        
+        Returns:
+            图片数据
+        """
+        settings = settings or ImageSettings(full_page=full_page)
+        captured = self.capture(page, settings)
+        if captured is None:
+            return None
+        self.record(captured, settings)
+        return captured.data
+    
+    async def take_screenshot_bytes_async(self, page, full_page: bool = True,
+                                          settings: ImageSettings = None) -> Optional[bytes]:
+        """
+        异步页面截图到内存（playwright.async_api）
+        
+        Args:
+            page: 异步Page对象
+            full_page: 是否截取完整页面
+            settings: 图片参数，不提供时为完整PNG
+        
+        Returns:
+            图片数据
+        """
+        settings = settings or ImageSettings(full_page=full_page)
+        captured = await self.capture_async(page, settings)
+        if captured is None:
+            return None
+        self.record(captured, settings)
+        return captured.data
+    
+    def persist_async(self, data: bytes, name: str, thumbnail_width: int = 0,
+                      settings: ImageSettings = None) -> Optional[str]:
+        """
+        在后台线程中将截图数据写入磁盘（按产物布局生成不冲突的路径）
+        
+        Args:
+            data: 图片数据
+            name: 截图名称
+            thumbnail_width: 缩略图宽度，0表示不生成
+            settings: 图片参数，用于确定文件后缀
+        
+        Returns:
+            截图文件路径或blob路径（写入在后台完成）
+        """
+        settings = settings or ImageSettings()
+        layout = get_artifact_layout()
+        nodeid = layout.current_test
+        store = get_artifact_store()
+        if store is not None:
+            # 存入内容寻址存储，相同内容跨运行只存一份（不生成缩略图）；
+            # 在测试线程计算哈希以便返回blob路径，写入和追加清单在后台任务中完成
+            digest = hashlib.sha256(data).hexdigest()
+            if get_artifact_writer().submit(self._store_blob, store, data, name, settings.extension, digest, nodeid):
+                return store.blob_path(digest, settings.extension)
+            return None
+        
+        # 测试线程只计算路径，建目录、写文件和追加清单都在后台任务中完成
+        file_path = layout.path_for("screenshots", name, settings.extension, nodeid, create=False)
+        on_written = functools.partial(layout.record, "screenshots", file_path, nodeid, size=len(data))
+        if get_artifact_writer().write_bytes(file_path, data, thumbnail_width, on_written):
+            return file_path
+        return None
+    
+    def take_step_screenshot(self, page: Page, step_name: str, test_name: str = None,
+                             settings: ImageSettings = None) -> str:
         """
         步骤截图
         
         Args:
             page: Playwright页面对象
             step_name: 步骤名称
-            test_name: 测试名称
-            
+            test_name: 测试名称，默认当前用例
+            settings: 图片参数
+        
         Returns:
             截图文件路径
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if test_name:
-            name = f"{test_name}_{step_name}_{timestamp}.png"
-        else:
-            name = f"step_{step_name}_{timestamp}.png"
-        
-        return self.take_screenshot(page, name)
+        settings = settings or ImageSettings()
+        captured = self.capture(page, settings)
+        if captured is None:
+            return None
+        return self.save_captured(captured, step_name, test_name, settings)
     
-    def take_screenshot_on_failure(self, page: Page, test_name: str) -> str:
+    def take_screenshot_on_failure(self, page: Page, test_name: str,
+                                   settings: ImageSettings = None) -> str:
         """
         测试失败时截图
         
         Args:
             page: Playwright页面对象
             test_name: 测试名称
-            
+            settings: 图片参数
+        
+        Returns:
+            截图文件路径
+        """
+        settings = settings or ImageSettings()
+        captured = self.capture(page, settings)
+        if captured is None:
+            return None
+        return self.save_captured(captured, "failure", test_name, settings)
+    
+    @staticmethod
+    def _store_blob(store, data: bytes, name: str, extension: str, digest: str, nodeid: str):
+        """写入blob并记录到产物清单（在后台线程执行，nodeid 为截图时的用例）"""
+        digest, blob_path = store.put_bytes(data, extension, digest)
+        get_artifact_layout().record("screenshots", blob_path, nodeid, blob=digest, name=name, size=len(data))
+    
+    def save_captured(self, captured: CapturedScreenshot, name: str, nodeid: str = None,
+                      settings: ImageSettings = None) -> Optional[str]:
+        """
+        按产物布局写入截图，链接到产物存储并记录到清单（去重之后调用，重复截图不会写入清单）
+        
+        Args:
+            captured: capture 的截图结果
+            name: 截图名称
+            nodeid: 用例node id，默认当前用例
+            settings: 图片参数
+        
         Returns:
             截图文件路径
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        name = f"failure_{test_name}_{timestamp}.png"
-        return self.take_screenshot(page, name)
+        settings = settings or ImageSettings()
+        layout = get_artifact_layout()
+        file_path = layout.path_for("screenshots", name, settings.extension, nodeid)
+        saved_path = self._write(captured, file_path, settings)
+        if saved_path:
+            store = get_artifact_store()
+            digest = store.link_into_store(saved_path) if store is not None else None
+            if digest:
+                layout.record("screenshots", saved_path, nodeid, blob=digest)
+            else:
+                layout.record("screenshots", saved_path, nodeid)
+        return saved_path
     
-    def take_element_screenshot(self, page: Page, selector: str, name: str = None) -> str:
+    def take_element_screenshot(self, page: Page, selector: str, name: str = None,
+                                settings: ImageSettings = None) -> str:
         """
         元素截图
         
@@ -91,25 +581,18 @@ class Screenshot:
             page: Playwright页面对象
             selector: 元素选择器
             name: 截图文件名
-            
+            settings: 图片参数（full_page和clip对元素截图无效）
+        
         Returns:
             截图文件路径
         """
-        if name is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            name = f"element_{timestamp}.png"
-        
-        if not name.endswith('.png'):
-            name += '.png'
-        
-        screenshot_dir = "./reports/screenshots"
-        file_path = os.path.join(screenshot_dir, name)
-        
+        settings = settings or ImageSettings()
         try:
             element = page.locator(selector)
-            element.screenshot(path=file_path)
-            log_screenshot(file_path)
-            return file_path
+            # 元素截图不支持 full_page 和 clip
+            captured = self._capture(
+                lambda full_page=None, clip=None, **kwargs: element.screenshot(**kwargs), settings)
         except Exception as e:
             log_error(f"元素截图失败: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+        return self.save_captured(captured, self._base_name(name or "element"), settings=settings)
@@ -0,0 +1,115 @@
+"""
+截图策略模块 - 控制步骤截图的触发时机
+"""
+import threading
+from typing import Optional, Dict, Any
+from utils.logger import log
+from utils.screenshot import ImageSettings
+
+
+class ScreenshotPolicy:
+    """
+    截图策略
+    
+    支持的模式:
+        always: 每个步骤都截图（原有行为）
+        on_failure: 仅步骤失败时截图
+        every_n: 每N个步骤截图一次，失败时总是截图
+        outermost: 仅最外层步骤截图，失败时总是截图
+        never: 不截图
+    """
+    
+    MODES = ("always", "on_failure", "every_n", "outermost", "never")
+    
+    def __init__(self, mode: str = "always", every_n: int = 5, image: Dict[str, Dict[str, Any]] = None):
+        if mode not in self.MODES:
+            log.warning(f"未知的截图策略: {mode}，使用默认策略 always")
+            mode = "always"
+        self.mode = mode
+        self.every_n = max(int(every_n), 1)
+        # 按截图类型(step/failure)配置的图片参数
+        self.image = image or {}
+        self._step_count = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ScreenshotPolicy":
+        """从配置字典创建策略"""
+        data = data or {}
+        return cls(mode=data.get("mode", "always"), every_n=data.get("every_n", 5), image=data.get("image"))
+    
+    def should_capture(self, failed: bool, depth: int = 1) -> bool:
+        """
+        判断当前步骤是否需要截图
+        
+        Args:
+            failed: 步骤是否失败
+            depth: 步骤嵌套深度，最外层为1
+        
+        Returns:
+            是否截图
+        """
+        if self.mode == "never":
+            return False
+        if self.mode == "always":
+            return True
+        if failed:
+            return True
+        if self.mode == "on_failure":
+            return False
+        if self.mode == "outermost":
+            return depth <= 1
+        # every_n
+        with self._lock:
+            self._step_count += 1
+            return self._step_count % self.every_n == 0
+    
+    def image_settings(self, kind: str = "step") -> ImageSettings:
+        """
+        获取指定截图类型的图片参数
+        
+        Args:
+            kind: step(步骤截图) 或 failure(失败截图)
+        """
+        return ImageSettings.from_dict(self.image.get(kind))
+    
+    def reset(self):
+        """重置步骤计数"""
+        with self._lock:
+            self._step_count = 0
+    
+    def __repr__(self) -> str:
+        if self.mode == "every_n":
+            return f"ScreenshotPolicy(mode={self.mode}, every_n={self.every_n})"
+        return f"ScreenshotPolicy(mode={self.mode})"
+
+
+_active_policy: Optional[ScreenshotPolicy] = None
+_step_state = threading.local()
+
+
+def get_screenshot_policy() -> ScreenshotPolicy:
+    """获取当前生效的截图策略，未设置时从环境配置加载"""
+    global _active_policy
+    if _active_policy is None:
+        from config.config import config
+        _active_policy = ScreenshotPolicy.from_dict(config.SCREENSHOT_POLICY)
+    return _active_policy
+
+
+def set_screenshot_policy(policy: Optional[ScreenshotPolicy]):
+    """设置当前生效的截图策略，传入None则恢复为环境配置"""
+    global _active_policy
+    _active_policy = policy
+
+
+def enter_step() -> int:
+    """进入步骤，返回当前嵌套深度"""
+    depth = getattr(_step_state, "depth", 0) + 1
+    _step_state.depth = depth
+    return depth
+
+
+def exit_step():
+    """退出步骤"""
+    _step_state.depth = max(getattr(_step_state, "depth", 1) - 1, 0)
@@ -0,0 +1,514 @@
+"""
+步骤中间件模块 - 步骤函数只执行一次，截图、视频、trace、耗时、控制台日志等作为中间件挂载
+"""
+import contextvars
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Optional, Callable, Any, List, Dict
+import allure
+from playwright.sync_api import Page
+from utils.conditions import is_condition_message
+from utils.deadline import get_deadline
+from utils.screenshot import Screenshot, CapturedScreenshot, get_screenshot_deduplicator
+from utils.video_manager import VideoManager
+from utils.trace_manager import get_trace_manager
+from utils.screenshot_policy import ScreenshotPolicy, get_screenshot_policy, enter_step, exit_step
+from utils.logger import log
+
+# 异步步骤的嵌套深度（按asyncio任务隔离，并发页面之间互不影响）
+_async_depth = contextvars.ContextVar("async_step_depth", default=0)
+# 是否在 run_concurrently 并发执行的任务中（Allure的步骤栈按线程记录，同一线程上的并发任务会互相嵌套）
+_concurrent = contextvars.ContextVar("concurrent_steps", default=False)
+# 正在计时的步骤名（按线程和asyncio任务隔离），同名步骤嵌套时只记录最外层
+_timed_steps = contextvars.ContextVar("timed_steps", default=frozenset())
+
+
+def mark_concurrent():
+    """将当前上下文标记为并发执行，之后创建的asyncio任务继承该标记，返回用于 unmark_concurrent 的token"""
+    return _concurrent.set(True)
+
+
+def unmark_concurrent(token):
+    """恢复 mark_concurrent 之前的状态"""
+    _concurrent.reset(token)
+
+
+def find_page(args, kwargs) -> Optional[Page]:
+    """从参数中查找Page对象（页面对象实例则取其page属性）"""
+    for value in list(args) + list(kwargs.values()):
+        if hasattr(value, 'screenshot') and hasattr(value, 'click'):
+            return value
+        inner = getattr(value, 'page', None)
+        if hasattr(inner, 'screenshot') and hasattr(inner, 'click'):
+            return inner
+    return None
+
+
+class StepContext:
+    """单次步骤执行的上下文，在中间件之间传递"""
+    
+    def __init__(self, name: str, func: Callable, args: tuple, kwargs: dict, fail_on_false: bool = False):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.fail_on_false = fail_on_false
+        self.page = find_page(args, kwargs)
+        self.depth = 0
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.failed = False
+        self.duration = 0.0
+    
+    @property
+    def qualname(self) -> str:
+        """步骤函数全名"""
+        return f"{self.func.__module__}.{self.func.__qualname__}"
+
+
+class StepMiddleware:
+    """
+    步骤中间件基类
+    
+    子类实现 __call__(ctx, call_next)，在 call_next(ctx) 前后完成采集；
+    call_next 只会真正执行一次步骤函数。
+    异步页面对象的步骤走 call_async，默认直接执行，不做采集。
+    """
+    
+    def __call__(self, ctx: StepContext, call_next: Callable[[StepContext], Any]) -> Any:
+        return call_next(ctx)
+    
+    async def call_async(self, ctx: StepContext, call_next: Callable[[StepContext], Any]) -> Any:
+        return await call_next(ctx)
+
+
+class StepPipeline:
+    """
+    步骤中间件管线 - 装饰时组装一次，每次调用只经过一层包装
+    
+    步骤抛出异常时视为失败；fail_on_false 为True时返回False也视为失败（用于 verify_*、点击等
+    用返回值表示失败的页面对象方法，is_element_visible 等查询方法返回False是正常结果）。
+    """
+    
+    def __init__(self, middlewares: List[StepMiddleware], fail_on_false: bool = False):
+        self.middlewares = list(middlewares)
+        self.fail_on_false = fail_on_false
+        handler = self._call_step
+        async_handler = self._call_step_async
+        for middleware in reversed(self.middlewares):
+            handler = functools.partial(middleware, call_next=handler)
+            async_handler = functools.partial(middleware.call_async, call_next=async_handler)
+        self._handler = handler
+        self._async_handler = async_handler
+    
+    def run(self, name: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """执行步骤"""
+        ctx = StepContext(name, func, args, kwargs, self.fail_on_false)
+        ctx.depth = enter_step()
+        try:
+            return self._handler(ctx)
+        finally:
+            exit_step()
+    
+    async def run_async(self, name: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """执行异步步骤"""
+        ctx = StepContext(name, func, args, kwargs, self.fail_on_false)
+        ctx.depth = _async_depth.get() + 1
+        token = _async_depth.set(ctx.depth)
+        try:
+            return await self._async_handler(ctx)
+        finally:
+            _async_depth.reset(token)
+    
+    @staticmethod
+    def _call_step(ctx: StepContext) -> Any:
+        start = time.perf_counter()
+        try:
+            ctx.result = ctx.func(*ctx.args, **ctx.kwargs)
+        except BaseException as e:
+            # 包括 DeadlineExceeded（BaseException），预算用完的步骤同样记为失败
+            ctx.error = e
+            ctx.failed = True
+            raise
+        finally:
+            ctx.duration = time.perf_counter() - start
+        # 声明了 fail_on_false 的步骤返回False时视为失败
+        ctx.failed = ctx.fail_on_false and ctx.result is False
+        return ctx.result
+    
+    @staticmethod
+    async def _call_step_async(ctx: StepContext) -> Any:
+        start = time.perf_counter()
+        try:
+            result = ctx.func(*ctx.args, **ctx.kwargs)
+            # 异步页面对象复用的同步方法会返回协程
+            if inspect.isawaitable(result):
+                result = await result
+            ctx.result = result
+        except BaseException as e:
+            # 包括 DeadlineExceeded（BaseException），预算用完的步骤同样记为失败
+            ctx.error = e
+            ctx.failed = True
+            raise
+        finally:
+            ctx.duration = time.perf_counter() - start
+        ctx.failed = ctx.fail_on_false and ctx.result is False
+        return ctx.result
+    
+    def decorate(self, step_name: str = None) -> Callable:
+        """生成装饰器（同时支持同步/异步函数，以及异步页面对象继承的同步方法）"""
+        def decorator(func: Callable) -> Callable:
+            name = step_name or func.__name__
+            
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    return await self.run_async(name, func, args, kwargs)
+                
+                return async_wrapper
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if args and getattr(args[0], "is_async", False):
+                    return self.run_async(name, func, args, kwargs)
+                return self.run(name, func, args, kwargs)
+            
+            return wrapper
+        return decorator
+
+
+class AllureStepMiddleware(StepMiddleware):
+    """Allure步骤和严重程度"""
+    
+    def __init__(self, severity: str = None):
+        self.severity = severity
+    
+    def __call__(self, ctx, call_next):
+        if self.severity:
+            allure.dynamic.severity(getattr(allure.severity_level, self.severity.upper()))
+        with allure.step(ctx.name):
+            return call_next(ctx)
+    
+    async def call_async(self, ctx, call_next):
+        if self.severity:
+            allure.dynamic.severity(getattr(allure.severity_level, self.severity.upper()))
+        if _concurrent.get():
+            # 并发任务共用一个线程的Allure步骤栈，不记录步骤以免互相嵌套；截图等附件挂在用例上，日志和耗时统计照常
+            return await call_next(ctx)
+        with allure.step(ctx.name):
+            return await call_next(ctx)
+
+
+class TraceMiddleware(StepMiddleware):
+    """Trace分段（step模式下最外层步骤失败时保存）"""
+    
+    def __call__(self, ctx, call_next):
+        with get_trace_manager().step(ctx.page, ctx.name) as trace_step:
+            try:
+                return call_next(ctx)
+            finally:
+                trace_step.failed = ctx.failed
+
+
+class ScreenshotMiddleware(StepMiddleware):
+    """按截图策略截图"""
+    
+    def __init__(self, attach_to_allure: bool = True):
+        self.attach_to_allure = attach_to_allure
+    
+    def __call__(self, ctx, call_next):
+        if not ctx.page:
+            log.warning(f"未找到Page对象，跳过截图: {ctx.name}")
+            return call_next(ctx)
+        
+        policy = get_screenshot_policy()
+        try:
+            return call_next(ctx)
+        finally:
+            if policy.should_capture(failed=ctx.failed, depth=ctx.depth):
+                capture_step_screenshot(ctx.page, ctx.name, "失败" if ctx.failed else "成功",
+                                        self.attach_to_allure, policy)
+    
+    async def call_async(self, ctx, call_next):
+        if not ctx.page:
+            return await call_next(ctx)
+        
+        policy = get_screenshot_policy()
+        try:
+            return await call_next(ctx)
+        finally:
+            if policy.should_capture(failed=ctx.failed, depth=ctx.depth):
+                await capture_step_screenshot_async(ctx.page, ctx.name, "失败" if ctx.failed else "成功",
+                                                    self.attach_to_allure, policy)
+
+
+class VideoMiddleware(StepMiddleware):
+    """步骤结束后附加/保存视频"""
+    
+    def __init__(self, attach_to_allure: bool = True, save_video: bool = False):
+        self.attach_to_allure = attach_to_allure
+        self.save_video = save_video
+    
+    def __call__(self, ctx, call_next):
+        if not ctx.page:
+            log.warning(f"未找到Page对象，跳过视频录制: {ctx.func.__name__}")
+            return call_next(ctx)
+        
+        try:
+            return call_next(ctx)
+        finally:
+            video_name = f"{ctx.func.__name__}_失败" if ctx.error else ctx.func.__name__
+            video_manager = VideoManager()
+            if self.attach_to_allure:
+                video_manager.attach_video_to_allure(ctx.page, video_name)
+            if self.save_video:
+                video_manager.save_video_with_test_name(ctx.page, video_name)
+
+
+class StepTimings:
+    """步骤耗时统计"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}
+        self._failures: Dict[str, int] = {}
+    
+    def record(self, name: str, duration: float, failed: bool = False):
+        """记录一次步骤耗时(秒)"""
+        with self._lock:
+            self._durations.setdefault(name, []).append(duration)
+            if failed:
+                self._failures[name] = self._failures.get(name, 0) + 1
+    
+    def durations(self, name: str) -> List[float]:
+        """获取指定步骤的耗时列表"""
+        with self._lock:
+            return list(self._durations.get(name, []))
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各步骤的次数、失败次数和p50/p95/p99耗时(毫秒)"""
+        with self._lock:
+            items = {name: sorted(values) for name, values in self._durations.items()}
+            failures = dict(self._failures)
+        return {
+            name: {
+                "count": len(values),
+                "failed": failures.get(name, 0),
+                "p50": percentile(values, 50) * 1000,
+                "p95": percentile(values, 95) * 1000,
+                "p99": percentile(values, 99) * 1000
+            }
+            for name, values in items.items()
+        }
+    
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._durations = {}
+            self._failures = {}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """已排序列表的百分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+step_timings = StepTimings()
+
+
+class TimingMiddleware(StepMiddleware):
+    """
+    记录步骤耗时（设置了用例时间预算时同时记入截止时间，超时报告用）
+    
+    同名步骤嵌套时（如页面对象覆写基类步骤并调用 super()，两者步骤名相同）只记录最外层，
+    否则一次调用会记两次，次数和分位数都偏大。
+    """
+    
+    def __call__(self, ctx, call_next):
+        token = self._enter(ctx)
+        if token is None:
+            return call_next(ctx)
+        try:
+            return call_next(ctx)
+        finally:
+            _timed_steps.reset(token)
+            step_timings.record(ctx.name, ctx.duration, ctx.failed)
+            self._record_deadline(ctx)
+            log.debug(f"步骤耗时: {ctx.name} {ctx.duration * 1000:.1f}ms")
+    
+    async def call_async(self, ctx, call_next):
+        token = self._enter(ctx)
+        if token is None:
+            return await call_next(ctx)
+        try:
+            return await call_next(ctx)
+        finally:
+            _timed_steps.reset(token)
+            step_timings.record(ctx.name, ctx.duration, ctx.failed)
+            self._record_deadline(ctx)
+    
+    @staticmethod
+    def _enter(ctx):
+        """步骤名不在正在计时的步骤中时加入并返回token，同名步骤嵌套时返回None"""
+        active = _timed_steps.get()
+        if ctx.name in active:
+            return None
+        return _timed_steps.set(active | {ctx.name})
+    
+    def _record_deadline(self, ctx):
+        deadline = get_deadline()
+        if deadline is not None:
+            deadline.record_step(ctx.name, ctx.depth, ctx.duration)
+
+
+class ConsoleLogMiddleware(StepMiddleware):
+    """
+    采集步骤执行期间的浏览器控制台日志
+    
+    mode: off 不采集 / on_failure 步骤失败时附加 / always 总是附加
+    """
+    
+    def __init__(self, mode: str = None):
+        self._mode = mode
+    
+    @property
+    def mode(self) -> str:
+        if self._mode is None:
+            from config.config import config
+            self._mode = config.STEP_MIDDLEWARE.get("console_logs", "off")
+        return self._mode
+    
+    def __call__(self, ctx, call_next):
+        if self.mode == "off" or not ctx.page or ctx.depth > 1:
+            return call_next(ctx)
+        
+        messages = []
+        
+        def on_console(message):
+            if not is_condition_message(message.text):
+                messages.append(f"[{message.type}] {message.text}")
+        
+        ctx.page.on("console", on_console)
+        try:
+            return call_next(ctx)
+        finally:
+            ctx.page.remove_listener("console", on_console)
+            self._attach(ctx, messages)
+    
+    async def call_async(self, ctx, call_next):
+        if self.mode == "off" or not ctx.page or ctx.depth > 1:
+            return await call_next(ctx)
+        
+        messages = []
+        
+        def on_console(message):
+            if not is_condition_message(message.text):
+                messages.append(f"[{message.type}] {message.text}")
+        
+        ctx.page.on("console", on_console)
+        try:
+            return await call_next(ctx)
+        finally:
+            ctx.page.remove_listener("console", on_console)
+            self._attach(ctx, messages)
+    
+    def _attach(self, ctx, messages):
+        if messages and (self.mode == "always" or ctx.failed):
+            allure.attach("\n".join(messages), name=f"控制台日志: {ctx.name}",
+                          attachment_type=allure.attachment_type.TEXT)
+
+
+def capture_step_screenshot(page: Page, step_name: str, status: str,
+                            attach_to_allure: bool, policy: ScreenshotPolicy):
+    """步骤截图并附加到Allure报告"""
+    from config.config import config
+    
+    screenshot = Screenshot()
+    pipeline = config.SCREENSHOT_PIPELINE
+    # 失败截图保留高保真，步骤截图使用压缩参数
+    settings = policy.image_settings("failure" if status == "失败" else "step")
+    attachment_name = f"步骤截图({status}): {step_name}"
+    
+    deduplicator = get_screenshot_deduplicator()
+    
+    captured = screenshot.capture(page, settings)
+    if pipeline.get("in_memory", True):
+        # 内存截图直接附加，落盘交给后台线程
+        saved = _publish_step_screenshot(page, captured, step_name, status, attach_to_allure, settings)
+    else:
+        if captured is None:
+            return
+        # 先去重再写文件，重复截图不写入文件、清单和产物存储，也不计入写入统计
+        previous = deduplicator.check(page, captured.data, attachment_name)
+        if previous:
+            if attach_to_allure:
+                allure.attach(f"与上一张截图相同: {previous}", name=f"{attachment_name} (重复)",
+                              attachment_type=allure.attachment_type.TEXT)
+            log.info(f"步骤截图与上一张相同，跳过存储: {step_name}")
+            return
+        screenshot_path = screenshot.save_captured(captured, f"{step_name}_{status}", settings=settings)
+        if attach_to_allure and screenshot_path:
+            allure.attach.file(
+                screenshot_path,
+                name=attachment_name,
+                attachment_type=settings.attachment_type(),
+                extension=settings.extension
+            )
+        saved = attach_to_allure and bool(screenshot_path)
+    
+    if saved:
+        _log_step_screenshot(step_name, status)
+
+
+async def capture_step_screenshot_async(page, step_name: str, status: str,
+                                        attach_to_allure: bool, policy: ScreenshotPolicy):
+    """异步页面的步骤截图（总是内存截图）"""
+    settings = policy.image_settings("failure" if status == "失败" else "step")
+    captured = await Screenshot().capture_async(page, settings)
+    if _publish_step_screenshot(page, captured, step_name, status, attach_to_allure, settings):
+        _log_step_screenshot(step_name, status)
+
+
+def _publish_step_screenshot(page, captured: Optional[CapturedScreenshot], step_name: str, status: str,
+                             attach_to_allure: bool, settings) -> bool:
+    """去重后附加内存截图并计入体积统计，按配置交给后台线程落盘"""
+    from config.config import config
+    
+    if captured is None or not captured.data:
+        return False
+    data = captured.data
+    pipeline = config.SCREENSHOT_PIPELINE
+    attachment_name = f"步骤截图({status}): {step_name}"
+    previous = get_screenshot_deduplicator().check(page, data, attachment_name)
+    if previous:
+        # 与上一张截图相同，只记录引用，不再重复存储
+        if attach_to_allure:
+            allure.attach(f"与上一张截图相同: {previous}", name=f"{attachment_name} (重复)",
+                          attachment_type=allure.attachment_type.TEXT)
+        log.info(f"步骤截图与上一张相同，跳过存储: {step_name}")
+        return False
+    Screenshot.record(captured, settings)
+    if attach_to_allure:
+        allure.attach(data, name=attachment_name, attachment_type=settings.attachment_type(),
+                      extension=settings.extension)
+    if pipeline.get("persist", False):
+        Screenshot().persist_async(
+            data,
+            f"{step_name}_{status}",
+            pipeline.get("thumbnail_width", 0),
+            settings
+        )
+    return attach_to_allure
+
+
+def _log_step_screenshot(step_name: str, status: str):
+    if status == "失败":
+        log.error(f"步骤执行失败，截图已保存: {step_name}")
+    else:
+        log.info(f"步骤执行成功，截图已保存: {step_name}")
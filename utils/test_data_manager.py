@@ -147,6 +147,20 @@ class TestDataManager:
         timeouts = self.get_timeouts()
         return timeouts.get(key, 10000)
     
+    def get_test_users(self) -> List[Dict[str, str]]:
+        """获取测试用户列表"""
+        return self._test_data.get("test_users", [])
+    
+    def get_test_user(self, username: str = None) -> Optional[Dict[str, str]]:
+        """获取指定测试用户，未指定用户名时返回第一个用户"""
+        users = self.get_test_users()
+        if username is None:
+            return users[0] if users else None
+        for user in users:
+            if user.get("username") == username:
+                return user
+        return None
+    
     def get_all_data(self) -> Dict[str, Any]:
         """获取所有测试数据"""
         return self._test_data.copy()
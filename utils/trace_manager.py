@@ -0,0 +1,193 @@
+"""
+Trace管理工具类 - 使用Playwright Tracing代替视频，仅在失败时保存trace.zip
+"""
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+import allure
+from playwright.sync_api import BrowserContext, Page
+from utils.logger import log
+from utils.artifact_layout import get_artifact_layout
+from utils.artifact_store import get_artifact_store
+
+
+class TraceStep:
+    """步骤trace分段状态"""
+    
+    def __init__(self):
+        self.failed = False
+
+
+class TraceManager:
+    """
+    Trace管理工具类
+    
+    支持的模式:
+        off: 不录制trace
+        test: 整个用例一个trace，用例失败时保存
+        step: 每个最外层allure步骤一个trace分段，步骤失败时保存
+    """
+    
+    MODES = ("off", "test", "step")
+    
+    def __init__(self, mode: str = "off", snapshots: bool = True, screenshots: bool = False,
+                 sources: bool = False):
+        if mode not in self.MODES:
+            log.warning(f"未知的trace模式: {mode}，不录制trace")
+            mode = "off"
+        self.mode = mode
+        self.snapshots = snapshots
+        self.screenshots = screenshots
+        self.sources = sources
+        self._lock = threading.Lock()
+        # 正在录制的上下文 -> 是否有进行中的步骤分段
+        self._active: Dict[int, bool] = {}
+    
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "TraceManager":
+        """从配置字典创建"""
+        data = data or {}
+        return cls(
+            mode=data.get("mode", "off"),
+            snapshots=data.get("snapshots", True),
+            screenshots=data.get("screenshots", False),
+            sources=data.get("sources", False)
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        """是否启用trace"""
+        return self.mode != "off"
+    
+    def start_test(self, context: BrowserContext, test_name: str) -> bool:
+        """用例开始时启动tracing"""
+        if not self.enabled:
+            return False
+        try:
+            context.tracing.start(
+                name=self._safe_name(test_name),
+                title=test_name,
+                snapshots=self.snapshots,
+                screenshots=self.screenshots,
+                sources=self.sources
+            )
+            with self._lock:
+                self._active[id(context)] = False
+            return True
+        except Exception as e:
+            log.warning(f"启动trace失败: {e}")
+            return False
+    
+    def stop_test(self, context: BrowserContext, test_name: str, failed: bool) -> Optional[str]:
+        """
+        用例结束时停止tracing
+        
+        Args:
+            context: 浏览器上下文
+            test_name: 测试名称
+            failed: 用例是否失败，test模式下失败时保存并附加trace
+        
+        Returns:
+            保存的trace文件路径
+        """
+        with self._lock:
+            if self._active.pop(id(context), None) is None:
+                return None
+        try:
+            if self.mode == "test" and failed:
+                path = self._trace_path(test_name)
+                context.tracing.stop(path=path)
+                self._attach(path, f"Playwright Trace - {test_name}")
+                return path
+            context.tracing.stop()
+        except Exception as e:
+            log.warning(f"停止trace失败: {e}")
+        return None
+    
+    @contextmanager
+    def step(self, page: Optional[Page], step_name: str):
+        """
+        步骤trace分段，仅step模式下对最外层步骤生效
+        
+        嵌套步骤不会再开分段（开启新分段会丢弃进行中的分段）。
+        抛出异常或调用方将 failed 置为True时保存该分段。
+        """
+        state = TraceStep()
+        context = self._step_context(page)
+        if context is None:
+            yield state
+            return
+        
+        try:
+            context.tracing.start_chunk(title=step_name)
+        except Exception as e:
+            log.warning(f"启动trace分段失败: {e}")
+            with self._lock:
+                self._active[id(context)] = False
+            yield state
+            return
+        
+        try:
+            yield state
+        except Exception:
+            state.failed = True
+            raise
+        finally:
+            with self._lock:
+                self._active[id(context)] = False
+            self._stop_chunk(context, step_name, state.failed)
+    
+    def _step_context(self, page: Optional[Page]) -> Optional[BrowserContext]:
+        """返回需要开启步骤分段的上下文"""
+        if self.mode != "step" or page is None:
+            return None
+        context = page.context
+        with self._lock:
+            if self._active.get(id(context)) is not False:
+                # 未在录制，或已有进行中的分段
+                return None
+            self._active[id(context)] = True
+        return context
+    
+    def _stop_chunk(self, context: BrowserContext, step_name: str, failed: bool):
+        try:
+            if failed:
+                path = self._trace_path(step_name)
+                context.tracing.stop_chunk(path=path)
+                self._attach(path, f"Playwright Trace - {step_name}")
+            else:
+                context.tracing.stop_chunk()
+        except Exception as e:
+            log.warning(f"停止trace分段失败: {e}")
+    
+    def _trace_path(self, name: str) -> str:
+        return get_artifact_layout().path_for("traces", name, "zip")
+    
+    def _attach(self, path: str, name: str):
+        if os.path.exists(path):
+            allure.attach.file(path, name=name, attachment_type="application/zip", extension="zip")
+            store = get_artifact_store()
+            digest = store.link_into_store(path) if store is not None else None
+            if digest:
+                get_artifact_layout().record("traces", path, blob=digest)
+            else:
+                get_artifact_layout().record("traces", path)
+            log.info(f"trace已保存并附加到Allure报告: {path}")
+    
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return re.sub(r"[^\w\-.]+", "_", name)[:100]
+
+
+_trace_manager: Optional[TraceManager] = None
+
+
+def get_trace_manager() -> TraceManager:
+    """获取全局trace管理器，按环境配置初始化"""
+    global _trace_manager
+    if _trace_manager is None:
+        from config.config import config
+        _trace_manager = TraceManager.from_dict(config.TRACE_POLICY)
+    return _trace_manager
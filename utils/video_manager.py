@@ -7,12 +7,17 @@ from datetime import datetime
 from typing import Optional
 from playwright.sync_api import Page
 from utils.logger import log
+from utils.artifact_layout import get_artifact_layout
+from utils.artifact_store import get_artifact_store
 import allure
 
 
 class VideoManager:
     """视频管理工具类"""
     
+    # 视频保留策略: 总是保留 / 仅失败保留 / 仅重试时保留 / 不录制
+    RETENTION_MODES = ("always", "on_failure", "on_retry", "off")
+    
     def __init__(self, reports_dir: str = "./reports"):
         self.reports_dir = reports_dir
         self.videos_dir = os.path.join(reports_dir, "videos")
@@ -52,18 +57,92 @@ class VideoManager:
             log.error(f"附加视频到Allure报告失败: {e}")
             return False
     
+    @classmethod
+    def should_keep(cls, retention: str, failed: bool, attempt: int = 1) -> bool:
+        """
+        根据保留策略判断是否保留视频
+        
+        Args:
+            retention: 保留策略
+            failed: 用例是否失败
+            attempt: 执行次数（重跑时大于1）
+            
+        Returns:
+            是否保留
+        """
+        if retention not in cls.RETENTION_MODES:
+            log.warning(f"未知的视频保留策略: {retention}，按 on_failure 处理")
+            retention = "on_failure"
+        if retention == "always":
+            return True
+        if retention == "on_failure":
+            return failed
+        if retention == "on_retry":
+            return failed or attempt > 1
+        return False
+    
+    def finalize_video(self, video, test_name: str, keep: bool) -> Optional[str]:
+        """
+        用例结束（上下文关闭）后处理视频：保留则附加到Allure报告，否则直接删除
+        
+        Args:
+            video: Playwright视频对象(page.video)
+            test_name: 测试名称
+            keep: 是否保留
+            
+        Returns:
+            保留的视频路径
+        """
+        try:
+            video_path = video.path()
+            if not keep:
+                video.delete()
+                log.debug(f"用例通过，已删除视频: {video_path}")
+                return None
+            
+            if video_path and os.path.exists(video_path):
+                allure.attach.file(
+                    video_path,
+                    name=f"测试执行视频 - {test_name or '未知测试'}",
+                    attachment_type=allure.attachment_type.MP4
+                )
+                self._record_video(video_path)
+                log.info(f"视频已附加到Allure报告: {video_path}")
+                return video_path
+            log.warning("未找到视频文件或视频文件不存在")
+            return None
+        except Exception as e:
+            log.error(f"处理视频失败: {e}")
+            return None
+    
+    def _record_video(self, video_path: str):
+        """记录视频到产物清单，启用产物存储时同时存入blob"""
+        store = get_artifact_store()
+        if store is not None:
+            digest, _ = store.put_file(video_path)
+            get_artifact_layout().record("videos", video_path, blob=digest)
+        else:
+            get_artifact_layout().record("videos", video_path)
+    
     def save_video_with_test_name(self, page: Page, test_name: str) -> Optional[str]:
         """保存视频文件并重命名"""
         try:
             video_path = self.get_video_path(page)
             if video_path and os.path.exists(video_path):
-                # 生成新的文件名 - 使用MP4格式
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                new_filename = f"{test_name}_{timestamp}.mp4"
-                new_path = os.path.join(self.videos_dir, new_filename)
+                # 按产物布局生成不冲突的文件名 - 使用MP4格式
+                layout = get_artifact_layout()
+                store = get_artifact_store()
+                if store is not None:
+                    # 存入内容寻址存储，不再额外复制
+                    digest, blob_path = store.put_file(video_path, "mp4")
+                    layout.record("videos", blob_path, blob=digest, name=test_name)
+                    log.info(f"视频已存入产物存储: {blob_path}")
+                    return blob_path
                 
+                new_path = layout.path_for("videos", test_name, "mp4")
                 # 复制视频文件
                 shutil.copy2(video_path, new_path)
+                layout.record("videos", new_path)
                 log.info(f"视频已保存为MP4格式: {new_path}")
                 return new_path
             return None
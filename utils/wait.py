@@ -2,9 +2,14 @@
 等待工具类
 """
 import time
-from typing import Optional, Callable
-from playwright.sync_api import Page, Locator, expect
+from typing import Optional, Callable, Union, Any
+from playwright.sync_api import Page, Frame, Locator, expect
+from utils.conditions import PageCondition, next_condition_token
 from utils.logger import log
+from utils.readiness import get_readiness_registry
+
+# Python条件的首次检查间隔(秒)，之后翻倍直到interval
+_MIN_POLL_INTERVAL = 0.01
 
 class Wait:
     """等待工具类"""
@@ -52,18 +57,19 @@ class Wait:
             log.error(f"等待元素消失超时: {selector}, 错误: {str(e)}")
             return False
     
-    def wait_for_page_load(self, timeout: int = 30000) -> bool:
+    def wait_for_page_load(self, timeout: int = 30000, readiness=None) -> bool:
         """
-        等待页面加载完成
+        按就绪策略等待页面加载完成
         
         Args:
             timeout: 超时时间(毫秒)
+            readiness: 页面key或策略配置，为None时按当前URL匹配页面key
             
         Returns:
             是否加载完成
         """
         try:
-            self.page.wait_for_load_state("networkidle", timeout=timeout)
+            get_readiness_registry().resolve(readiness, self.page.url).wait(self.page, timeout)
             log.info("页面加载完成")
             return True
         except Exception as e:
@@ -89,20 +95,30 @@ class Wait:
             log.error(f"等待URL超时: {url}, 错误: {str(e)}")
             return False
     
-    def wait_for_condition(self, condition: Callable, timeout: int = 10000, interval: float = 0.5) -> bool:
+    def wait_for_condition(self, condition: Union[Callable, str, PageCondition], timeout: int = 10000,
+                           interval: float = 0.5, arg: Any = None, frame: Optional[Frame] = None) -> bool:
         """
         等待自定义条件
         
+        JS表达式/函数和 PageCondition 在页面内等待（见 wait_for_frame_condition）；
+        Python函数按指数退避轮询，间隔从10ms翻倍到interval。
+        
         Args:
-            condition: 条件函数
+            condition: 条件函数、JS表达式/函数或 PageCondition
             timeout: 超时时间(毫秒)
-            interval: 检查间隔(秒)
+            interval: Python条件的最大检查间隔(秒)
+            arg: 传给JS函数的参数
+            frame: 只在该frame内等待，默认所有frame
             
         Returns:
             条件是否满足
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout / 1000:
+        if isinstance(condition, (str, PageCondition)):
+            return self.wait_for_frame_condition(condition, timeout, arg, frame) is not None
+        
+        deadline = time.monotonic() + timeout / 1000
+        delay = min(_MIN_POLL_INTERVAL, interval)
+        while True:
             try:
                 if condition():
                     log.info("自定义条件已满足")
@@ -110,11 +126,91 @@ class Wait:
             except Exception as e:
                 log.debug(f"检查条件时出错: {str(e)}")
             
-            time.sleep(interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, interval)
         
         log.error(f"等待自定义条件超时: {timeout}ms")
         return False
     
+    def wait_for_frame_condition(self, condition: Union[str, PageCondition], timeout: int = 10000,
+                                 arg: Any = None, frame: Optional[Frame] = None,
+                                 poll_interval: int = 100) -> Optional[Frame]:
+        """
+        在页面内等待JS条件，返回条件成立的frame
+        
+        条件注入到每个frame，DOM变化时由 MutationObserver 重新判断，另以poll_interval兜底
+        （条件不依赖DOM时）；成立的frame发出一条console消息，Python侧只等待这一个事件。
+        frame导航或刷新后（framenavigated）按剩余时间重新注入，等待期间新挂载的frame同样注入。
+        
+        通知依赖 console.debug 到达Playwright的console事件：页面在注入前替换了 console.debug
+        时收不到通知，只能等到超时。
+        
+        Args:
+            condition: JS表达式、接收arg的JS函数或 PageCondition
+            timeout: 超时时间(毫秒)
+            arg: 传给JS函数的参数（PageCondition 自带参数时忽略）
+            frame: 只在该frame内等待，默认所有frame
+            poll_interval: 页面内兜底检查间隔(毫秒)，0为只依赖DOM变化
+            
+        Returns:
+            条件成立的frame，超时返回None
+        """
+        if not isinstance(condition, PageCondition):
+            condition = PageCondition(condition, arg)
+        script = condition.watch_script()
+        token = next_condition_token()
+        frames = [frame] if frame is not None else list(self.page.frames)
+        deadline = time.monotonic() + timeout / 1000
+        hits = []
+        
+        def on_console(message):
+            if message.text.startswith(token):
+                hits.append(message.text)
+        
+        def inject(index: int):
+            target = frames[index]
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if hits or remaining <= 0:
+                return
+            try:
+                # 立即满足时页面内同样发出通知，导航后重新注入的情况也能唤醒等待
+                if target.evaluate(script, [f"{token}{index}", remaining, poll_interval, condition.arg]):
+                    hits.append(f"{token}{index}")
+            except Exception as e:
+                # frame已分离或导航中
+                log.debug(f"条件注入frame失败: {target.url}, 错误: {str(e)}")
+        
+        def on_navigated(navigated: Frame):
+            # 导航后原文档中的监听随之销毁，在新文档中重新注入
+            if frame is not None and navigated != frame:
+                return
+            if navigated not in frames:
+                frames.append(navigated)
+            inject(frames.index(navigated))
+        
+        self.page.on("console", on_console)
+        self.page.on("framenavigated", on_navigated)
+        try:
+            for index in range(len(frames)):
+                inject(index)
+            if not hits:
+                remaining = max(deadline - time.monotonic(), 0.001)
+                message = self.page.wait_for_event(
+                    "console", predicate=lambda m: m.text.startswith(token), timeout=remaining * 1000)
+                hits.append(message.text)
+            matched = frames[int(hits[0][len(token):])]
+            log.info(f"自定义条件已满足: {condition.description} (frame: {matched.url})")
+            return matched
+        except Exception as e:
+            log.error(f"等待自定义条件超时: {condition.description}, 错误: {str(e)}")
+            return None
+        finally:
+            self.page.remove_listener("console", on_console)
+            self.page.remove_listener("framenavigated", on_navigated)
+    
     def wait_for_text(self, text: str, timeout: int = 10000) -> bool:
         """
         等待文本出现